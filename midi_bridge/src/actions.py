@@ -0,0 +1,190 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Action Executor                          ║
+║  "One hit, one action"                                            ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Runs the actions triggered from MIDI (and from the HTTP API) as tasks, so
+a slow container restart never holds up the next pad hit or the FastAPI
+endpoints. Blocking docker SDK calls go through ``run_blocking``, which
+runs them on a small thread pool instead of the event loop.
+
+Actions are mutually exclusive per key: an action's own name by default,
+or a group shared by actions that must not overlap (everything that
+restarts or redeploys the stack). While a key is busy, a new action is
+either queued behind it (up to ``max_queued``) or rejected, per the
+``overlap`` policy. An action hit again within ``debounce`` seconds of its
+last accepted hit is ignored, so a double-tapped snare restarts the stack
+once.
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_POLICIES = ('queue', 'reject')
+
+
+class _Run:
+    """One submitted action"""
+
+    __slots__ = ('action', 'key', 'source', 'operation', 'submitted_at', 'started_at', 'task')
+
+    def __init__(self, action: str, key: str, source: str, operation: Callable[[], Awaitable]):
+        self.action = action
+        self.key = key
+        self.source = source
+        self.operation = operation
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def describe(self) -> Dict:
+        now = time.time()
+        described = {"action": self.action, "key": self.key, "source": self.source}
+        if self.started_at is None:
+            described["waiting_s"] = round(now - self.submitted_at, 3)
+        else:
+            described["running_s"] = round(now - self.started_at, 3)
+        return described
+
+
+class ActionExecutor:
+    """Runs actions as tasks with per-key mutual exclusion, debouncing and a thread pool for blocking work"""
+
+    def __init__(self, max_workers: int = 4, debounce: float = 0.75, overlap: str = 'queue',
+                 max_queued: int = 1, groups: Optional[Dict[str, str]] = None, history: int = 50):
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy '{overlap}', expected one of {', '.join(OVERLAP_POLICIES)}")
+        self.max_workers = max_workers
+        self.debounce = debounce
+        self.overlap = overlap
+        self.max_queued = max_queued
+        self.groups = groups or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='heady-docker')
+        self._running: Dict[str, _Run] = {}
+        self._queued: Dict[str, Deque[_Run]] = {}
+        self._last_accepted: Dict[str, float] = {}
+        self._recent: Deque[Dict] = collections.deque(maxlen=history)
+
+        # Metrics
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.debounced = 0
+        self.rejected = 0
+        self.queued = 0
+
+    async def run_blocking(self, fn: Callable, *args):
+        """``fn(*args)`` on the thread pool, awaited without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args))
+
+    def submit(self, action: str, operation: Callable[[], Awaitable], source: str = 'midi') -> Dict:
+        """Start ``operation()`` for ``action``, queue it or turn it down.
+
+        Returns the outcome without waiting for the action: ``started``,
+        ``queued``, ``debounced`` (hit again too soon) or ``rejected`` (its
+        key is busy and nothing more may queue).
+        """
+        self.submitted += 1
+        key = self.groups.get(action, action)
+        now = time.monotonic()
+        if now - self._last_accepted.get(action, float('-inf')) < self.debounce:
+            self.debounced += 1
+            logger.info(f"Ignoring {action}: repeated within {self.debounce:.2f}s")
+            return {"action": action, "status": "debounced"}
+
+        run = _Run(action, key, source, operation)
+        if key in self._running:
+            queue = self._queued.setdefault(key, collections.deque())
+            if self.overlap == 'reject' or len(queue) >= self.max_queued:
+                self.rejected += 1
+                busy = self._running[key].action
+                logger.warning(f"Rejecting {action}: {busy} is still running")
+                return {"action": action, "status": "rejected", "busy_with": busy}
+            queue.append(run)
+            self._last_accepted[action] = now
+            self.queued += 1
+            logger.info(f"Queued {action} behind {self._running[key].action}")
+            return {"action": action, "status": "queued", "position": len(queue)}
+
+        self._last_accepted[action] = now
+        self._start(run)
+        return {"action": action, "status": "started"}
+
+    def _start(self, run: _Run):
+        run.started_at = time.time()
+        run.task = asyncio.create_task(self._execute(run))
+        self._running[run.key] = run
+        self.started += 1
+
+    async def _execute(self, run: _Run):
+        error = None
+        try:
+            await run.operation()
+            self.completed += 1
+        except asyncio.CancelledError:
+            error = 'cancelled'
+            raise
+        except Exception as e:
+            error = str(e)
+            self.failed += 1
+            logger.error(f"Action {run.action} failed: {e}")
+        finally:
+            self._finish(run, error)
+
+    def _finish(self, run: _Run, error: Optional[str]):
+        entry = {"action": run.action, "source": run.source, "started_at": run.started_at,
+                 "duration_s": round(time.time() - run.started_at, 3), "ok": error is None}
+        if error:
+            entry["error"] = error
+        self._recent.append(entry)
+        del self._running[run.key]
+        queue = self._queued.get(run.key)
+        if queue:
+            self._start(queue.popleft())
+        if not queue:
+            self._queued.pop(run.key, None)
+
+    def in_flight(self) -> Dict:
+        """Running and queued actions per key"""
+        return {
+            "running": [run.describe() for run in self._running.values()],
+            "queued": [run.describe() for queue in self._queued.values() for run in queue],
+        }
+
+    async def shutdown(self, timeout: float = 5.0):
+        """Drop queued actions, give running ones ``timeout`` seconds, then cancel them"""
+        self._queued.clear()
+        tasks = [run.task for run in self._running.values()]
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """Snapshot of in-flight actions, recent outcomes and executor counters"""
+        return {
+            **self.in_flight(),
+            "recent": list(self._recent),
+            "policy": {"overlap": self.overlap, "debounce_s": self.debounce, "max_queued": self.max_queued,
+                       "docker_workers": self.max_workers},
+            "submitted": self.submitted,
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "debounced": self.debounced,
+            "rejected": self.rejected,
+            "queued_total": self.queued,
+        }
@@ -0,0 +1,300 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Compose Engine                           ║
+║  "Deploy at the speed of the slowest image, not the sum of them" ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Runs docker-compose as asyncio subprocesses. Output is read line by line
+as it is produced, logged, and broadcast to live listeners (the
+``/ws/compose`` WebSocket), so a deploy can be watched while it runs
+instead of only after it fails.
+
+``pull`` pulls every service (or the given ones) with one process per
+service, ``pull_concurrency`` at a time, rather than one sequential pull.
+Each step has a timeout, after which its process is terminated (then
+killed), and ``cancel`` cancels every running operation: its running steps
+are terminated and it starts no further ones (queued pulls, the ``up -d``
+after a pull), which is what an emergency stop does to a deploy in
+progress.
+
+Steps run inside an ``operation`` (a deploy, a stop) are recorded with
+their durations, so the slow part of a deploy is visible on ``/compose``.
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import logging
+import os
+import shlex
+import signal
+import time
+from typing import Deque, Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+_current_operation: contextvars.ContextVar[Optional['ComposeOperation']] = \
+    contextvars.ContextVar('compose_operation', default=None)
+
+
+class ComposeStepError(Exception):
+    """Raised when a compose step exits non-zero, times out or is cancelled"""
+
+
+class ComposeOperation:
+    """A named group of compose steps (one deploy) and their durations"""
+
+    def __init__(self, name: str, project: Optional[str]):
+        self.name = name
+        self.project = project
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status = 'running'
+        self.steps: List[Dict] = []
+        self.cancelled = False
+        self._finished = asyncio.Event()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def describe(self) -> Dict:
+        return {
+            "name": self.name,
+            "project": self.project,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 3),
+            "steps": list(self.steps),
+        }
+
+
+class ComposeEngine:
+    """Runs compose commands as subprocesses with streamed output, timeouts and cancellation"""
+
+    def __init__(self, command: str = 'docker-compose', project_dir: Optional[str] = None,
+                 timeout: float = 600.0, pull_concurrency: int = 4, subscriber_buffer: int = 1000,
+                 history: int = 20):
+        self.command = shlex.split(command)
+        self.project_dir = project_dir
+        self.timeout = timeout
+        self.pull_concurrency = pull_concurrency
+        self.subscriber_buffer = subscriber_buffer
+        self._processes: Set[asyncio.subprocess.Process] = set()
+        self._cancelled: Set[asyncio.subprocess.Process] = set()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._running: List[ComposeOperation] = []
+        self._recent: Deque[Dict] = collections.deque(maxlen=history)
+
+        # Metrics
+        self.steps = 0
+        self.failed_steps = 0
+        self.timeouts = 0
+        self.cancellations = 0
+        self.lines = 0
+        self.dropped_lines = 0
+
+    @contextlib.asynccontextmanager
+    async def operation(self, name: str, project: Optional[str] = None):
+        """Record the steps run inside the block (including parallel ones) as one operation"""
+        op = ComposeOperation(name, project)
+        token = _current_operation.set(op)
+        self._running.append(op)
+        try:
+            yield op
+            op.status = 'ok'
+        except asyncio.CancelledError:
+            op.status = 'cancelled'
+            raise
+        except Exception:
+            op.status = 'cancelled' if op.cancelled else 'failed'
+            raise
+        finally:
+            op.finished_at = time.time()
+            op._finished.set()
+            _current_operation.reset(token)
+            self._running.remove(op)
+            self._recent.append(op.describe())
+            logger.info(f"Compose {name} {op.status} in {op.duration:.1f}s")
+
+    async def run(self, args: Sequence[str], project: Optional[str] = None, timeout: Optional[float] = None,
+                  capture: bool = False) -> List[str]:
+        """Run one compose command; returns its stdout lines when ``capture`` is set.
+
+        Raises ``ComposeStepError`` if it exits non-zero, outlives ``timeout``
+        seconds or is cancelled, and without starting it if its operation
+        has been cancelled.
+        """
+        op = _current_operation.get()
+        project = project or (op.project if op else None)
+        argv = self.command + (['-p', project] if project else []) + list(args)
+        label = ' '.join(args)
+        timeout = self.timeout if timeout is None else timeout
+        step = {"command": label, "started_at": time.time()}
+        if op:
+            op.steps.append(step)
+        started = time.perf_counter()
+        if op and op.cancelled:
+            self._finish_step(step, started, None, 'cancelled')
+            raise ComposeStepError(f"{label} was not started, {op.name} was cancelled")
+        self.steps += 1
+        logger.info(f"Executing: {' '.join(argv)}")
+        self._broadcast(label, 'status', 'started')
+
+        process = await asyncio.create_subprocess_exec(
+            *argv, cwd=self.project_dir, stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, limit=1 << 20,
+            start_new_session=True  # own process group, so stopping it reaches its children too
+        )
+        self._processes.add(process)
+        if op and op.cancelled:  # cancelled while the process was being spawned
+            self._cancelled.add(process)
+            self._signal(process, signal.SIGTERM)
+        captured: List[str] = []
+
+        async def communicate() -> int:
+            await asyncio.gather(
+                self._read(process.stdout, label, 'stdout', captured if capture else None),
+                self._read(process.stderr, label, 'stderr', None)
+            )
+            return await process.wait()
+
+        try:
+            exit_code = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            await self._stop(process)
+            self._finish_step(step, started, None, 'timeout')
+            raise ComposeStepError(f"{label} timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            await self._stop(process)
+            self._finish_step(step, started, None, 'cancelled')
+            raise
+        finally:
+            self._processes.discard(process)
+            cancelled = process in self._cancelled
+            self._cancelled.discard(process)
+
+        if cancelled:
+            self._finish_step(step, started, exit_code, 'cancelled')
+            raise ComposeStepError(f"{label} was cancelled")
+        if exit_code:
+            self.failed_steps += 1
+            self._finish_step(step, started, exit_code, 'failed')
+            raise ComposeStepError(f"{label} exited with {exit_code}")
+        self._finish_step(step, started, exit_code, 'ok')
+        return captured
+
+    def _finish_step(self, step: Dict, started: float, exit_code: Optional[int], status: str):
+        step.update(duration_s=round(time.perf_counter() - started, 3), exit_code=exit_code, status=status)
+        self._broadcast(step['command'], 'status', f"{status} in {step['duration_s']:.1f}s")
+
+    async def _read(self, stream: asyncio.StreamReader, label: str, name: str, captured: Optional[List[str]]):
+        while True:
+            raw = await stream.readline()
+            if not raw:
+                return
+            line = raw.decode(errors='replace').rstrip()
+            if not line:
+                continue
+            if captured is not None:
+                captured.append(line)
+            logger.info(f"[compose {label}] {line}")
+            self._broadcast(label, name, line)
+
+    async def _stop(self, process: asyncio.subprocess.Process, grace: float = 5.0):
+        """Terminate the process group of ``process``, and kill it if still running after ``grace`` seconds"""
+        self._signal(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+        except asyncio.TimeoutError:
+            self._signal(process, signal.SIGKILL)
+            await process.wait()
+
+    @staticmethod
+    def _signal(process: asyncio.subprocess.Process, sig: int):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    async def pull(self, services: Optional[Sequence[str]] = None, project: Optional[str] = None):
+        """Pull ``services`` (every service by default), ``pull_concurrency`` at a time"""
+        if not services:
+            services = await self.run(['config', '--services'], project=project, capture=True)
+        semaphore = asyncio.Semaphore(self.pull_concurrency)
+
+        async def pull_one(service: str):
+            async with semaphore:
+                await self.run(['pull', service], project=project)
+
+        results = await asyncio.gather(*(pull_one(service) for service in services), return_exceptions=True)
+        failures = [f"{service}: {result}" for service, result in zip(services, results)
+                    if isinstance(result, BaseException)]
+        if failures:
+            raise ComposeStepError(f"{len(failures)} of {len(services)} pulls failed ({'; '.join(failures)})")
+
+    async def cancel(self, grace: float = 10.0):
+        """Cancel every running operation and terminate every running compose step.
+
+        Cancelled operations start no further steps; their callers see
+        ``ComposeStepError``. Waits up to ``grace`` seconds for them to finish,
+        so a step run afterwards (the ``down`` of an emergency stop) cannot
+        race one of theirs.
+        """
+        current = _current_operation.get()
+        operations = [op for op in self._running if op is not current and not op.cancelled]
+        processes = [process for process in self._processes if process.returncode is None]
+        if not operations and not processes:
+            return
+        self.cancellations += 1
+        logger.warning(f"Cancelling {len(operations)} compose operations and {len(processes)} running steps")
+        for op in operations:
+            op.cancelled = True
+        self._cancelled.update(processes)
+        await asyncio.gather(*(self._stop(process) for process in processes))
+        if operations:
+            await asyncio.wait([asyncio.create_task(op._finished.wait()) for op in operations], timeout=grace)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every output line from now on; ``None`` once unsubscribed"""
+        queue = asyncio.Queue(self.subscriber_buffer)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            with contextlib.suppress(asyncio.QueueFull):
+                queue.put_nowait(None)
+
+    def _broadcast(self, step: str, stream: str, line: str):
+        self.lines += 1
+        if not self._subscribers:
+            return
+        message = {"step": step, "stream": stream, "line": line, "timestamp": time.time()}
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped_lines += 1
+
+    def stats(self) -> Dict:
+        """Snapshot of running and recent operations with per-step durations"""
+        return {
+            "running": [op.describe() for op in self._running],
+            "recent": list(self._recent),
+            "processes": len(self._processes),
+            "listeners": len(self._subscribers),
+            "timeout_s": self.timeout,
+            "pull_concurrency": self.pull_concurrency,
+            "steps": self.steps,
+            "failed_steps": self.failed_steps,
+            "timeouts": self.timeouts,
+            "cancellations": self.cancellations,
+            "lines": self.lines,
+            "dropped_lines": self.dropped_lines,
+        }
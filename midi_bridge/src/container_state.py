@@ -0,0 +1,239 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Container State Cache                    ║
+║  "Ask the daemon once, then listen"                               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Keeps the status and health of the Heady containers in memory, so health
+checks from the drum kit and from monitoring read a dict instead of
+inspecting every container on the Docker daemon.
+
+The cache follows the daemon's event stream (start, die, health_status,
+...) on a background thread and applies each event on the event loop.
+Entries are inspected again, in parallel and at most once at a time per
+container, when they are missing, when an event could not be interpreted,
+or when they are older than ``max_age`` while the event stream is down
+(events may have been missed). Reconnecting the stream invalidates every
+entry for the same reason.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+# Container event actions and the status they leave the container in
+EVENT_STATUS = {
+    'create': 'created',
+    'start': 'running',
+    'restart': 'running',
+    'unpause': 'running',
+    'pause': 'paused',
+    'die': 'exited',
+    'stop': 'exited',
+    'destroy': 'missing',
+}
+
+# Actions that do not change status or health
+IGNORED_ACTIONS = ('kill', 'attach', 'detach', 'resize', 'top', 'export', 'commit', 'copy', 'archive-path',
+                   'exec_create', 'exec_start', 'exec_die', 'oom')
+
+
+class ContainerStateCache:
+    """Status and health of ``containers``, fed by Docker events with inspects as fallback"""
+
+    def __init__(self, client, containers: List[str], max_age: float = 30.0, reconnect_max: float = 30.0):
+        self.client = client
+        self.containers = list(containers)
+        self._names = set(self.containers)
+        self.max_age = max_age
+        self.reconnect_max = reconnect_max
+        self._entries: Dict[str, Dict] = {}
+        self._updated: Dict[str, float] = {}  # monotonic time of the last event or inspect applied
+        self._invalid = set(self.containers)
+        self._inspecting: Dict[str, asyncio.Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.containers)),
+                                        thread_name_prefix='heady-inspect')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stream = None
+        self._stopped = threading.Event()
+        self.events_connected = False
+
+        # Metrics
+        self.events = 0
+        self.inspects = 0
+        self.inspect_errors = 0
+        self.hits = 0
+        self.refreshes = 0
+        self.connects = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Follow the daemon's container events on a background thread"""
+        self._loop = loop
+        self._thread = threading.Thread(target=self._follow_events, name='heady-docker-events', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # Event stream (background thread)
+    def _follow_events(self):
+        delay = 1.0
+        while not self._stopped.is_set():
+            try:
+                self._stream = self.client.events(decode=True, filters={'type': 'container'})
+                self._call_soon(self._connected, True)
+                delay = 1.0
+                for event in self._stream:
+                    self._call_soon(self._apply_event, event)
+            except Exception as e:
+                if not self._stopped.is_set():
+                    logger.warning(f"Docker event stream failed: {e}, reconnecting in {delay:.0f}s")
+            finally:
+                self._stream = None
+                self._call_soon(self._connected, False)
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _call_soon(self, callback, *args):
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            self._stopped.set()  # event loop closed
+
+    # Cache updates (event loop)
+    def _connected(self, connected: bool):
+        if connected and not self.events_connected:
+            self.connects += 1
+            # Events may have been missed while disconnected
+            self._invalid.update(self.containers)
+        self.events_connected = connected
+
+    def _apply_event(self, event: Dict):
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        name = attributes.get('name')
+        if name not in self._names:
+            return
+        self.events += 1
+        action = event.get('Action') or event.get('status', '')
+        entry = dict(self._entries.get(name) or {'status': 'unknown', 'health': 'unknown'})
+        if action.startswith('health_status'):
+            entry['health'] = action.partition(':')[2].strip() or 'unknown'
+        elif action in EVENT_STATUS:
+            entry['status'] = EVENT_STATUS[action]
+            if action == 'start' and entry.get('health') not in ('none', 'unknown'):
+                entry['health'] = 'starting'
+            if 'image' in attributes:
+                entry['image'] = attributes['image']
+        elif action.split(':')[0] in IGNORED_ACTIONS:
+            return
+        else:
+            self._invalid.add(name)
+            return
+        entry['source'] = 'event'
+        entry['updated_at'] = event.get('time', time.time())
+        self._entries[name] = entry
+        self._updated[name] = time.monotonic()  # an invalid entry stays invalid until inspected
+
+    def _inspect(self, name: str) -> Dict:
+        """Current state of one container from the daemon (thread pool)"""
+        try:
+            attrs = self.client.api.inspect_container(name)
+        except docker.errors.NotFound:
+            return {'status': 'missing', 'health': 'unknown'}
+        state = attrs.get('State', {})
+        return {
+            'status': state.get('Status', 'unknown'),
+            'health': state.get('Health', {}).get('Status', 'none'),
+            'image': attrs.get('Config', {}).get('Image'),
+            'started_at': state.get('StartedAt'),
+        }
+
+    async def _refresh(self, name: str):
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self.inspects += 1
+        try:
+            entry = await loop.run_in_executor(self._pool, self._inspect, name)
+        except Exception as e:
+            self.inspect_errors += 1
+            entry = {'status': 'error', 'health': 'unknown', 'error': str(e)}
+        # An event applied while the inspect was in flight is newer than its result
+        if self._updated.get(name, float('-inf')) > started:
+            return
+        entry['source'] = 'inspect'
+        entry['updated_at'] = time.time()
+        self._entries[name] = entry
+        self._updated[name] = time.monotonic()
+        if entry['status'] != 'error':
+            self._invalid.discard(name)
+
+    def stale(self) -> List[str]:
+        """Containers whose cached state cannot be trusted"""
+        now = time.monotonic()
+        return [
+            name for name in self.containers
+            if name in self._invalid or name not in self._entries
+            or (not self.events_connected and now - self._updated.get(name, float('-inf')) > self.max_age)
+        ]
+
+    def refresh(self, names: List[str]) -> asyncio.Future:
+        """Inspect ``names`` in parallel; joins inspects that are already running"""
+        futures = []
+        for name in names:
+            future = self._inspecting.get(name)
+            if future is None:
+                future = asyncio.ensure_future(self._refresh(name))
+                self._inspecting[name] = future
+                future.add_done_callback(lambda _, name=name: self._inspecting.pop(name, None))
+            futures.append(future)
+        return asyncio.gather(*futures)
+
+    async def snapshot(self, wait: bool = True) -> Dict:
+        """State of every container; stale entries are inspected first, or in
+        the background with ``wait=False`` (unless nothing is cached yet)
+        """
+        stale = self.stale()
+        if stale:
+            self.refreshes += 1
+            refreshing = self.refresh(stale)
+            if wait or not self._entries:
+                await refreshing
+        else:
+            self.hits += 1
+        return {
+            'containers': {name: dict(self._entries[name]) for name in self.containers if name in self._entries},
+            'stale': self.stale(),
+            'events_connected': self.events_connected,
+        }
+
+    def stats(self) -> Dict:
+        """Snapshot of cache counters"""
+        return {
+            "containers": len(self.containers),
+            "events_connected": self.events_connected,
+            "max_age_s": self.max_age,
+            "events": self.events,
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "inspects": self.inspects,
+            "inspect_errors": self.inspect_errors,
+            "event_stream_connects": self.connects,
+        }
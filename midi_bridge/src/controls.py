@@ -0,0 +1,134 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Continuous Controller Coalescing         ║
+║  "Apply where the knob lands, not every step on the way"          ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+A knob sweep sends dozens of control_change messages per second, and each
+one used to reconfigure the Oracle. Here each controller keeps only its
+latest value. The value is applied once the knob has been still for
+``settle`` seconds, and applies to one controller are at least
+``min_interval`` seconds apart. During a long sweep the latest value is
+applied each time that interval elapses, so the change still shows while
+the knob moves.
+
+Every controller has at most one apply running, and a value is applied
+only if it differs from the last one handed to the handler. The position
+the knob settles on is therefore applied exactly once, however many
+messages led there. A value whose handler fails counts as failed, not
+applied, and is not retried until the knob moves.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Control:
+    """Latest and last applied value of one controller"""
+
+    __slots__ = ('name', 'handler', 'value', 'received_at', 'pending_since', 'attempted_value', 'attempted_at',
+                 'applied_value', 'error', 'task', 'received', 'applied', 'failed')
+
+    def __init__(self, name: str, handler: Callable[[int], Awaitable]):
+        self.name = name
+        self.handler = handler
+        self.value: Optional[int] = None
+        self.received_at = float('-inf')
+        self.pending_since: Optional[float] = None
+        self.attempted_value: Optional[int] = None  # last value handed to the handler
+        self.attempted_at = float('-inf')
+        self.applied_value: Optional[int] = None  # last value the handler succeeded with
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.received = 0
+        self.applied = 0
+        self.failed = 0
+
+    def stats(self) -> Dict:
+        return {
+            "value": self.value,
+            "applied_value": self.applied_value,
+            "pending": self.value != self.attempted_value,
+            "last_error": self.error,
+            "received": self.received,
+            "applied": self.applied,
+            "coalesced": self.received - self.applied - self.failed,
+            "failed": self.failed,
+        }
+
+
+class ControlCoalescer:
+    """Coalesces control_change values per controller and applies them rate-limited"""
+
+    def __init__(self, settle: float = 0.15, min_interval: float = 1.0):
+        self.settle = settle
+        self.min_interval = min_interval
+        self._controls: Dict[str, _Control] = {}
+
+    def submit(self, name: str, handler: Callable[[int], Awaitable], value: int):
+        """Record the latest ``value`` of controller ``name``; ``handler(value)`` applies it later"""
+        control = self._controls.get(name)
+        if control is None:
+            control = self._controls[name] = _Control(name, handler)
+        control.received += 1
+        if value == control.value:
+            return
+        now = asyncio.get_running_loop().time()
+        control.value = value
+        control.received_at = now
+        if control.pending_since is None:
+            control.pending_since = now
+        if control.task is None:
+            control.task = asyncio.create_task(self._apply_when_due(control))
+
+    def _due(self, control: _Control) -> float:
+        """Loop time at which the pending value may be applied"""
+        moving_for = control.pending_since + self.min_interval
+        return max(control.attempted_at + self.min_interval, min(control.received_at + self.settle, moving_for))
+
+    async def _apply_when_due(self, control: _Control):
+        loop = asyncio.get_running_loop()
+        try:
+            while control.value != control.attempted_value:
+                delay = self._due(control) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue  # newer values may have moved the due time
+                value = control.value
+                control.pending_since = None
+                try:
+                    await control.handler(value)
+                    control.applied += 1
+                    control.applied_value = value
+                    control.error = None
+                except Exception as e:
+                    control.failed += 1
+                    control.error = str(e)
+                    logger.error(f"Applying {control.name}={value} failed: {e}")
+                control.attempted_value = value
+                control.attempted_at = loop.time()
+            control.pending_since = None  # the knob may have returned to the last value
+        finally:
+            control.task = None
+
+    async def close(self):
+        """Stop waiting to apply pending values"""
+        tasks = [control.task for control in self._controls.values() if control.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        """Snapshot of each controller's latest and applied value, last error and coalescing counters"""
+        return {
+            "settle_s": self.settle,
+            "min_interval_s": self.min_interval,
+            "controllers": {name: control.stats() for name, control in self._controls.items()},
+        }
@@ -12,17 +12,44 @@ import asyncio
 import json
 import logging
 import os
+import shlex
+import time
 from typing import Dict, Optional
 
 import docker
 import mido
-from fastapi import FastAPI
+import requests
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 import uvicorn
 
+from .actions import ActionExecutor
+from .compose import ComposeEngine
+from .container_state import ContainerStateCache
+from .controls import ControlCoalescer
+from .midi_input import LatencyTracker, MidiInputReader, trigger_name
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Heady containers administered from the bridge
+HEADY_CONTAINERS = ['heady_mqtt', 'heady_vault', 'heady_oracle', 'heady_viz', 'heady_auditor']
+
+# Actions that restart, redeploy or snapshot containers never run concurrently
+# (emergency_stop stays outside the group so it can cancel a deploy in progress)
+STACK_ACTIONS = ('deploy_production', 'deploy_staging', 'restart_oracle', 'restart_grafana',
+                 'backup_data', 'start_all_services', 'restart_all_services')
+
+# Pads and knobs with no action behind them: the Oracle reads its process count at startup
+# (the compose file fixes it), has no maintenance mode, and nothing in it has a temperature
+UNSUPPORTED_TRIGGERS = {
+    'G4': "scaling the Oracle; set ORACLE_PROCESSES in docker-compose and redeploy",
+    'hi_tom': "scaling the Oracle; set ORACLE_PROCESSES in docker-compose and redeploy",
+    'mid_tom': "scaling the Oracle; set ORACLE_PROCESSES in docker-compose and redeploy",
+    'hi_hat': "the Oracle has no maintenance mode",
+    'CC1': "the Oracle and HeadyBrain have no AI temperature setting",
+}
+
 app = FastAPI(title="HeadySync MIDI Bridge", version="1.0.0")
 
 class HeadyMIDIController:
@@ -32,7 +59,36 @@ class HeadyMIDIController:
         self.docker_client = docker.from_env()
         self.midi_input = None
         self.midi_output = None
+        self.midi_reader = MidiInputReader(max_pending=int(os.getenv('MIDI_MAX_PENDING', '1024')))
         self.active_containers = {}
+        self.executor = ActionExecutor(
+            max_workers=int(os.getenv('MIDI_DOCKER_WORKERS', '4')),
+            debounce=int(os.getenv('MIDI_ACTION_DEBOUNCE_MS', '750')) / 1000.0,
+            overlap=os.getenv('MIDI_ACTION_OVERLAP', 'queue'),
+            max_queued=int(os.getenv('MIDI_ACTION_MAX_QUEUED', '1')),
+            groups={action: 'stack' for action in STACK_ACTIONS}
+        )
+        self.container_state = ContainerStateCache(
+            self.docker_client, HEADY_CONTAINERS,
+            max_age=float(os.getenv('MIDI_CONTAINER_STATE_MAX_AGE_SECONDS', '30'))
+        )
+        self.compose = ComposeEngine(
+            command=os.getenv('MIDI_COMPOSE_COMMAND', 'docker-compose'),
+            project_dir=os.getenv('MIDI_COMPOSE_PROJECT_DIR') or None,
+            timeout=float(os.getenv('MIDI_COMPOSE_TIMEOUT_SECONDS', '600')),
+            pull_concurrency=int(os.getenv('MIDI_COMPOSE_PULL_CONCURRENCY', '4'))
+        )
+        # Knobs reconfigure the Oracle through its runtime API
+        self.oracle_url = os.getenv('HEADY_ORACLE_URL', 'http://heady_oracle:8080').rstrip('/')
+        self.oracle_timeout = float(os.getenv('MIDI_ORACLE_TIMEOUT_SECONDS', '5'))
+        self.controls = ControlCoalescer(
+            settle=int(os.getenv('MIDI_CC_SETTLE_MS', '150')) / 1000.0,
+            min_interval=int(os.getenv('MIDI_CC_MIN_INTERVAL_MS', '1000')) / 1000.0
+        )
+
+        # Note-to-action latency: arrival to handler start, and to handler completion
+        self.dispatch_latency = LatencyTracker()
+        self.action_latency = LatencyTracker()
         
         # MIDI to Action Mapping
         self.action_map = {
@@ -41,7 +97,6 @@ class HeadyMIDIController:
             'D4': self.deploy_staging,
             'E4': self.restart_oracle,
             'F4': self.restart_grafana,
-            'G4': self.scale_oracle,
             'A4': self.backup_data,
             'B4': self.system_health,
             
@@ -49,14 +104,10 @@ class HeadyMIDIController:
             'crash_cymbal': self.emergency_stop,
             'kick_drum': self.start_all_services,
             'snare': self.restart_all_services,
-            'hi_tom': self.scale_up_services,
-            'mid_tom': self.scale_down_services,
             'low_tom': self.rotate_logs,
-            'hi_hat': self.toggle_maintenance_mode,
             'ride_cymbal': self.generate_report,
             
             # Continuous controllers (knobs/sliders)
-            'CC1': self.adjust_ai_temperature,
             'CC2': self.adjust_verification_threshold,
             'CC3': self.adjust_backoff_rate,
         }
@@ -74,7 +125,7 @@ class HeadyMIDIController:
             # Try to connect to common devices
             for device_name in midi_inputs:
                 if any(keyword in device_name.lower() for keyword in ['launchkey', 'novation', 'pyle', 'midi']):
-                    self.midi_input = mido.open_input(device_name)
+                    self.midi_input = self.midi_reader.open(device_name, asyncio.get_running_loop())
                     logger.info(f"Connected to MIDI input: {device_name}")
                     break
             
@@ -94,37 +145,54 @@ class HeadyMIDIController:
             logger.error(f"Error initializing MIDI: {e}")
     
     async def _listen_for_midi(self):
-        """Listen for MIDI messages and trigger actions"""
+        """Trigger actions for MIDI messages as the input reader queues them"""
         while True:
-            try:
-                for msg in self.midi_input.iter_pending():
-                    await self._process_midi_message(msg)
-                await asyncio.sleep(0.01)  # Small delay to prevent CPU spinning
-            except Exception as e:
-                logger.error(f"Error processing MIDI message: {e}")
-                await asyncio.sleep(1)
+            msg, received_at = await self.midi_reader.get()
+            await self._process_midi_message(msg, received_at)
     
-    async def _process_midi_message(self, msg):
+    async def _process_midi_message(self, msg, received_at: Optional[float] = None):
         """Process individual MIDI message"""
+        if received_at is None:
+            received_at = time.perf_counter()
         try:
             if msg.type == 'note_on' and msg.velocity > 0:
-                note_name = midi.note_number_to_name(msg.note)
+                note_name = trigger_name(msg)
                 logger.info(f"MIDI Note ON: {note_name} (velocity: {msg.velocity})")
                 
                 if note_name in self.action_map:
-                    await self.action_map[note_name]()
-                    self._send_feedback(msg.note, msg.velocity)
+                    self.dispatch_latency.record(time.perf_counter() - received_at)
+                    self.trigger(note_name, received_at=received_at, note=msg.note, velocity=msg.velocity)
+                elif note_name in UNSUPPORTED_TRIGGERS:
+                    logger.warning(f"{note_name} is not supported: {UNSUPPORTED_TRIGGERS[note_name]}")
                     
             elif msg.type == 'control_change':
                 controller_name = f"CC{msg.control}"
-                logger.info(f"MIDI CC: {controller_name} (value: {msg.value})")
+                logger.debug(f"MIDI CC: {controller_name} (value: {msg.value})")
                 
                 if controller_name in self.action_map:
-                    await self.action_map[controller_name](msg.value)
+                    # Only the value the knob settles on (and one per interval while it moves) is applied
+                    self.dispatch_latency.record(time.perf_counter() - received_at)
+                    self.controls.submit(controller_name, self.action_map[controller_name], msg.value)
+                elif controller_name in UNSUPPORTED_TRIGGERS:
+                    logger.debug(f"{controller_name} is not supported: {UNSUPPORTED_TRIGGERS[controller_name]}")
                     
         except Exception as e:
             logger.error(f"Error processing MIDI message {msg}: {e}")
     
+    def trigger(self, action: str, source: str = 'midi', received_at: Optional[float] = None,
+                note: Optional[int] = None, velocity: int = 0) -> Dict:
+        """Hand the handler mapped to ``action`` to the executor without waiting for it to finish"""
+        handler = self.action_map[action]
+
+        async def run():
+            await handler()
+            if received_at is not None:
+                self.action_latency.record(time.perf_counter() - received_at)
+            if note is not None:
+                self._send_feedback(note, velocity)
+
+        return self.executor.submit(handler.__name__, run, source)
+    
     def _send_feedback(self, note: int, velocity: int):
         """Send visual feedback via MIDI output"""
         if self.midi_output:
@@ -142,58 +210,135 @@ class HeadyMIDIController:
         logger.info("🚀 DEPLOYING TO PRODUCTION")
         try:
             # Pull latest and restart services
-            await self._docker_compose('pull')
-            await self._docker_compose('up -d')
-            await self._notify_success("Production deployment complete")
+            async with self.compose.operation('deploy_production') as op:
+                await self._docker_compose('pull')
+                await self._docker_compose('up -d')
+            await self._notify_success(f"Production deployment complete in {op.duration:.1f}s")
         except Exception as e:
             await self._notify_error(f"Production deployment failed: {e}")
+            raise
+    
+    async def deploy_staging(self):
+        """Deploy to staging (D4 on Launchkey)"""
+        logger.info("🧪 DEPLOYING TO STAGING")
+        try:
+            project = os.getenv('STAGING_COMPOSE_PROJECT', 'heady_staging')
+            async with self.compose.operation('deploy_staging', project) as op:
+                await self._docker_compose('pull')
+                await self._docker_compose('up -d')
+            await self._notify_success(f"Staging deployment complete in {op.duration:.1f}s")
+        except Exception as e:
+            await self._notify_error(f"Staging deployment failed: {e}")
+            raise
     
     async def emergency_stop(self):
         """Emergency stop all services (Crash Cymbal)"""
         logger.info("🛑 EMERGENCY STOP ACTIVATED")
         try:
-            await self._docker_compose('down')
+            # Stop any deploy in progress first, so it cannot bring services back up
+            await self.compose.cancel()
+            async with self.compose.operation('emergency_stop'):
+                await self._docker_compose('down')
             await self._notify_success("All services stopped")
         except Exception as e:
             await self._notify_error(f"Emergency stop failed: {e}")
+            raise
     
     async def restart_oracle(self):
         """Restart Heady Oracle service"""
         logger.info("🔄 RESTARTING HEADY ORACLE")
         try:
-            container = self.docker_client.containers.get('heady_oracle')
-            container.restart()
+            await self.executor.run_blocking(self._restart_container, 'heady_oracle')
             await self._notify_success("Oracle restarted")
         except Exception as e:
             await self._notify_error(f"Oracle restart failed: {e}")
+            raise
     
-    async def adjust_ai_temperature(self, value: int):
-        """Adjust AI model temperature (CC1 knob)"""
-        # Map MIDI value (0-127) to temperature (0.1-2.0)
-        temperature = 0.1 + (value / 127.0) * 1.9
-        logger.info(f"🌡️ Adjusting AI temperature to {temperature:.2f}")
-        
-        # TODO: Update environment variable in oracle container
-        await self._update_env_var('heady_oracle', 'AI_TEMPERATURE', str(temperature))
+    async def restart_grafana(self):
+        """Restart the Grafana dashboard (F4 on Launchkey)"""
+        logger.info("🔄 RESTARTING GRAFANA")
+        try:
+            await self.executor.run_blocking(self._restart_container, 'heady_viz')
+            await self._notify_success("Grafana restarted")
+        except Exception as e:
+            await self._notify_error(f"Grafana restart failed: {e}")
+            raise
+    
+    async def backup_data(self):
+        """Back up the InfluxDB vault (A4 on Launchkey)"""
+        logger.info("💾 BACKING UP VAULT")
+        try:
+            path = f"/var/lib/influxdb2/backups/{time.strftime('%Y%m%dT%H%M%S')}"
+            await self.executor.run_blocking(self._exec_in_container, 'heady_vault', ['influx', 'backup', path])
+            await self._notify_success(f"Vault backed up to {path}")
+        except Exception as e:
+            await self._notify_error(f"Backup failed: {e}")
+            raise
+    
+    async def start_all_services(self):
+        """Start every Heady container (Kick Drum)"""
+        logger.info("▶️ STARTING ALL SERVICES")
+        await self._on_all_containers('start', self._start_container)
+    
+    async def restart_all_services(self):
+        """Restart every Heady container (Snare)"""
+        logger.info("🔄 RESTARTING ALL SERVICES")
+        await self._on_all_containers('restart', self._restart_container)
+    
+    async def _on_all_containers(self, verb: str, operation):
+        """Run a blocking per-container operation on every Heady container in parallel"""
+        results = await asyncio.gather(
+            *(self.executor.run_blocking(operation, name) for name in HEADY_CONTAINERS),
+            return_exceptions=True
+        )
+        failed = {name: str(result) for name, result in zip(HEADY_CONTAINERS, results)
+                  if isinstance(result, Exception)}
+        if failed:
+            await self._notify_error(f"Could not {verb} {', '.join(failed)}: {failed}")
+            raise RuntimeError(f"Could not {verb} {', '.join(failed)}")
+        else:
+            await self._notify_success(f"All services {verb}ed")
+    
+    async def rotate_logs(self):
+        """Make the MQTT broker reopen its log file (Low Tom)"""
+        logger.info("📜 ROTATING LOGS")
+        try:
+            await self.executor.run_blocking(self._signal_container, 'heady_mqtt', 'SIGHUP')
+            await self._notify_success("Logs rotated")
+        except Exception as e:
+            await self._notify_error(f"Log rotation failed: {e}")
+            raise
+    
+    async def generate_report(self):
+        """Log a report of recent actions and MIDI latency (Ride Cymbal)"""
+        report = {
+            'actions': self.executor.stats(),
+            'midi_latency': self.latency_stats(),
+        }
+        logger.info(f"Bridge Report: {json.dumps(report, indent=2)}")
+        await self._notify_success("Report generated")
+    
+    async def adjust_verification_threshold(self, value: int):
+        """Adjust the Oracle verification threshold (CC2 knob)"""
+        # Map MIDI value (0-127) to threshold (0.5-0.999)
+        threshold = 0.5 + (value / 127.0) * 0.499
+        logger.info(f"🎯 Adjusting verification threshold to {threshold:.3f}")
+        await self.executor.run_blocking(self._put_oracle, '/verification', {'threshold': f"{threshold:.3f}"})
+    
+    async def adjust_backoff_rate(self, value: int):
+        """Adjust the Fibonacci backoff base delay (CC3 knob)"""
+        # Map MIDI value (0-127) to base delay (100-5000 ms)
+        base_delay = int(100 + (value / 127.0) * 4900)
+        logger.info(f"⏱️ Adjusting backoff base delay to {base_delay}ms")
+        await self.executor.run_blocking(self._put_oracle, '/backoff', {'base_delay_ms': base_delay})
     
     async def system_health(self):
         """Generate system health report (B4 on Launchkey)"""
         logger.info("📊 GENERATING SYSTEM HEALTH REPORT")
         try:
-            health_status = {}
-            
-            # Check all Heady containers
-            containers = ['heady_mqtt', 'heady_vault', 'heady_oracle', 'heady_viz', 'heady_auditor']
-            
-            for container_name in containers:
-                try:
-                    container = self.docker_client.containers.get(container_name)
-                    health_status[container_name] = {
-                        'status': container.status,
-                        'health': container.attrs.get('State', {}).get('Health', {}).get('Status', 'unknown')
-                    }
-                except Exception as e:
-                    health_status[container_name] = {'status': 'error', 'error': str(e)}
+            # Check all Heady containers (cached, re-inspected in parallel when stale)
+            snapshot = await self.container_state.snapshot()
+            health_status = snapshot['containers']
             
             # Log and store report
             report = {
@@ -206,16 +351,36 @@ class HeadyMIDIController:
             
         except Exception as e:
             await self._notify_error(f"Health report failed: {e}")
+            raise
     
-    async def _docker_compose(self, command: str):
-        """Execute docker-compose command"""
-        # TODO: Implement actual docker-compose execution
-        logger.info(f"Executing: docker-compose {command}")
+    # Blocking docker SDK and Oracle API calls, run on the executor's thread pool
+    def _start_container(self, name: str):
+        self.docker_client.containers.get(name).start()
+    
+    def _restart_container(self, name: str):
+        self.docker_client.containers.get(name).restart()
     
-    async def _update_env_var(self, container_name: str, key: str, value: str):
-        """Update environment variable in container"""
-        # TODO: Implement environment variable update
-        logger.info(f"Updating {container_name}: {key}={value}")
+    def _signal_container(self, name: str, signal: str):
+        self.docker_client.containers.get(name).kill(signal=signal)
+    
+    def _exec_in_container(self, name: str, command):
+        exit_code, output = self.docker_client.containers.get(name).exec_run(command)
+        if exit_code:
+            raise RuntimeError(f"{' '.join(command)} exited with {exit_code}: {output.decode(errors='replace')[-200:]}")
+        return output
+    
+    def _put_oracle(self, path: str, params: Dict) -> Dict:
+        response = requests.put(f"{self.oracle_url}{path}", params=params, timeout=self.oracle_timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _docker_compose(self, command: str):
+        """Execute docker-compose command (``pull`` pulls services in parallel)"""
+        args = shlex.split(command)
+        if args[:1] == ['pull']:
+            await self.compose.pull(args[1:])
+        else:
+            await self.compose.run(args)
     
     async def _notify_success(self, message: str):
         """Send success notification"""
@@ -227,14 +392,43 @@ class HeadyMIDIController:
         logger.error(f"❌ {message}")
         # TODO: Send to notification system
 
+    async def shutdown(self):
+        """Let running actions finish, then close the MIDI ports"""
+        await self.controls.close()
+        await self.executor.shutdown()
+        self.container_state.stop()
+        self.close()
+
+    def close(self):
+        """Close the MIDI ports"""
+        self.midi_reader.close()
+        self.midi_input = None
+        if self.midi_output:
+            self.midi_output.close()
+            self.midi_output = None
+
+    def latency_stats(self) -> Dict:
+        """Snapshot of note-to-action latency and MIDI input counters"""
+        return {
+            "dispatch": self.dispatch_latency.stats(),
+            "action": self.action_latency.stats(),
+            "input": self.midi_reader.stats(),
+        }
+
 # Global MIDI controller instance
 midi_controller = HeadyMIDIController()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize MIDI bridge on startup"""
+    midi_controller.container_state.start(asyncio.get_running_loop())
     await midi_controller.initialize()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Finish running actions and release the MIDI ports on shutdown"""
+    await midi_controller.shutdown()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -242,10 +436,55 @@ async def health_check():
         "status": "healthy",
         "midi_input": midi_controller.midi_input is not None,
         "midi_output": midi_controller.midi_output is not None,
+        "midi_latency": midi_controller.latency_stats(),
         "service": "HeadySync MIDI Bridge",
         "version": "1.0.0"
     }
 
+@app.get("/health/containers")
+async def container_health():
+    """Cached status and health of the Heady containers; stale entries refresh in the background"""
+    snapshot = await midi_controller.container_state.snapshot(wait=False)
+    snapshot["cache"] = midi_controller.container_state.stats()
+    return snapshot
+
+@app.get("/compose")
+async def get_compose():
+    """Running and recent compose operations with per-step durations"""
+    return midi_controller.compose.stats()
+
+@app.post("/compose/cancel")
+async def cancel_compose():
+    """Terminate every running compose step"""
+    await midi_controller.compose.cancel()
+    return midi_controller.compose.stats()
+
+async def _unsubscribe_on_disconnect(websocket: WebSocket, queue: asyncio.Queue):
+    """Consume client frames until the client goes away (they carry nothing we act on)"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            midi_controller.compose.unsubscribe(queue)
+            return
+
+@app.websocket("/ws/compose")
+async def stream_compose_output(websocket: WebSocket):
+    """Live compose output; one JSON object per line of stdout/stderr or step status"""
+    await websocket.accept()
+    queue = midi_controller.compose.subscribe()
+    receiver = asyncio.create_task(_unsubscribe_on_disconnect(websocket, queue))
+    try:
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            await websocket.send_json(message)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        pass
+    finally:
+        receiver.cancel()
+        midi_controller.compose.unsubscribe(queue)
+
 @app.get("/mappings")
 async def get_mappings():
     """Get current MIDI to action mappings"""
@@ -254,12 +493,28 @@ async def get_mappings():
         "total_mappings": len(midi_controller.action_map)
     }
 
+@app.get("/actions")
+async def get_actions():
+    """Running and queued actions, recent outcomes and executor counters"""
+    return midi_controller.executor.stats()
+
+@app.get("/controls")
+async def get_controls():
+    """Latest and applied value of each continuous controller"""
+    return midi_controller.controls.stats()
+
 @app.post("/simulate/{action}")
-async def simulate_midi_action(action: str):
-    """Simulate MIDI action for testing"""
-    if action in midi_controller.action_map:
-        await midi_controller.action_map[action]()
-        return {"message": f"Executed {action}"}
+async def simulate_midi_action(action: str, value: Optional[int] = None):
+    """Simulate MIDI action for testing (``value`` 0-127 for CC knobs)"""
+    if action.startswith('CC') and action in midi_controller.action_map:
+        if value is None or not 0 <= value <= 127:
+            return {"error": f"{action} needs a value between 0 and 127"}
+        midi_controller.controls.submit(action, midi_controller.action_map[action], value)
+        return {"action": action, "value": value, "status": "coalescing"}
+    elif action in midi_controller.action_map:
+        return midi_controller.trigger(action, source='api')
+    elif action in UNSUPPORTED_TRIGGERS:
+        return {"error": f"{action} is not supported: {UNSUPPORTED_TRIGGERS[action]}"}
     else:
         return {"error": f"Unknown action: {action}"}
 
@@ -0,0 +1,153 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Event-Driven MIDI Input                  ║
+║  "Every hit lands the moment it is played"                        ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Reads a MIDI input port through mido's callback, which the rtmidi backend
+invokes on its own thread as each message arrives, and hands every message
+to the event loop with ``call_soon_threadsafe``. Nothing polls: the loop
+sleeps until a pad is hit, and the hit is queued without waiting for the
+next tick of a polling interval.
+
+Each message is stamped on arrival, so the bridge can measure how long a
+hit takes to reach its action (dispatch latency) and to complete it.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import mido
+
+logger = logging.getLogger(__name__)
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+# General MIDI percussion (channel 10) notes sent by the Pyle drum kit
+DRUM_NOTES = {
+    36: 'kick_drum',
+    38: 'snare',
+    40: 'snare',
+    42: 'hi_hat',
+    46: 'hi_hat',
+    43: 'low_tom',
+    45: 'low_tom',
+    47: 'mid_tom',
+    48: 'hi_tom',
+    50: 'hi_tom',
+    49: 'crash_cymbal',
+    57: 'crash_cymbal',
+    51: 'ride_cymbal',
+    59: 'ride_cymbal',
+}
+DRUM_CHANNEL = 9
+
+
+def note_name(note: int) -> str:
+    """Scientific pitch name of a MIDI note number (60 is C4)"""
+    return f"{NOTE_NAMES[note % 12]}{note // 12 - 1}"
+
+
+def trigger_name(msg) -> str:
+    """Name a note_on message is mapped by: a drum on channel 10, otherwise its pitch"""
+    if msg.channel == DRUM_CHANNEL and msg.note in DRUM_NOTES:
+        return DRUM_NOTES[msg.note]
+    return note_name(msg.note)
+
+
+class LatencyTracker:
+    """Recent latency samples and their percentiles"""
+
+    def __init__(self, size: int = 1024):
+        self.samples = collections.deque(maxlen=size)
+
+        # Metrics
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def stats(self) -> Dict:
+        """Snapshot of recent latencies in milliseconds"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000.0, 3)
+
+        return {
+            "count": self.count,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max * 1000.0, 3),
+        }
+
+
+class MidiInputReader:
+    """Queues messages from a MIDI input port on the event loop as they arrive.
+
+    Messages are ``(message, received_at)`` pairs, ``received_at`` being the
+    ``time.perf_counter()`` of arrival. The queue holds at most
+    ``max_pending`` messages; beyond that new ones are dropped and counted.
+    """
+
+    def __init__(self, max_pending: int = 1024):
+        self.max_pending = max_pending
+        self.port = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.received = 0
+        self.dropped = 0
+
+    def open(self, device_name: str, loop: asyncio.AbstractEventLoop):
+        """Open ``device_name`` and deliver its messages to ``loop``"""
+        self._loop = loop
+        self.queue = asyncio.Queue(self.max_pending)
+        self.port = mido.open_input(device_name, callback=self._on_message)
+        return self.port
+
+    def _on_message(self, msg):
+        """Called on the MIDI backend's thread for every incoming message"""
+        received_at = time.perf_counter()
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, msg, received_at)
+        except RuntimeError:
+            pass  # event loop closed during shutdown
+
+    def _enqueue(self, msg, received_at: float):
+        try:
+            self.queue.put_nowait((msg, received_at))
+            self.received += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"MIDI input queue full, dropped {msg}")
+
+    async def get(self) -> Tuple[object, float]:
+        return await self.queue.get()
+
+    def close(self):
+        if self.port is not None:
+            self.port.close()
+            self.port = None
+
+    def stats(self) -> Dict:
+        """Snapshot of messages received and queued"""
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "pending": self.queue.qsize() if self.queue else 0,
+            "max_pending": self.max_pending,
+        }
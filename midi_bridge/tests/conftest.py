@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bridge runs as ``python -m src.midi_bridge`` from midi_bridge/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
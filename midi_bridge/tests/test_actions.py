@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.actions import ActionExecutor
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_rejects_unknown_overlap_policy():
+    with pytest.raises(ValueError):
+        ActionExecutor(overlap='drop')
+
+
+def test_repeated_hit_within_debounce_is_ignored():
+    calls = []
+
+    async def scenario():
+        executor = ActionExecutor(debounce=10.0)
+
+        async def operation():
+            calls.append(1)
+
+        first = executor.submit('restart', operation)
+        second = executor.submit('restart', operation)
+        await executor.shutdown()
+        return first, second, executor
+
+    first, second, executor = run(scenario())
+    assert first['status'] == 'started'
+    assert second['status'] == 'debounced'
+    assert calls == [1]
+    assert executor.debounced == 1
+
+
+def test_group_members_queue_behind_each_other():
+    order = []
+
+    async def scenario():
+        executor = ActionExecutor(debounce=0, max_queued=1, groups={'deploy': 'stack', 'restart': 'stack'})
+        release = asyncio.Event()
+
+        async def deploy():
+            order.append('deploy started')
+            await release.wait()
+            order.append('deploy done')
+
+        async def restart():
+            order.append('restart')
+
+        outcomes = [executor.submit('deploy', deploy), executor.submit('restart', restart)]
+        await asyncio.sleep(0)
+        in_flight = executor.in_flight()
+        release.set()
+        await asyncio.sleep(0.01)  # shutdown drops what is still queued
+        await executor.shutdown()
+        return outcomes, in_flight
+
+    outcomes, in_flight = run(scenario())
+    assert [outcome['status'] for outcome in outcomes] == ['started', 'queued']
+    assert [r['action'] for r in in_flight['running']] == ['deploy']
+    assert [r['action'] for r in in_flight['queued']] == ['restart']
+    assert order == ['deploy started', 'deploy done', 'restart']
+
+
+def test_overlap_beyond_the_queue_is_rejected():
+    async def scenario():
+        executor = ActionExecutor(debounce=0, overlap='reject', groups={'a': 'stack', 'b': 'stack'})
+        release = asyncio.Event()
+        started = executor.submit('a', release.wait)
+        rejected = executor.submit('b', release.wait)
+        release.set()
+        await executor.shutdown()
+        return started, rejected, executor
+
+    started, rejected, executor = run(scenario())
+    assert started['status'] == 'started'
+    assert rejected == {'action': 'b', 'status': 'rejected', 'busy_with': 'a'}
+    assert executor.rejected == 1
+
+
+def test_failures_are_recorded():
+    async def scenario():
+        executor = ActionExecutor(debounce=0)
+
+        async def operation():
+            raise RuntimeError("daemon unreachable")
+
+        executor.submit('restart', operation)
+        await asyncio.sleep(0.01)
+        await executor.shutdown()
+        return executor.stats()
+
+    stats = run(scenario())
+    assert stats['failed'] == 1
+    assert stats['recent'][-1]['ok'] is False
+    assert stats['recent'][-1]['error'] == 'daemon unreachable'
+
+
+def test_run_blocking_keeps_the_loop_free():
+    async def scenario():
+        executor = ActionExecutor()
+        gate = threading.Event()
+        blocked = asyncio.ensure_future(executor.run_blocking(gate.wait, 5))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()  # the loop kept running while the call blocks
+        gate.set()
+        result = await blocked
+        await executor.shutdown()
+        return result
+
+    assert run(scenario()) is True
@@ -0,0 +1,74 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def bridge():
+    # The module builds its controller at import; no Docker daemon is needed for these tests
+    with mock.patch('docker.from_env', return_value=mock.MagicMock()):
+        from src import midi_bridge
+    return midi_bridge
+
+
+@pytest.fixture
+def controller(bridge):
+    controller = bridge.midi_controller
+    controller.docker_client = mock.MagicMock()
+    return controller
+
+
+def test_unsupported_triggers_are_not_mapped(bridge):
+    assert not set(bridge.UNSUPPORTED_TRIGGERS) & set(bridge.midi_controller.action_map)
+    mappings = asyncio.run(bridge.get_mappings())
+    assert 'G4' not in mappings['action_map'] and 'CC1' not in mappings['action_map']
+
+
+def test_simulating_an_unsupported_trigger_reports_it(bridge):
+    response = asyncio.run(bridge.simulate_midi_action('hi_hat'))
+    assert 'not supported' in response['error']
+    assert 'Unknown action' in asyncio.run(bridge.simulate_midi_action('cowbell'))['error']
+
+
+def test_backup_runs_influx_backup_in_the_vault(controller):
+    container = controller.docker_client.containers.get.return_value
+    container.exec_run.return_value = (0, b'')
+    asyncio.run(controller.backup_data())
+    controller.docker_client.containers.get.assert_called_with('heady_vault')
+    command = container.exec_run.call_args.args[0]
+    assert command[:2] == ['influx', 'backup']
+
+
+def test_rotate_logs_signals_the_broker(controller):
+    asyncio.run(controller.rotate_logs())
+    controller.docker_client.containers.get.assert_called_with('heady_mqtt')
+    controller.docker_client.containers.get.return_value.kill.assert_called_with(signal='SIGHUP')
+
+
+def test_failed_restart_is_recorded_as_failed(controller):
+    controller.docker_client.containers.get.return_value.restart.side_effect = RuntimeError("daemon gone")
+
+    async def scenario():
+        failed = controller.executor.failed
+        assert controller.trigger('E4', source='test')['status'] == 'started'
+        while controller.executor.in_flight()['running']:
+            await asyncio.sleep(0.01)
+        return controller.executor.failed - failed, controller.executor.stats()['recent'][-1]
+
+    newly_failed, outcome = asyncio.run(scenario())
+    assert newly_failed == 1
+    assert outcome['action'] == 'restart_oracle' and not outcome['ok']
+    assert 'daemon gone' in outcome['error']
+
+
+def test_partial_restart_of_all_services_fails(controller):
+    def get(name):
+        container = mock.MagicMock()
+        if name == 'heady_viz':
+            container.restart.side_effect = RuntimeError("no such container")
+        return container
+
+    controller.docker_client.containers.get.side_effect = get
+    with pytest.raises(RuntimeError, match='heady_viz'):
+        asyncio.run(controller.restart_all_services())
@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from src.compose import ComposeEngine, ComposeStepError
+
+# Stands in for docker-compose: logs its arguments, "pulls" slowly, prints the service list
+FAKE_COMPOSE = textwrap.dedent('''
+    import sys, time
+    args = sys.argv[2:]
+    with open(sys.argv[1], 'a') as log:
+        log.write(' '.join(args) + '\\n')
+    if args[:1] == ['config']:
+        print('a'); print('b'); print('c')
+    elif args[:1] == ['pull']:
+        time.sleep(float(args[2]) if len(args) > 2 else 0.3)
+    elif args[:1] == ['fail']:
+        sys.exit(3)
+''')
+
+
+@pytest.fixture
+def engine(tmp_path):
+    script = tmp_path / 'fake_compose.py'
+    script.write_text(FAKE_COMPOSE)
+    log = tmp_path / 'calls.log'
+    log.write_text('')
+    engine = ComposeEngine(command=f"{sys.executable} {script} {log}", pull_concurrency=1)
+    engine.calls = lambda: log.read_text().splitlines()
+    return engine
+
+
+async def wait_for_calls(engine, count):
+    while len(engine.calls()) < count:
+        await asyncio.sleep(0.01)
+
+
+def test_run_captures_output_and_records_steps(engine):
+    async def scenario():
+        async with engine.operation('inspect') as op:
+            services = await engine.run(['config', '--services'], capture=True)
+        return services, op
+
+    services, op = asyncio.run(scenario())
+    assert services == ['a', 'b', 'c']
+    assert op.status == 'ok'
+    assert [step['status'] for step in op.steps] == ['ok']
+
+
+def test_non_zero_exit_fails_the_step(engine):
+    async def scenario():
+        with pytest.raises(ComposeStepError):
+            await engine.run(['fail'])
+
+    asyncio.run(scenario())
+    assert engine.failed_steps == 1
+
+
+def test_cancel_stops_queued_pulls_and_later_steps(engine):
+    async def deploy():
+        async with engine.operation('deploy') as op:
+            await engine.pull(['a', 'b', 'c'])
+            await engine.run(['up', '-d'])
+        return op
+
+    async def scenario():
+        task = asyncio.create_task(deploy())
+        await wait_for_calls(engine, 1)
+        await engine.cancel()
+        with pytest.raises(ComposeStepError):
+            await task
+        await asyncio.sleep(0.5)  # long enough for the queued pulls to have run, had they started
+
+    asyncio.run(scenario())
+    assert engine.calls() == ['pull a']
+    assert engine.stats()['recent'][-1]['status'] == 'cancelled'
+
+
+def test_cancel_between_steps_prevents_the_next_one(engine):
+    async def scenario():
+        pulled, resume = asyncio.Event(), asyncio.Event()
+
+        async def deploy():
+            async with engine.operation('deploy'):
+                await engine.run(['pull', 'a', '0'])
+                pulled.set()
+                await resume.wait()
+                await engine.run(['up', '-d'])
+
+        task = asyncio.create_task(deploy())
+        await pulled.wait()
+        cancelling = asyncio.create_task(engine.cancel())
+        await asyncio.sleep(0)
+        resume.set()
+        await cancelling
+        # cancel() returns only once the deploy has given up, so a 'down' now cannot race it
+        assert task.done()
+        with pytest.raises(ComposeStepError):
+            await task
+        async with engine.operation('emergency_stop'):
+            await engine.run(['down'])
+
+    asyncio.run(scenario())
+    assert engine.calls() == ['pull a 0', 'down']
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import docker
+
+from src.container_state import ContainerStateCache
+
+CONTAINERS = ['heady_mqtt', 'heady_vault']
+
+
+def fake_client(states):
+    client = mock.MagicMock()
+
+    def inspect(name):
+        if name not in states:
+            raise docker.errors.NotFound(name)
+        return {'State': {'Status': states[name], 'Health': {'Status': 'healthy'}}, 'Config': {'Image': 'img'}}
+
+    client.api.inspect_container.side_effect = inspect
+    return client
+
+
+def event(name, action):
+    return {'Action': action, 'Actor': {'Attributes': {'name': name}}, 'time': 1700000000}
+
+
+def test_first_snapshot_inspects_then_serves_from_cache():
+    client = fake_client({'heady_mqtt': 'running'})
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS)
+        cache.events_connected = True
+        first = await cache.snapshot()
+        second = await cache.snapshot()
+        cache.stop()
+        return first, second, cache
+
+    first, second, cache = asyncio.run(scenario())
+    assert first['containers']['heady_mqtt']['status'] == 'running'
+    assert first['containers']['heady_vault']['status'] == 'missing'
+    assert second == first
+    assert cache.inspects == 2
+    assert (cache.refreshes, cache.hits) == (1, 1)
+
+
+def test_events_update_entries_without_inspecting():
+    client = fake_client({'heady_mqtt': 'running', 'heady_vault': 'running'})
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS)
+        cache.events_connected = True
+        await cache.snapshot()
+        cache._apply_event(event('heady_vault', 'die'))
+        cache._apply_event(event('heady_mqtt', 'health_status: unhealthy'))
+        cache._apply_event(event('heady_mqtt', 'exec_start: sh'))
+        cache._apply_event(event('someone_else', 'die'))
+        snapshot = await cache.snapshot()
+        cache.stop()
+        return snapshot, cache
+
+    snapshot, cache = asyncio.run(scenario())
+    assert snapshot['containers']['heady_vault']['status'] == 'exited'
+    assert snapshot['containers']['heady_mqtt']['health'] == 'unhealthy'
+    assert snapshot['stale'] == []
+    assert cache.events == 3
+    assert cache.inspects == 2
+
+
+def test_unknown_event_and_reconnect_invalidate_entries():
+    client = fake_client({'heady_mqtt': 'running', 'heady_vault': 'running'})
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS)
+        cache._connected(True)
+        await cache.snapshot()
+        cache._apply_event(event('heady_vault', 'rename'))
+        invalid_after_event = cache.stale()
+        cache._connected(False)
+        cache._connected(True)
+        invalid_after_reconnect = cache.stale()
+        cache.stop()
+        return invalid_after_event, invalid_after_reconnect
+
+    after_event, after_reconnect = asyncio.run(scenario())
+    assert after_event == ['heady_vault']
+    assert after_reconnect == CONTAINERS
+
+
+def test_entries_age_out_while_the_stream_is_down():
+    client = fake_client({'heady_mqtt': 'running', 'heady_vault': 'running'})
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS, max_age=0.01)
+        await cache.snapshot()
+        await asyncio.sleep(0.02)
+        stale = cache.stale()
+        cache.stop()
+        return stale
+
+    assert asyncio.run(scenario()) == CONTAINERS
+
+
+def test_concurrent_snapshots_share_one_inspect_per_container():
+    gate = threading.Event()
+    client = fake_client({'heady_mqtt': 'running', 'heady_vault': 'running'})
+    inspect = client.api.inspect_container.side_effect
+
+    def slow_inspect(name):
+        gate.wait(1.0)
+        return inspect(name)
+
+    client.api.inspect_container.side_effect = slow_inspect
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS)
+        cache.events_connected = True
+        snapshots = asyncio.gather(cache.snapshot(), cache.snapshot())
+        await asyncio.sleep(0.01)
+        gate.set()
+        await snapshots
+        cache.stop()
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert client.api.inspect_container.call_count == 2
+    assert cache.inspects == 2
+
+
+def test_event_stream_thread_feeds_the_cache():
+    client = fake_client({'heady_mqtt': 'running', 'heady_vault': 'running'})
+    client.events.return_value = iter([event('heady_vault', 'stop')])
+
+    async def scenario():
+        cache = ContainerStateCache(client, CONTAINERS)
+        cache.start(asyncio.get_running_loop())
+        deadline = time.monotonic() + 1.0
+        while not cache.events and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        cache.stop()
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.events == 1
+    assert cache.connects == 1
+    assert cache._entries['heady_vault']['status'] == 'exited'
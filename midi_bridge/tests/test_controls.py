@@ -0,0 +1,102 @@
+import asyncio
+
+from src.controls import ControlCoalescer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sweep_applies_the_settled_value_once():
+    applied = []
+
+    async def scenario():
+        coalescer = ControlCoalescer(settle=0.05, min_interval=10.0)
+
+        async def handler(value):
+            applied.append(value)
+
+        for value in range(0, 128, 8):
+            coalescer.submit('CC1', handler, value)
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.2)
+        return coalescer.stats()['controllers']['CC1']
+
+    stats = run(scenario())
+    assert applied == [120]
+    assert stats['applied'] == 1
+    assert stats['coalesced'] == stats['received'] - 1
+    assert stats['applied_value'] == 120 and not stats['pending']
+
+
+def test_long_sweep_applies_once_per_interval():
+    applied = []
+
+    async def scenario():
+        coalescer = ControlCoalescer(settle=0.05, min_interval=0.05)
+
+        async def handler(value):
+            applied.append(value)
+
+        for value in range(30):
+            coalescer.submit('CC2', handler, value)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+
+    run(scenario())
+    assert 2 <= len(applied) < 30
+    assert applied[-1] == 29
+    assert applied == sorted(applied)
+
+
+def test_same_value_is_not_applied_again():
+    applied = []
+
+    async def scenario():
+        coalescer = ControlCoalescer(settle=0.01, min_interval=0.0)
+
+        async def handler(value):
+            applied.append(value)
+
+        coalescer.submit('CC1', handler, 64)
+        await asyncio.sleep(0.05)
+        coalescer.submit('CC1', handler, 64)
+        await asyncio.sleep(0.05)
+
+    run(scenario())
+    assert applied == [64]
+
+
+def test_failed_apply_is_not_counted_as_applied():
+    async def scenario():
+        coalescer = ControlCoalescer(settle=0.01, min_interval=0.0)
+
+        async def handler(value):
+            raise ConnectionError("oracle unreachable")
+
+        coalescer.submit('CC2', handler, 10)
+        await asyncio.sleep(0.05)
+        return coalescer.stats()['controllers']['CC2']
+
+    stats = run(scenario())
+    assert stats['applied'] == 0 and stats['failed'] == 1
+    assert stats['applied_value'] is None
+    assert stats['last_error'] == 'oracle unreachable'
+    assert not stats['pending']
+
+
+def test_close_cancels_pending_applies():
+    applied = []
+
+    async def scenario():
+        coalescer = ControlCoalescer(settle=10.0, min_interval=10.0)
+
+        async def handler(value):
+            applied.append(value)
+
+        coalescer.submit('CC1', handler, 1)
+        await coalescer.close()
+        return coalescer.stats()['controllers']['CC1']
+
+    stats = run(scenario())
+    assert applied == [] and stats['pending']
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from unittest import mock
+
+import mido
+
+from src.midi_input import LatencyTracker, MidiInputReader, note_name, trigger_name
+
+
+def test_trigger_names():
+    assert note_name(60) == 'C4'
+    assert note_name(67) == 'G4'
+    assert trigger_name(mido.Message('note_on', channel=9, note=36)) == 'kick_drum'
+    assert trigger_name(mido.Message('note_on', channel=0, note=36)) == 'C2'
+    assert trigger_name(mido.Message('note_on', channel=9, note=61)) == 'C#4'
+
+
+def test_latency_percentiles():
+    tracker = LatencyTracker(size=100)
+    assert tracker.stats() == {'count': 0}
+    for ms in range(1, 101):
+        tracker.record(ms / 1000.0)
+    stats = tracker.stats()
+    assert stats['count'] == 100
+    assert (stats['p50_ms'], stats['p99_ms'], stats['max_ms']) == (51.0, 100.0, 100.0)
+
+
+def test_messages_from_the_backend_thread_reach_the_loop():
+    async def scenario():
+        reader = MidiInputReader()
+        with mock.patch('mido.open_input') as open_input:
+            reader.open('Pyle Drums', asyncio.get_running_loop())
+        callback = open_input.call_args.kwargs['callback']
+        hit = mido.Message('note_on', channel=9, note=38, velocity=100)
+        thread = threading.Thread(target=callback, args=(hit,))
+        thread.start()
+        thread.join()
+        msg, received_at = await asyncio.wait_for(reader.get(), 1.0)
+        reader.close()
+        return msg, received_at, reader, open_input.return_value
+
+    msg, received_at, reader, port = asyncio.run(scenario())
+    assert trigger_name(msg) == 'snare'
+    assert received_at > 0
+    assert reader.received == 1
+    port.close.assert_called_once()
+
+
+def test_full_queue_drops_and_counts():
+    async def scenario():
+        reader = MidiInputReader(max_pending=1)
+        with mock.patch('mido.open_input'):
+            reader.open('Pyle Drums', asyncio.get_running_loop())
+        for note in (36, 38):
+            reader._on_message(mido.Message('note_on', channel=9, note=note))
+        await asyncio.sleep(0)
+        return reader.stats()
+
+    assert asyncio.run(scenario()) == {'received': 1, 'dropped': 1, 'pending': 1, 'max_pending': 1}
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - HeadyBrain Client Benchmark                  ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Drives HeadyBrainClient against the local stub (started in-process unless
+``--url`` is given) and reports throughput, HTTP requests issued and
+per-reading p50/p99 latency.
+
+    python benchmarks/bench_brain_client.py --readings 20000 --fields 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.brain_stub import BrainStub  # noqa: E402
+from src.brain_client import HeadyBrainClient  # noqa: E402
+from src.codec import SensorReading  # noqa: E402
+
+
+async def run(args):
+    stub = None
+    url = args.url
+    if url is None:
+        stub = BrainStub(args.latency_ms, args.jitter_ms)
+        port = await stub.start(port=0)
+        url = f"http://127.0.0.1:{port}/api/brain/analyze"
+
+    client = HeadyBrainClient(url, 0.95, batch_window=args.window_ms / 1000.0, max_batch=args.max_batch,
+                              max_in_flight=args.max_in_flight, timeout=args.timeout_ms / 1000.0)
+    await client.start()
+
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        reading = SensorReading(f"field-{i % args.fields}", f"soil-{i % 997}", 1760000000.0 + i,
+                                'sig', {'moisture': 0.31, 'temp_c': 18.4}, {'moisture': 0.31, 'temp_c': 18.4})
+        async with semaphore:
+            start = time.perf_counter()
+            await client.analyze(reading)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.readings)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    if stub is not None:
+        await stub.stop()
+
+    latencies.sort()
+    stats = client.stats()
+    print(f"readings:          {args.readings} across {args.fields} fields")
+    print(f"throughput:        {args.readings / elapsed:,.0f} readings/s")
+    print(f"http requests:     {stats['requests_sent']} ({stats['readings_per_request']} readings/request)")
+    print(f"failed/timed out:  {stats['requests_failed']}/{stats['requests_timed_out']}")
+    print(f"latency p50:       {latencies[len(latencies) // 2] * 1000:.1f} ms")
+    print(f"latency p99:       {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='existing HeadyBrain endpoint (default: in-process stub)')
+    parser.add_argument('--readings', type=int, default=20000)
+    parser.add_argument('--fields', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=2000, help='readings awaiting analysis at once')
+    parser.add_argument('--window-ms', type=float, default=20.0)
+    parser.add_argument('--max-batch', type=int, default=100)
+    parser.add_argument('--max-in-flight', type=int, default=16)
+    parser.add_argument('--timeout-ms', type=float, default=2000.0)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='stub response delay')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='stub response jitter')
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Payload Decoder Micro-benchmark              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Compares the installed payload decoders against the Oracle's original
+``payload.decode()`` + ``json.loads`` + per-key ``isinstance`` path on
+realistic sensor payload sizes.
+
+    python benchmarks/bench_decoders.py [--iterations 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.codec import PayloadDecoder  # noqa: E402
+
+REQUIRED_FIELDS = ['timestamp', 'sensor_id', 'signature', 'data']
+
+
+def make_payload(metrics: int, rng: random.Random) -> bytes:
+    """A signed reading with ``metrics`` numeric fields plus some metadata"""
+    data = {f"metric_{i:02d}": round(rng.uniform(-50, 150), 4) for i in range(metrics)}
+    data['battery_ok'] = True
+    data['firmware'] = '2.4.1'
+    return json.dumps({
+        'timestamp': 1760000000.0 + rng.random(),
+        'sensor_id': f"soil-{rng.randint(0, 9999):04d}",
+        'signature': 'A' * 86 + '==',
+        'data': data,
+    }).encode()
+
+
+def baseline_decode(field_id, raw):
+    """The Oracle's original decode path, kept for comparison"""
+    payload = json.loads(raw.decode())
+    if not all(field in payload for field in REQUIRED_FIELDS):
+        raise ValueError("missing fields")
+    return {key: value for key, value in payload['data'].items() if isinstance(value, (int, float))}
+
+
+def bench(decode, payloads, iterations):
+    count = len(payloads)
+    start = time.perf_counter()
+    for i in range(iterations):
+        decode('field-1', payloads[i % count])
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    sizes = {'small (4 metrics)': 4, 'medium (16 metrics)': 16, 'large (64 metrics)': 64}
+    decoders = [('baseline', baseline_decode)]
+    decoders += [(name, PayloadDecoder(name).decode) for name in PayloadDecoder.available()]
+
+    print(f"{'payload':<22}{'bytes':>7}  " + ''.join(f"{name:>12}" for name, _ in decoders))
+    for label, metrics in sizes.items():
+        payloads = [make_payload(metrics, rng) for _ in range(256)]
+        avg_bytes = sum(len(p) for p in payloads) // len(payloads)
+        row = f"{label:<22}{avg_bytes:>7}  "
+        for _, decode in decoders:
+            row += f"{bench(decode, payloads, args.iterations) * 1e6:>10.2f}us"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Binary Frame vs JSON Micro-benchmark         ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Compares wire size and decode time per reading of the JSON payload (with
+the fastest installed JSON decoder) against binary frames, signed with
+HMAC-SHA256 and carrying float64 or float32 values, one reading per frame
+and batched (a gateway flushing a sensor's backlog).
+
+    python benchmarks/bench_frames.py [--iterations 20000] [--batch 32]
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.codec import PayloadDecoder  # noqa: E402
+from src.frames import SIGNATURE_LENGTHS, FrameDecoder, encode_frame  # noqa: E402
+from src.verification import canonical_message  # noqa: E402
+
+SECRET = b'k' * 32
+
+
+def _sign(message: bytes) -> bytes:
+    return hmac.new(SECRET, message, hashlib.sha256).digest()
+
+
+def make_readings(metrics: int, count: int, rng: random.Random):
+    names = [f"metric_{i:02d}" for i in range(metrics)]
+    timestamps = [1760000000.0 + i + rng.random() for i in range(count)]
+    values = [[round(rng.uniform(-50, 150), 4) for _ in names] for _ in range(count)]
+    return names, timestamps, values
+
+
+def json_payload(sensor_id, names, timestamp, row) -> bytes:
+    data = dict(zip(names, row))
+    signature = base64.b64encode(_sign(canonical_message(timestamp, sensor_id, data))).decode()
+    return json.dumps({'timestamp': timestamp, 'sensor_id': sensor_id, 'signature': signature,
+                       'data': data}).encode()
+
+
+def frame_payload(sensor_id, names, timestamps, rows, float32=False) -> bytes:
+    return encode_frame(sensor_id, names, timestamps, rows, float32=float32, sign=_sign,
+                        signature_length=SIGNATURE_LENGTHS['hmac-sha256'])
+
+
+def bench(decode, payloads, iterations):
+    """Seconds per decode call"""
+    count = len(payloads)
+    start = time.perf_counter()
+    for i in range(iterations):
+        decode('field-1', payloads[i % count])
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=32, help='readings per batched frame')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    json_decoder = PayloadDecoder()
+    frame_decoder = FrameDecoder()
+    sensor_id = 'soil-0042'
+
+    print(f"{'payload':<20}{'format':<26}{'bytes/reading':>14}{'us/reading':>12}{'speedup':>9}")
+    for metrics in (4, 16, 64):
+        names, timestamps, rows = make_readings(metrics, args.batch, rng)
+        variants = [
+            (f"json ({json_decoder.backend})", 1,
+             [json_payload(sensor_id, names, t, row) for t, row in zip(timestamps, rows)]),
+            ("frame f64 x1", 1,
+             [frame_payload(sensor_id, names, [t], [row]) for t, row in zip(timestamps, rows)]),
+            ("frame f32 x1", 1,
+             [frame_payload(sensor_id, names, [t], [row], float32=True) for t, row in zip(timestamps, rows)]),
+            (f"frame f64 x{args.batch}", args.batch, [frame_payload(sensor_id, names, timestamps, rows)]),
+            (f"frame f32 x{args.batch}", args.batch,
+             [frame_payload(sensor_id, names, timestamps, rows, float32=True)]),
+        ]
+        baseline = None
+        for label, per_payload, payloads in variants:
+            decode = json_decoder.decode if label.startswith('json') else frame_decoder.decode
+            iterations = max(1, args.iterations // per_payload)
+            per_reading = bench(decode, payloads, iterations) / per_payload
+            size = sum(len(p) for p in payloads) / (len(payloads) * per_payload)
+            baseline = baseline or per_reading
+            print(f"{f'{metrics} metrics':<20}{label:<26}{size:>14.0f}{per_reading * 1e6:>12.2f}"
+                  f"{baseline / per_reading:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
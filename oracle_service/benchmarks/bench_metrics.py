@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Instrumentation Overhead Benchmark           ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Measures the cost of the metric operations used on the ingest hot path and
+of the per-message instrumentation as a whole (the accepted and stored
+field counters, tallied per batch, plus the per-batch stage histograms,
+amortized).
+
+    python benchmarks/bench_metrics.py [--iterations 1000000] [--batch 256]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.metrics import BoundedCounter, MetricsRegistry  # noqa: E402
+
+
+def per_op(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    fn(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=256, help='messages per ingest batch')
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('c_total', 'counter')
+    labelled = registry.counter('l_total', 'labelled', ['field_id', 'outcome'])
+    bounded = BoundedCounter(labelled, limit=500)
+    histogram = registry.histogram('h_seconds', 'histogram', ['stage'])
+    stage = histogram.labels('decode')
+    fields = [f"field-{i}" for i in range(100)]
+
+    def counter_inc(n):
+        for _ in range(n):
+            counter.inc()
+
+    def labelled_inc(n):
+        for i in range(n):
+            labelled.labels(fields[i % 100], 'accepted').inc()
+
+    def histogram_observe(n):
+        for i in range(n):
+            stage.observe(i * 1e-7)
+
+    batch = [fields[i % 100] for i in range(args.batch)]
+
+    def per_message(n):
+        # Per batch: accepted + stored counters over the batch's field ids, 5 clock reads, 4 observations
+        perf_counter = time.perf_counter
+        for _ in range(n // args.batch):
+            started = perf_counter()
+            bounded.count(batch, 'accepted')
+            bounded.count(batch, 'stored')
+            for _ in range(4):
+                stage.observe(perf_counter() - started)
+
+    def baseline(n):
+        for i in range(n):
+            fields[i % 100]
+
+    base = per_op(baseline, args.iterations)
+    print(f"counter.inc():               {per_op(counter_inc, args.iterations) - base:7.1f} ns")
+    print(f"labels(...).inc():           {per_op(labelled_inc, args.iterations) - base:7.1f} ns")
+    print(f"histogram.observe():         {per_op(histogram_observe, args.iterations) - base:7.1f} ns")
+    print(f"per message (batch {args.batch:>4}):   {per_op(per_message, args.iterations):7.1f} ns")
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"render /metrics:             {(time.perf_counter() - start) * 1e3:7.2f} ms ({len(body)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - End-to-End Ingest Benchmark                  ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Drives a real HeadyOracle with synthetic ``field/<id>/sensors`` payloads (or
+binary frames on ``field/<id>/sensors/bin`` with ``--binary``) and
+measures the whole ingest path: queue, decode, verify, score, store and the
+batched vault write. InfluxDB is replaced by an in-process fake that records
+when each line arrives, so latency is measured from the payload timestamp
+(stamped just before the message is handed to the Oracle) to the vault.
+
+By default messages are injected through ``_on_mqtt_message`` from a
+generator thread, standing in for the paho network thread. With ``--mqtt``
+they are published to a broker instead and the Oracle subscribes as it does
+in production (e.g. ``docker run -p 1883:1883 eclipse-mosquitto``).
+
+Reports throughput, p50/p99 latency, CPU and RSS. The ``--min-rate``,
+``--max-p99-ms``, ``--max-rss-mb`` and ``--max-drop-rate`` flags turn a run
+into a pass/fail regression gate; ``--json`` writes the results for CI.
+
+    python benchmarks/bench_oracle_e2e.py --messages 200000 --rate 20000 --fields 100
+    python benchmarks/bench_oracle_e2e.py --rate 0 --min-rate 15000 --max-p99-ms 1500
+"""
+
+import argparse
+import array
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.brain_stub import BrainStub  # noqa: E402
+from src.frames import SIGNATURE_LENGTHS, encode_frame  # noqa: E402
+from src.verification import canonical_message  # noqa: E402
+
+
+class FakeWriteApi:
+    """In-process InfluxDB stand-in recording per-line end-to-end latency"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self.records = 0
+        self.batches = 0
+        self.last_write = 0.0
+        self.latencies = array.array('d')
+
+    def write(self, bucket, org=None, record=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        now = time.time()
+        # The line protocol timestamp (ns) is the generator's send time
+        self.latencies.extend(now - int(line[line.rfind(' ') + 1:]) * 1e-9 for line in record)
+        self.records += len(record)
+        self.batches += 1
+        self.last_write = time.perf_counter()
+
+
+class LoadGenerator:
+    """Produces signed or unsigned sensor payloads at a target rate on its own thread"""
+
+    def __init__(self, fields: int, sensors: int, metrics: int, anomaly_rate: float,
+                 sign_alg: str = 'none', duplicate_rate: float = 0.0, binary: bool = False, seed: int = 7):
+        rng = random.Random(seed)
+        self.binary = binary
+        self.topics = [f"field/field-{i}/sensors" + ("/bin" if binary else "") for i in range(fields)]
+        self.sensors = [f"soil-{i}" for i in range(sensors)]
+        self.metrics = [f"m{i}" for i in range(metrics)]
+        self.baselines = [rng.uniform(1, 100) for _ in self.metrics]
+        self.noise = [rng.gauss(0, 1) for _ in range(4093)]
+        self.anomaly_rate = anomaly_rate
+        self.duplicate_rate = duplicate_rate
+        self.sign_alg = sign_alg
+        self._rng = rng
+        self._keys = {}
+        self.sent = 0
+        self.elapsed = 0.0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def keyring(self) -> dict:
+        """Create a key per sensor and return the Oracle keyring for them"""
+        if self.sign_alg == 'ed25519':
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+            from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+            keyring = {}
+            for sensor_id in self.sensors:
+                key = self._keys[sensor_id] = Ed25519PrivateKey.generate()
+                public = key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+                keyring[sensor_id] = {'alg': 'ed25519', 'key': base64.b64encode(public).decode()}
+            return keyring
+        keyring = {}
+        for sensor_id in self.sensors:
+            secret = self._keys[sensor_id] = os.urandom(32)
+            keyring[sensor_id] = {'alg': 'hmac-sha256', 'key': base64.b64encode(secret).decode()}
+        return keyring
+
+    def _sign(self, timestamp: float, sensor_id: str, data: dict) -> str:
+        message = canonical_message(timestamp, sensor_id, data)
+        key = self._keys[sensor_id]
+        if self.sign_alg == 'ed25519':
+            return base64.b64encode(key.sign(message)).decode()
+        return base64.b64encode(hmac.new(key, message, hashlib.sha256).digest()).decode()
+
+    def _sign_frame(self, sensor_id: str, message: bytes) -> bytes:
+        key = self._keys[sensor_id]
+        if self.sign_alg == 'ed25519':
+            return key.sign(message)
+        return hmac.new(key, message, hashlib.sha256).digest()
+
+    def payload(self, i: int) -> tuple:
+        sensor_id = self.sensors[i % len(self.sensors)]
+        noise = self.noise
+        n = len(noise)
+        data = {metric: round(base + noise[(i + k * 31) % n], 4)
+                for k, (metric, base) in enumerate(zip(self.metrics, self.baselines))}
+        if self.anomaly_rate and self._rng.random() < self.anomaly_rate:
+            data[self.metrics[0]] *= 10
+        timestamp = round(time.time(), 6)
+        if self.binary:
+            sign = None
+            if self.sign_alg != 'none':
+                def sign(message):
+                    return self._sign_frame(sensor_id, message)
+            frame = encode_frame(sensor_id, self.metrics, [timestamp], [list(data.values())], sign=sign,
+                                 signature_length=SIGNATURE_LENGTHS.get(self.sign_alg, 0))
+            return self.topics[i % len(self.topics)], frame
+        signature = self._sign(timestamp, sensor_id, data) if self.sign_alg != 'none' else 'unsigned'
+        body = {'timestamp': timestamp, 'sensor_id': sensor_id, 'signature': signature, 'data': data}
+        return self.topics[i % len(self.topics)], json.dumps(body).encode()
+
+    def start(self, send, total: int, rate: float):
+        self._thread = threading.Thread(target=self._run, args=(send, total, rate),
+                                        name='heady-loadgen', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def done(self) -> bool:
+        return self._thread is not None and not self._thread.is_alive()
+
+    def _run(self, send, total: int, rate: float):
+        start = time.perf_counter()
+        duplicate_rng = random.Random(11)
+        message = None
+        for i in range(total):
+            if rate and i % 32 == 0:
+                ahead = i / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+                if self._stopped.is_set():
+                    break
+            # Redeliver the previous message, as a QoS 1 retry would
+            if message is None or not self.duplicate_rate or duplicate_rng.random() >= self.duplicate_rate:
+                message = self.payload(i)
+            send(*message)
+            self.sent += 1
+        self.elapsed = time.perf_counter() - start
+
+
+def configure_env(args, keyring_path, brain_url):
+    """Oracle configuration for the run; must be set before src.oracle_server is imported"""
+    os.environ['ORACLE_SPOOL_DIR'] = ''
+    os.environ['ORACLE_COLUMNAR_DIR'] = args.columnar or ''
+    os.environ['HEADY_BRAIN_ENDPOINT'] = brain_url or ''
+    os.environ['INFLUX_FLUSH_INTERVAL_MS'] = str(args.flush_ms)
+    os.environ['ORACLE_INGEST_WORKERS'] = str(args.workers)
+    os.environ['ORACLE_INGEST_BATCH_SIZE'] = str(args.batch)
+    os.environ['ORACLE_INGEST_QUEUE_SIZE'] = str(args.queue_size)
+    os.environ['ORACLE_ADMISSION'] = 'off' if args.admission == 'off' else 'on'
+    os.environ['ORACLE_ADMISSION_MODE'] = 'auto' if args.admission == 'off' else args.admission
+    if keyring_path:
+        os.environ['ORACLE_SENSOR_KEYS'] = keyring_path
+    if args.mqtt:
+        host, _, port = args.mqtt.partition(':')
+        os.environ['MQTT_BROKER'] = host
+        os.environ['MQTT_PORT'] = port or '1883'
+
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def cpu_seconds(who=resource.RUSAGE_SELF) -> float:
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def run(args) -> dict:
+    generator = LoadGenerator(args.fields, args.sensors, args.metrics, args.anomaly_rate, args.sign,
+                              args.duplicate_rate, args.binary)
+
+    keyring_path = None
+    if args.sign != 'none':
+        keyring_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with keyring_file:
+            json.dump(generator.keyring(), keyring_file)
+        keyring_path = keyring_file.name
+
+    stub = None
+    brain_url = None
+    if args.brain_latency_ms > 0:
+        stub = BrainStub(args.brain_latency_ms, args.brain_latency_ms / 5)
+        port = await stub.start(port=0)
+        brain_url = f"http://127.0.0.1:{port}/api/brain/analyze"
+
+    configure_env(args, keyring_path, brain_url)
+    from src import oracle_server  # reads the environment at import time
+
+    oracle = oracle_server.HeadyOracle()
+    fake = FakeWriteApi(args.influx_latency_ms)
+    oracle.write_api = fake
+    oracle.loop_lag.start()
+    oracle.writer.start()
+    if oracle.columnar:
+        oracle.columnar.start()
+    oracle.verifier.start()
+    if oracle.brain:
+        await oracle.brain.start()
+    oracle._start_ingest_workers()
+
+    publisher = None
+    if args.mqtt:
+        from paho.mqtt.client import Client as MQTTClient
+        oracle.mqtt_link.start()
+        if not await oracle.mqtt_link.wait_up(10.0):
+            raise SystemExit(f"Could not connect to MQTT broker at {oracle.mqtt_broker}:{oracle.mqtt_port}")
+        publisher = MQTTClient()
+        publisher.username_pw_set(oracle.mqtt_username, oracle.mqtt_password)
+        publisher.connect(oracle.mqtt_broker, oracle.mqtt_port, 60)
+        publisher.loop_start()
+
+        def send(topic, payload):
+            publisher.publish(topic, payload, qos=0)
+    else:
+        def send(topic, payload):
+            oracle._on_mqtt_message(None, None, types.SimpleNamespace(topic=topic, payload=payload))
+
+    rss_before = rss_mb()
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    generator.start(send, args.messages, args.rate)
+
+    # Wait until every message is accounted for (stored, dropped or rejected)
+    deadline = None
+    rss_peak = rss_before
+    while True:
+        await asyncio.sleep(0.05)
+        rss_peak = max(rss_peak, rss_mb())
+        settled = (fake.records + oracle.ingest_queue.dropped + oracle.messages_failed
+                   + oracle.messages_invalid + oracle.router.skipped
+                   + (oracle.dedup.duplicates if oracle.dedup else 0)
+                   + (oracle.admission.shed if oracle.admission else 0))
+        if generator.done():
+            if settled >= generator.sent:
+                break
+            deadline = deadline or time.perf_counter() + args.drain_timeout
+            if time.perf_counter() > deadline:
+                print(f"WARNING: {generator.sent - settled} messages unaccounted for after "
+                      f"{args.drain_timeout}s drain timeout")
+                break
+    elapsed = (fake.last_write or time.perf_counter()) - started
+    cpu_used = cpu_seconds() - cpu_before
+
+    if publisher is not None:
+        publisher.loop_stop()
+        publisher.disconnect()
+    await oracle.shutdown()
+    if stub is not None:
+        await stub.stop()
+    if keyring_path:
+        os.unlink(keyring_path)
+
+    latencies = np.frombuffer(fake.latencies, dtype=np.float64) * 1000.0
+    p50, p99, p_max = (np.percentile(latencies, [50, 99, 100]).tolist() if len(latencies)
+                       else (0.0, 0.0, 0.0))
+    sent = generator.sent
+    return {
+        'messages_sent': sent,
+        'messages_stored': fake.records,
+        'messages_dropped': oracle.ingest_queue.dropped,
+        'messages_rejected': oracle.messages_failed + oracle.messages_invalid,
+        'drop_rate': oracle.ingest_queue.dropped / sent if sent else 0.0,
+        'offered_rate': sent / generator.elapsed if generator.elapsed else 0.0,
+        'throughput': fake.records / elapsed if elapsed > 0 else 0.0,
+        'latency_ms_p50': p50,
+        'latency_ms_p99': p99,
+        'latency_ms_max': p_max,
+        'cpu_cores': cpu_used / elapsed if elapsed > 0 else 0.0,
+        'cpu_children_s': cpu_seconds(resource.RUSAGE_CHILDREN),
+        'rss_mb_start': rss_before,
+        'rss_mb_peak': rss_peak,
+        'influx_batches': fake.batches,
+        'brain_readings': oracle.brain.readings_submitted if oracle.brain else 0,
+        'queue_high_water': oracle.ingest_queue.high_water,
+        'messages_skipped': oracle.router.skipped,
+        'messages_duplicate': oracle.dedup.duplicates if oracle.dedup else 0,
+        'messages_shed': oracle.admission.shed if oracle.admission else 0,
+        'admission_mode': oracle.admission.mode if oracle.admission else 'off',
+        'admission_escalations': oracle.admission.escalations if oracle.admission else 0,
+        'decoder': oracle.decoder.backend,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--rate', type=float, default=20000, help='offered messages/s (0 = as fast as possible)')
+    parser.add_argument('--fields', type=int, default=100, help='distinct field_ids')
+    parser.add_argument('--sensors', type=int, default=2000, help='distinct sensor_ids')
+    parser.add_argument('--metrics', type=int, default=4, help='measurements per payload')
+    parser.add_argument('--anomaly-rate', type=float, default=0.001)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0, help='fraction of messages redelivered')
+    parser.add_argument('--sign', choices=('none', 'hmac-sha256', 'ed25519'), default='none',
+                        help='sign payloads and verify them against a generated keyring')
+    parser.add_argument('--binary', action='store_true', help='send binary frames instead of JSON')
+    parser.add_argument('--mqtt', metavar='HOST[:PORT]', help='publish through this broker instead of injecting')
+    parser.add_argument('--workers', type=int, default=8, help='ORACLE_INGEST_WORKERS')
+    parser.add_argument('--batch', type=int, default=256, help='ORACLE_INGEST_BATCH_SIZE')
+    parser.add_argument('--queue-size', type=int, default=10000, help='ORACLE_INGEST_QUEUE_SIZE')
+    parser.add_argument('--admission', choices=('auto', 'off', 'normal', 'skip_analysis', 'store_only', 'sample'),
+                        default='auto', help='ORACLE_ADMISSION_MODE, or off to disable admission control')
+    parser.add_argument('--columnar', metavar='DIR', help='also archive readings to Parquet under DIR')
+    parser.add_argument('--flush-ms', type=int, default=100, help='INFLUX_FLUSH_INTERVAL_MS')
+    parser.add_argument('--influx-latency-ms', type=float, default=5.0, help='fake vault write latency')
+    parser.add_argument('--brain-latency-ms', type=float, default=0.0,
+                        help='serve HeadyBrain from the local stub with this latency (0 = disabled)')
+    parser.add_argument('--drain-timeout', type=float, default=30.0)
+    parser.add_argument('--json', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--min-rate', type=float, default=0.0, help='fail if throughput is below this')
+    parser.add_argument('--max-p99-ms', type=float, default=0.0, help='fail if p99 latency is above this')
+    parser.add_argument('--max-rss-mb', type=float, default=0.0, help='fail if peak RSS is above this')
+    parser.add_argument('--max-drop-rate', type=float, default=-1.0, help='fail if the drop rate is above this')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"messages:    {results['messages_sent']} sent, {results['messages_stored']} stored, "
+          f"{results['messages_dropped']} dropped, {results['messages_rejected']} rejected, "
+          f"{results['messages_skipped']} owned by other replicas, "
+          f"{results['messages_duplicate']} duplicates suppressed, {results['messages_shed']} shed")
+    print(f"admission:   {results['admission_mode']} at end, {results['admission_escalations']} escalations")
+    print(f"load:        {args.fields} fields x {args.sensors} sensors x {args.metrics} metrics, "
+          f"signing {args.sign}, decoder {'binary frames' if args.binary else results['decoder']}")
+    print(f"offered:     {results['offered_rate']:,.0f} msg/s")
+    print(f"throughput:  {results['throughput']:,.0f} msg/s stored")
+    print(f"latency:     p50 {results['latency_ms_p50']:.1f} ms, p99 {results['latency_ms_p99']:.1f} ms, "
+          f"max {results['latency_ms_max']:.1f} ms")
+    print(f"cpu:         {results['cpu_cores']:.2f} cores (+{results['cpu_children_s']:.1f}s in worker processes)")
+    print(f"rss:         {results['rss_mb_start']:.0f} MB at start, {results['rss_mb_peak']:.0f} MB peak")
+    print(f"vault:       {results['influx_batches']} batches; queue high water {results['queue_high_water']}; "
+          f"{results['brain_readings']} readings sent to HeadyBrain")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+    failures = []
+    if args.min_rate and results['throughput'] < args.min_rate:
+        failures.append(f"throughput below --min-rate {args.min_rate:,.0f}")
+    if args.max_p99_ms and results['latency_ms_p99'] > args.max_p99_ms:
+        failures.append(f"p99 latency above --max-p99-ms {args.max_p99_ms}")
+    if args.max_rss_mb and results['rss_mb_peak'] > args.max_rss_mb:
+        failures.append(f"peak RSS above --max-rss-mb {args.max_rss_mb}")
+    if args.max_drop_rate >= 0 and results['drop_rate'] > args.max_drop_rate:
+        failures.append(f"drop rate above --max-drop-rate {args.max_drop_rate}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
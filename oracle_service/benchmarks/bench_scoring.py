@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Anomaly Scoring Benchmark                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Measures AnomalyScorer throughput on one core. The target is 100k
+readings/s; ``--min-rate`` turns the run into a pass/fail gate.
+
+    python benchmarks/bench_scoring.py --readings 500000 --batch 256
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.codec import SensorReading  # noqa: E402
+from src.scoring import AnomalyScorer  # noqa: E402
+
+
+def make_readings(count: int, fields: int, sensors: int, anomaly_rate: float, seed: int = 7):
+    rng = random.Random(seed)
+    readings = []
+    for i in range(count):
+        sensor = rng.randrange(sensors)
+        moisture = rng.gauss(0.30, 0.02)
+        temp_c = rng.gauss(18.0, 0.5)
+        if rng.random() < anomaly_rate:
+            temp_c += rng.choice((-1, 1)) * rng.uniform(8, 20)
+        fields_ = {'moisture': moisture, 'temp_c': temp_c, 'ec_ms': rng.gauss(1.2, 0.05)}
+        readings.append(SensorReading(f"field-{sensor % fields}", f"soil-{sensor}", 1760000000.0 + i,
+                                      'sig', fields_, fields_))
+    return readings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readings', type=int, default=500000)
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--fields', type=int, default=100)
+    parser.add_argument('--sensors', type=int, default=2000)
+    parser.add_argument('--anomaly-rate', type=float, default=0.001)
+    parser.add_argument('--min-rate', type=float, default=0.0, help='fail if readings/s is below this')
+    args = parser.parse_args()
+
+    readings = make_readings(args.readings, args.fields, args.sensors, args.anomaly_rate)
+    scorer = AnomalyScorer(threshold=0.95)
+
+    start = time.perf_counter()
+    for i in range(0, len(readings), args.batch):
+        scorer.score_batch(readings[i:i + args.batch])
+    elapsed = time.perf_counter() - start
+
+    rate = len(readings) / elapsed
+    stats = scorer.stats()
+    print(f"readings:   {len(readings)} in batches of {args.batch} ({stats['series']} series)")
+    print(f"throughput: {rate:,.0f} readings/s on one core")
+    print(f"flagged:    {stats['readings_flagged']} "
+          f"({stats['readings_flagged'] / len(readings):.3%}, injected ~{args.anomaly_rate:.3%})")
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below --min-rate {args.min_rate:,.0f}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Live Fan-Out Benchmark                       ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Publishes readings into the fan-out hub with thousands of subscribers
+attached, each watching one field (plus a few watching everything), and
+reports the event-loop cost of publishing, deliveries per second and how
+much the slow subscribers were coalesced. Consumers only drain their
+buffers; socket I/O is not included.
+
+    python benchmarks/bench_streaming.py [--subscribers 5000] [--fields 200] [--rate 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.codec import SensorReading  # noqa: E402
+from src.streaming import FanoutHub  # noqa: E402
+
+
+async def consume(subscriber, counts: list):
+    while not subscriber.closed:
+        messages = await subscriber.next_batch(1.0)
+        counts[0] += len(messages)
+        await asyncio.sleep(subscriber.interval)
+
+
+async def run(args) -> dict:
+    rng = random.Random(7)
+    hub = FanoutHub(max_subscribers=args.subscribers + args.firehose, buffer=args.buffer,
+                    min_interval=args.min_interval_ms / 1000.0)
+    fields = [f"field-{i:03d}" for i in range(args.fields)]
+    counts = [0]
+    consumers = []
+    for i in range(args.subscribers + args.firehose):
+        watched = None if i < args.firehose else {fields[i % args.fields]}
+        interval = 2.0 if rng.random() < args.slow_fraction else 0.0
+        consumers.append(asyncio.create_task(consume(hub.subscribe(watched, interval=interval), counts)))
+
+    batch = max(1, args.rate // 100)
+    publish_time = 0.0
+    published = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.duration:
+        readings = []
+        for _ in range(batch):
+            field_id = rng.choice(fields)
+            value = rng.uniform(0, 40)
+            readings.append(SensorReading(field_id, f"sensor-{rng.randrange(args.sensors)}", time.time(), '',
+                                          {'moisture': value}, {'moisture': value}, 1.0))
+        t0 = time.perf_counter()
+        hub.publish(readings)
+        publish_time += time.perf_counter() - t0
+        published += len(readings)
+        await asyncio.sleep(max(0.0, published / args.rate - (time.perf_counter() - started)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(2.1)
+    stats = hub.stats()
+    hub.close()
+    await asyncio.gather(*consumers)
+    return {
+        'readings': published,
+        'elapsed_s': elapsed,
+        'publish_us_per_reading': publish_time / published * 1e6,
+        'loop_share': publish_time / elapsed,
+        'delivered_per_s': counts[0] / elapsed,
+        'stats': stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=5000, help='subscribers watching one field each')
+    parser.add_argument('--firehose', type=int, default=5, help='subscribers watching every field')
+    parser.add_argument('--fields', type=int, default=200)
+    parser.add_argument('--sensors', type=int, default=20, help='sensors per field')
+    parser.add_argument('--rate', type=int, default=20000, help='readings/s published')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--buffer', type=int, default=1000, help='per-subscriber buffer (ORACLE_STREAM_BUFFER)')
+    parser.add_argument('--min-interval-ms', type=int, default=100, help='ORACLE_STREAM_MIN_INTERVAL_MS')
+    parser.add_argument('--slow-fraction', type=float, default=0.1, help='share of subscribers reading every 2s')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    stats = results['stats']
+    print(f"published:   {results['readings']} readings in {results['elapsed_s']:.1f}s to "
+          f"{stats['subscribers']} subscribers on {stats['watched_fields']} fields")
+    print(f"publish:     {results['publish_us_per_reading']:.2f} us/reading "
+          f"({results['loop_share']:.1%} of the event loop)")
+    print(f"delivered:   {results['delivered_per_s']:,.0f} readings/s, "
+          f"{stats['coalesced']} coalesced")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Local HeadyBrain Stub                        ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Minimal keep-alive HTTP/1.1 server that answers HeadyBrain analysis requests
+after a configurable delay, so the Oracle's brain client can be benchmarked
+offline. Point the Oracle at it with
+``HEADY_BRAIN_ENDPOINT=http://127.0.0.1:8099/api/brain/analyze``.
+
+    python benchmarks/brain_stub.py [--port 8099] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Dict
+
+
+class BrainStub:
+    """Answers every POST with one result per submitted reading"""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self.readings = 0
+        self.connections = 0
+        self._server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8099):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', '0')))
+                response = await self._analyze(body)
+                payload = json.dumps(response).encode()
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: ' + str(len(payload)).encode() + b'\r\n\r\n' + payload)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _analyze(self, body: bytes) -> Dict:
+        request = json.loads(body) if body else {}
+        readings = request.get('readings', [])
+        self.requests += 1
+        self.readings += len(readings)
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        await asyncio.sleep(delay / 1000.0)
+        return {'results': [{'sensor_id': r.get('sensor_id'), 'confidence': 0.99} for r in readings]}
+
+
+async def _serve(args):
+    stub = BrainStub(args.latency_ms, args.jitter_ms)
+    port = await stub.start(args.host, args.port)
+    print(f"HeadyBrain stub listening on http://{args.host}:{port}/api/brain/analyze")
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
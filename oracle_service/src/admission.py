@@ -0,0 +1,188 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Admission Control                            ║
+║  "Bend under load, do not break"                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Watches ingest queue depth, event-loop lag and InfluxDB write latency and
+steps the Oracle through progressively cheaper modes while any of them is
+over its limit:
+
+    normal         score, analyze suspicious readings with HeadyBrain, store
+    skip_analysis  score, store everything (no HeadyBrain round trips)
+    store_only     store without scoring or analysis
+    sample         store only every Nth message per field, drop the rest
+
+Each field has a priority (``high``, ``normal``, ``low``). Low-priority
+fields degrade one step ahead of the global mode, high-priority fields one
+step behind and are never sampled. The mode can be pinned at runtime, in
+which case the signals are still reported but no longer acted on.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ('normal', 'skip_analysis', 'store_only', 'sample')
+NORMAL, SKIP_ANALYSIS, STORE_ONLY, SAMPLE = range(len(MODES))
+
+PRIORITIES = {'high': -1, 'normal': 0, 'low': 1}
+_CAPS = {'high': STORE_ONLY, 'normal': SAMPLE, 'low': SAMPLE}
+
+
+def parse_priorities(spec: str) -> Dict[str, str]:
+    """Parse ``field_a:high,field_b:low`` into {field_id: priority}"""
+    priorities = {}
+    for entry in (part.strip() for part in spec.split(',')):
+        if not entry:
+            continue
+        field_id, _, priority = entry.rpartition(':')
+        if not field_id or priority not in PRIORITIES:
+            raise ValueError(f"Invalid field priority '{entry}', expected <field_id>:high|normal|low")
+        priorities[field_id] = priority
+    return priorities
+
+
+class AdmissionController:
+    """Chooses a processing mode per field from live load signals.
+
+    ``evaluate`` is called periodically. Pressure is the largest of the
+    signals relative to their limits; at 1.0 or above the mode steps up one
+    level (at most once per ``step_interval``), and after ``cooldown``
+    seconds below ``relax_below`` it steps back down one level.
+    """
+
+    def __init__(self, queue_fill: Callable[[], float], loop_lag: Callable[[], float],
+                 write_latency: Callable[[], float], queue_limit: float = 0.5,
+                 lag_limit: float = 0.1, write_limit: float = 1.0, sample_every: int = 10,
+                 priorities: Optional[Dict[str, str]] = None, step_interval: float = 1.0,
+                 cooldown: float = 10.0, relax_below: float = 0.5):
+        self._signals = {
+            "queue_fill": (queue_fill, queue_limit),
+            "loop_lag_s": (loop_lag, lag_limit),
+            "write_latency_s": (write_latency, write_limit),
+        }
+        self.sample_every = max(1, sample_every)
+        self.priorities: Dict[str, str] = dict(priorities or {})
+        self.step_interval = step_interval
+        self.cooldown = cooldown
+        self.relax_below = relax_below
+
+        self.level = NORMAL
+        self.pinned: Optional[int] = None
+        self.pressure = 0.0
+        self.readings: Dict[str, float] = {}
+        self._changed_at = time.monotonic()
+        self._calm_since: Optional[float] = None
+        self._sample_counts: Dict[str, int] = {}
+
+        # Metrics
+        self.escalations = 0
+        self.relaxations = 0
+        self.shed = 0
+        self.analysis_skipped = 0
+        self.scoring_skipped = 0
+
+    @property
+    def mode(self) -> str:
+        return MODES[self.level]
+
+    def evaluate(self, now: Optional[float] = None) -> str:
+        """Sample the load signals and step the mode up or down; returns the mode"""
+        now = time.monotonic() if now is None else now
+        pressure = 0.0
+        for name, (read, limit) in self._signals.items():
+            value = read()
+            self.readings[name] = value
+            pressure = max(pressure, value / limit if limit > 0 else 0.0)
+        self.pressure = pressure
+        if self.pinned is not None:
+            return self.mode
+
+        if pressure >= 1.0:
+            self._calm_since = None
+            if self.level < SAMPLE and now - self._changed_at >= self.step_interval:
+                self.escalations += 1
+                self._set_level(self.level + 1, now, f"pressure {pressure:.2f} ({self._worst()})")
+        elif pressure < self.relax_below:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif self.level > NORMAL and now - self._calm_since >= self.cooldown:
+                self.relaxations += 1
+                self._calm_since = now
+                self._set_level(self.level - 1, now, f"pressure {pressure:.2f}")
+        else:
+            self._calm_since = None
+        return self.mode
+
+    def _worst(self) -> str:
+        return max(self._signals, key=lambda name: self.readings[name] / max(self._signals[name][1], 1e-9))
+
+    def _set_level(self, level: int, now: float, reason: str):
+        previous = self.mode
+        self.level = level
+        self._changed_at = now
+        log = logger.warning if level > MODES.index(previous) else logger.info
+        log(f"Admission mode {previous} -> {self.mode}: {reason}")
+
+    def pin(self, mode: Optional[str]):
+        """Force a mode (None or 'auto' hands control back to the signals)"""
+        if mode in (None, 'auto'):
+            self.pinned = None
+            logger.info("Admission mode back under automatic control")
+            return
+        if mode not in MODES:
+            raise ValueError(f"Unknown admission mode '{mode}', expected auto or one of {', '.join(MODES)}")
+        self.pinned = MODES.index(mode)
+        self._set_level(self.pinned, time.monotonic(), "pinned")
+
+    def set_priority(self, field_id: str, priority: str):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        if priority == 'normal':
+            self.priorities.pop(field_id, None)
+        else:
+            self.priorities[field_id] = priority
+
+    def level_for(self, field_id: str) -> int:
+        """Effective mode level for one field"""
+        level = self.level
+        if level == NORMAL:
+            return NORMAL
+        priority = self.priorities.get(field_id, 'normal')
+        return max(NORMAL, min(level + PRIORITIES[priority], _CAPS[priority]))
+
+    def admit(self, field_id: str) -> bool:
+        """Whether to process a message at all (False only while sampling the field)"""
+        if self.level < STORE_ONLY or self.level_for(field_id) < SAMPLE:
+            return True
+        count = self._sample_counts.get(field_id, 0)
+        self._sample_counts[field_id] = count + 1
+        if count % self.sample_every == 0:
+            return True
+        self.shed += 1
+        return False
+
+    def stats(self) -> Dict:
+        """Current mode, load signals and shedding counters"""
+        return {
+            "mode": self.mode,
+            "control": "pinned" if self.pinned is not None else "auto",
+            "in_mode_s": round(time.monotonic() - self._changed_at, 1),
+            "pressure": round(self.pressure, 3),
+            "signals": {
+                name: {"value": round(self.readings.get(name, 0.0), 4), "limit": limit}
+                for name, (_, limit) in self._signals.items()
+            },
+            "sample_every": self.sample_every,
+            "priorities": dict(self.priorities),
+            "escalations": self.escalations,
+            "relaxations": self.relaxations,
+            "shed": self.shed,
+            "analysis_skipped": self.analysis_skipped,
+            "scoring_skipped": self.scoring_skipped,
+        }
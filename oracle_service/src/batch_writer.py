@@ -0,0 +1,281 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Batched Vault Writer                         ║
+║  "Many readings, one round trip"                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from .metrics import REGISTRY, SIZE_BUCKETS
+from .retry import RetryPolicy
+from .spool import WriteAheadSpool
+
+logger = logging.getLogger(__name__)
+
+WRITE_LATENCY = REGISTRY.histogram('oracle_influx_write_seconds', 'InfluxDB batch write latency')
+WRITE_BATCH_SIZE = REGISTRY.histogram('oracle_influx_write_batch_records', 'Records per InfluxDB batch write',
+                                      buckets=SIZE_BUCKETS)
+
+
+def is_rejected_write(error: BaseException) -> bool:
+    """InfluxDB turned the data itself down (a 4xx other than 429): writing it again fails again"""
+    status_code = getattr(error, 'status', None)
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+
+class InfluxBatchWriter:
+    """Bounded line-protocol buffer flushed to InfluxDB by size or interval.
+
+    ``write_fn(bucket, records)`` is a blocking call (e.g. a SYNCHRONOUS
+    ``write_api.write``); it always runs in a worker thread so the event loop
+    never waits on the vault. Records go to ``bucket`` unless another bucket
+    is given; each bucket is batched separately. Producers awaiting ``write``
+    are held back once ``max_buffered`` records are pending in total, which
+    pushes backpressure up into the ingest pipeline instead of growing memory
+    without bound.
+
+    With a ``spool``, a failed batch is appended to disk instead of dropped and
+    later batches go straight to the spool (no per-batch timeouts against a
+    dead vault) until ``mark_vault_available`` is called. Without one, records
+    are held in the buffer while the vault is marked unavailable, so
+    producers feel backpressure instead of losing data. A ``retry`` policy
+    gets a failed batch a few more attempts before it counts as failed.
+
+    A batch InfluxDB rejects (``is_rejected``, e.g. a field type conflict) is
+    dropped and counted rather than spooled: the vault is up, and the batch
+    would only be rejected again on replay.
+
+    ``write_latency()`` is the latency signal for load shedding: a moving
+    average over write attempts, failed ones included, that halves every
+    ``latency_half_life`` seconds without an attempt, or the age of the write
+    in flight if that is longer. One slow write therefore raises it for a
+    while rather than until the next successful write.
+    """
+
+    def __init__(self, write_fn: Callable[[str, List[str]], None], bucket: str,
+                 batch_size: int = 5000, flush_interval: float = 1.0,
+                 max_buffered: int = 100000, spool: Optional[WriteAheadSpool] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 is_rejected: Callable[[BaseException], bool] = is_rejected_write,
+                 latency_half_life: float = 10.0):
+        self._write_fn = write_fn
+        self.bucket = bucket
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered, batch_size)
+        self.spool = spool
+        self.retry = retry
+        self.is_rejected = is_rejected
+        self.latency_half_life = latency_half_life
+        self.vault_available = True
+
+        self._buffers: Dict[str, List[str]] = {bucket: []}
+        self._buffered = 0
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self._closed = False
+        self._latency_average = 0.0
+        self._latency_at = time.monotonic()
+        self._writing_since: Optional[float] = None
+
+        # Metrics
+        self.records_written = 0
+        self.records_dropped = 0
+        self.records_spooled = 0
+        self.records_rejected = 0
+        self.batches_written = 0
+        self.write_failures = 0
+        self.backpressure_waits = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_write_latency_ms = 0.0
+        self.max_write_latency_ms = 0.0
+        self._write_latency_total_ms = 0.0
+
+    def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def write(self, record: str, bucket: Optional[str] = None):
+        """Buffer a single line-protocol record"""
+        await self.write_many([record], bucket)
+
+    async def write_many(self, records: List[str], bucket: Optional[str] = None):
+        """Buffer line-protocol records, waiting while the buffer is full"""
+        if self._closed:
+            raise RuntimeError("InfluxBatchWriter is closed")
+        while self._buffered >= self.max_buffered:
+            self.backpressure_waits += 1
+            self._space_available.clear()
+            self._flush_requested.set()
+            await self._space_available.wait()
+        bucket = bucket or self.bucket
+        buffer = self._buffers.get(bucket)
+        if buffer is None:
+            buffer = self._buffers[bucket] = []
+        buffer.extend(records)
+        self._buffered += len(records)
+        if len(buffer) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def flush(self):
+        """Write everything currently buffered, one batch per bucket at a time"""
+        async with self._flush_lock:
+            while self._buffered:
+                if not self.vault_available and self.spool is None:
+                    return
+                for bucket, buffer in list(self._buffers.items()):
+                    if not buffer:
+                        continue
+                    batch = buffer[:self.batch_size]
+                    del buffer[:self.batch_size]
+                    self._buffered -= len(batch)
+                    self._space_available.set()
+                    await self._write_batch(bucket, batch)
+
+    async def close(self):
+        """Stop the flush loop and drain the buffer"""
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        if self._buffered:
+            self.records_dropped += self._buffered
+            logger.error(f"InfluxDB unavailable at shutdown, {self._buffered} buffered records lost")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                # Shielded: a batch taken from the buffer must not be lost when close() cancels the loop
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                logger.error(f"Error flushing InfluxDB batch: {e}")
+
+    def buffered(self) -> int:
+        """Number of records waiting to be flushed, across all buckets"""
+        return self._buffered
+
+    def write_latency(self) -> float:
+        """Recent write latency in seconds, decaying while no writes are attempted"""
+        now = time.monotonic()
+        latency = self._latency_average * 0.5 ** ((now - self._latency_at) / self.latency_half_life)
+        if self._writing_since is not None:
+            latency = max(latency, now - self._writing_since)
+        return latency
+
+    async def _attempt_write(self, bucket: str, batch: List[str]):
+        """Write one batch (with retries), feeding its duration into ``write_latency``"""
+        self._writing_since = started = time.monotonic()
+        try:
+            if self.retry is not None:
+                await self.retry.call(asyncio.to_thread, self._write_fn, bucket, batch)
+            else:
+                await asyncio.to_thread(self._write_fn, bucket, batch)
+        finally:
+            self._writing_since = None
+            latency = self.write_latency()
+            now = time.monotonic()
+            self._latency_average = latency + 0.3 * (now - started - latency)
+            self._latency_at = now
+
+    def mark_vault_available(self):
+        """Resume writing to InfluxDB after an outage"""
+        if not self.vault_available:
+            logger.info("InfluxDB available again, resuming direct writes")
+            self._flush_requested.set()
+        self.vault_available = True
+
+    def mark_vault_unavailable(self):
+        """Stop writing to InfluxDB until ``mark_vault_available`` is called"""
+        self.vault_available = False
+
+    async def _write_batch(self, bucket: str, batch: List[str]):
+        if not self.vault_available and self.spool is not None:
+            await self._spool_batch(bucket, batch)
+            return
+        start = time.perf_counter()
+        try:
+            await self._attempt_write(bucket, batch)
+        except Exception as e:
+            self.write_failures += 1
+            if self.is_rejected(e):
+                self.records_rejected += len(batch)
+                logger.error(f"InfluxDB rejected a batch of {len(batch)} records, dropping it: {e} "
+                             f"(first record: {batch[0][:200]!r})")
+            elif self.spool is None:
+                self.records_dropped += len(batch)
+                logger.error(f"Error writing batch of {len(batch)} records to InfluxDB: {e}")
+            else:
+                self.vault_available = False
+                logger.error(f"Error writing batch of {len(batch)} records to InfluxDB: {e}; "
+                             f"spooling to disk until the vault recovers")
+                await self._spool_batch(bucket, batch)
+            return
+        elapsed = time.perf_counter() - start
+        WRITE_LATENCY.observe(elapsed)
+        WRITE_BATCH_SIZE.observe(len(batch))
+        latency_ms = elapsed * 1000.0
+        self.records_written += len(batch)
+        self.batches_written += 1
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.last_write_latency_ms = latency_ms
+        self.max_write_latency_ms = max(self.max_write_latency_ms, latency_ms)
+        self._write_latency_total_ms += latency_ms
+
+    async def _spool_batch(self, bucket: str, batch: List[str]):
+        try:
+            spooled = await asyncio.to_thread(self.spool.append, bucket, batch)
+        except OSError as e:
+            logger.error(f"Error spooling batch of {len(batch)} records: {e}")
+            spooled = False
+        if spooled:
+            self.records_spooled += len(batch)
+        else:
+            self.records_dropped += len(batch)
+
+    def stats(self) -> Dict:
+        """Snapshot of buffer state and write metrics"""
+        batches = self.batches_written
+        return {
+            "buffered": self.buffered(),
+            "buckets": sorted(self._buffers),
+            "max_buffered": self.max_buffered,
+            "batch_size": self.batch_size,
+            "flush_interval_s": self.flush_interval,
+            "records_written": self.records_written,
+            "records_dropped": self.records_dropped,
+            "records_spooled": self.records_spooled,
+            "records_rejected": self.records_rejected,
+            "vault_available": self.vault_available,
+            "batches_written": batches,
+            "write_failures": self.write_failures,
+            "backpressure_waits": self.backpressure_waits,
+            "batch_size_last": self.last_batch_size,
+            "batch_size_max": self.max_batch_size,
+            "batch_size_avg": round(self.records_written / batches, 1) if batches else 0.0,
+            "write_latency_ms_last": round(self.last_write_latency_ms, 3),
+            "write_latency_ms_max": round(self.max_write_latency_ms, 3),
+            "write_latency_ms_avg": round(self._write_latency_total_ms / batches, 3) if batches else 0.0,
+            "write_latency_ms_recent": round(self.write_latency() * 1000.0, 3),
+        }
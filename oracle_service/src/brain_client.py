@@ -0,0 +1,210 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - HeadyBrain Client                            ║
+║  "One conversation per field, not one per reading"                 ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+from .codec import SensorReading
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Connection failures, timeouts, 429 and 5xx responses are worth another attempt"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class _PendingBatch:
+    __slots__ = ('field_id', 'readings', 'futures', 'timer', 'due')
+
+    def __init__(self, field_id: str):
+        self.field_id = field_id
+        self.readings: List[SensorReading] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.due = False
+
+
+class HeadyBrainClient:
+    """Coalescing, connection-pooled client for the HeadyBrain analysis API.
+
+    Readings for the same ``field_id`` that arrive within ``batch_window``
+    seconds are sent as one ``FIELD_DATA_BATCH_ANALYSIS`` request over a
+    shared keep-alive pool. At most ``max_in_flight`` requests are outstanding.
+    A batch is only sealed once a request slot is free: a batch whose window
+    has passed while every slot is busy stays open and keeps taking readings
+    (up to ``max_batch``), so a slow HeadyBrain gets fewer, larger requests
+    rather than a queue of tiny ones. A timeout or error (after the attempts the ``retry`` policy allows)
+    resolves every reading in the batch to ``None`` so the caller can carry
+    on without an analysis.
+    """
+
+    def __init__(self, endpoint: str, verification_threshold: float, batch_window: float = 0.02,
+                 max_batch: int = 100, max_in_flight: int = 16, timeout: float = 2.0,
+                 max_connections: int = 32, retry: Optional[RetryPolicy] = None):
+        self.endpoint = endpoint
+        self.verification_threshold = verification_threshold
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retry = retry
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._due: Deque[_PendingBatch] = collections.deque()
+        self._send_tasks = set()
+
+        # Metrics
+        self.readings_submitted = 0
+        self.requests_sent = 0
+        self.requests_failed = 0
+        self.requests_timed_out = 0
+        self.in_flight = 0
+        self._latencies_ms = collections.deque(maxlen=2048)
+
+    async def start(self):
+        """Open the shared keep-alive connection pool"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+
+    async def close(self):
+        """Send whatever is still pending, then close the pool"""
+        for field_id in list(self._pending):
+            self._flush(field_id)
+        while self._send_tasks:
+            await asyncio.gather(*self._send_tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def analyze(self, reading: SensorReading) -> Optional[Dict]:
+        """Queue a reading for batched analysis; returns its result or None on fallback"""
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(reading.field_id)
+        if batch is None:
+            batch = self._pending[reading.field_id] = _PendingBatch(reading.field_id)
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush, reading.field_id)
+        batch.readings.append(reading)
+        batch.futures.append(future)
+        self.readings_submitted += 1
+        if len(batch.readings) >= self.max_batch:
+            # Full: no more readings go into this batch, whether or not it can be sent yet
+            self._flush(reading.field_id)
+            if self._pending.get(reading.field_id) is batch:
+                del self._pending[reading.field_id]
+        return await future
+
+    def _flush(self, field_id: str):
+        """Mark a field's open batch as due and send it as soon as a request slot is free"""
+        batch = self._pending.get(field_id)
+        if batch is None or batch.due:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        batch.due = True
+        self._due.append(batch)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._due and self.in_flight < self.max_in_flight:
+            batch = self._due.popleft()
+            if self._pending.get(batch.field_id) is batch:
+                del self._pending[batch.field_id]
+            self.in_flight += 1
+            task = asyncio.create_task(self._send(batch.field_id, batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, field_id: str, batch: _PendingBatch):
+        body = {
+            'type': 'FIELD_DATA_BATCH_ANALYSIS',
+            'field_id': field_id,
+            'verification_threshold': self.verification_threshold,
+            'readings': [
+                {'sensor_id': r.sensor_id, 'timestamp': r.timestamp, 'sensor_data': r.data,
+                 'local_confidence': r.confidence}
+                for r in batch.readings
+            ]
+        }
+        results: List[Optional[Dict]] = [None] * len(batch.readings)
+        start = time.perf_counter()
+        try:
+            if self.retry is not None:
+                response = await self.retry.call(self._post, body)
+            else:
+                response = await self._post(body)
+            results = self._split_results(response.json(), len(batch.readings))
+            self._latencies_ms.append((time.perf_counter() - start) * 1000.0)
+        except httpx.TimeoutException:
+            self.requests_timed_out += 1
+            logger.warning(f"HeadyBrain timed out for field {field_id} "
+                           f"({len(batch.readings)} readings), continuing without analysis")
+        except Exception as e:
+            self.requests_failed += 1
+            logger.error(f"HeadyBrain request failed for field {field_id}: {e}")
+        finally:
+            self.in_flight -= 1
+            self.requests_sent += 1
+            self._dispatch()
+
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _post(self, body: Dict) -> httpx.Response:
+        response = await self._client.post(self.endpoint, json=body)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _split_results(response: Dict, count: int) -> List[Optional[Dict]]:
+        """Map a batch response to per-reading results"""
+        results = response.get('results') if isinstance(response, dict) else None
+        if isinstance(results, list) and len(results) == count:
+            return results
+        return [response] * count
+
+    def stats(self) -> Dict:
+        """Snapshot of batching and request latency metrics"""
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        sent = self.requests_sent
+        return {
+            "endpoint": self.endpoint,
+            "readings_submitted": self.readings_submitted,
+            "requests_sent": sent,
+            "requests_failed": self.requests_failed,
+            "requests_timed_out": self.requests_timed_out,
+            "in_flight": self.in_flight,
+            "pending_fields": len(self._pending),
+            "batches_waiting": len(self._due),
+            "readings_per_request": round(self.readings_submitted / sent, 2) if sent else 0.0,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p99": percentile(0.99),
+        }
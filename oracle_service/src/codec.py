@@ -0,0 +1,183 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Sensor Payload Codec                         ║
+║  "Parse once, validate once, trust the types"                      ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Decodes ``field/<id>/sensors`` payloads straight from the MQTT payload bytes
+into ``SensorReading`` objects. The fastest installed backend is used:
+msgspec (decode and validate in one C pass), then orjson, then the stdlib
+``json`` module. Select one explicitly with ``ORACLE_JSON_DECODER``.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .line_protocol import INT64_MAX, INT64_MIN
+
+try:
+    import msgspec
+except ImportError:  # optional fast path
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+_STORABLE_TYPES = frozenset((int, float, bool))
+_INF = float('inf')
+
+# Accepted timestamps, in epoch seconds: 1970-01-01 up to 2100-01-01. Anything
+# else (NaN, infinities, millisecond epochs) cannot be a sensor clock reading,
+# and far-out values overflow line protocol and date arithmetic downstream.
+TIMESTAMP_MIN = 0.0
+TIMESTAMP_MAX = 4102444800.0
+
+
+class PayloadError(ValueError):
+    """Raised when a payload is not valid JSON or does not match the schema"""
+
+
+@dataclass(slots=True)
+class SensorReading:
+    """A decoded, structurally valid sensor reading.
+
+    Readings decoded from a binary frame (see ``frames``) carry the frame
+    bytes in ``frame`` and a raw ``signature`` over them.
+    """
+    field_id: str
+    sensor_id: str
+    timestamp: Union[int, float]
+    signature: Union[str, bytes]
+    data: Dict[str, Any]
+    fields: Dict[str, Union[int, float, bool]]
+    confidence: float = 1.0
+    frame: Optional[bytes] = None
+
+
+# Payload schema: key -> accepted exact types
+SCHEMA = {
+    'timestamp': (int, float),
+    'sensor_id': (str,),
+    'signature': (str,),
+    'data': (dict,),
+}
+
+
+def compile_validator(schema: Dict[str, tuple]) -> Callable[[Any], None]:
+    """Build a validator for ``schema`` once, instead of re-walking it per message"""
+    checks = tuple((key, frozenset(types)) for key, types in schema.items())
+
+    def validate(obj: Any):
+        if type(obj) is not dict:
+            raise PayloadError("payload is not a JSON object")
+        for key, types in checks:
+            value = obj.get(key)
+            if type(value) not in types:
+                if value is None:
+                    raise PayloadError(f"missing required field '{key}'")
+                raise PayloadError(f"field '{key}' has type {type(value).__name__}")
+
+    return validate
+
+
+_validate = compile_validator(SCHEMA)
+
+
+def check_timestamp(timestamp: Union[int, float]):
+    """Raise ``PayloadError`` unless ``timestamp`` lies in the accepted epoch window"""
+    # Written as a negated range so NaN, which fails every comparison, is rejected too
+    if not TIMESTAMP_MIN <= timestamp <= TIMESTAMP_MAX:
+        raise PayloadError(f"timestamp {timestamp!r} is outside the accepted range")
+
+
+def numeric_fields(data: Dict[str, Any]) -> Dict[str, Union[int, float, bool]]:
+    """Keep the storable measurements of a reading (finite numbers and booleans)"""
+    # bool is kept alongside int/float: the Oracle has always stored boolean fields.
+    # The range check drops NaN and infinities, which line protocol cannot carry,
+    # and integers beyond int64, which InfluxDB would reject with the whole batch.
+    return {key: value for key, value in data.items()
+            if type(value) in _STORABLE_TYPES and -_INF < value < _INF
+            and (type(value) is not int or INT64_MIN <= value <= INT64_MAX)}
+
+
+if msgspec is not None:
+    class _MsgspecPayload(msgspec.Struct):
+        timestamp: Union[int, float]
+        sensor_id: str
+        signature: str
+        data: Dict[str, Any]
+
+
+class PayloadDecoder:
+    """Decodes raw payload bytes into ``SensorReading`` with the chosen backend.
+
+    ``decode(field_id, raw)`` is bound to the backend-specific implementation
+    at construction so the hot path has no per-message dispatch.
+    """
+
+    BACKENDS = ('msgspec', 'orjson', 'json')
+
+    def __init__(self, backend: str = 'auto'):
+        self.backend = self._resolve(backend)
+        if self.backend == 'msgspec':
+            self._msgspec_decoder = msgspec.json.Decoder(_MsgspecPayload)
+            self.decode = self._decode_msgspec
+        elif self.backend == 'orjson':
+            self._loads = orjson.loads
+            self.decode = self._decode_dict
+        else:
+            self._loads = json.loads
+            self.decode = self._decode_dict
+
+    @classmethod
+    def from_env(cls) -> 'PayloadDecoder':
+        return cls(os.getenv('ORACLE_JSON_DECODER', 'auto'))
+
+    @staticmethod
+    def available() -> List[str]:
+        """Backends importable in this environment, fastest first"""
+        found = []
+        if msgspec is not None:
+            found.append('msgspec')
+        if orjson is not None:
+            found.append('orjson')
+        found.append('json')
+        return found
+
+    @classmethod
+    def _resolve(cls, backend: str) -> str:
+        available = cls.available()
+        if backend == 'auto':
+            return available[0]
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Unknown JSON decoder '{backend}', expected one of {cls.BACKENDS}")
+        if backend not in available:
+            raise ValueError(f"JSON decoder '{backend}' is not installed")
+        return backend
+
+    def _decode_msgspec(self, field_id: str, raw: bytes) -> SensorReading:
+        try:
+            payload = self._msgspec_decoder.decode(raw)
+        except msgspec.DecodeError as e:
+            raise PayloadError(str(e)) from None
+        check_timestamp(payload.timestamp)
+        return SensorReading(field_id, payload.sensor_id, payload.timestamp, payload.signature,
+                             payload.data, numeric_fields(payload.data))
+
+    def _decode_dict(self, field_id: str, raw: bytes) -> SensorReading:
+        try:
+            payload = self._loads(raw)
+        except ValueError as e:
+            raise PayloadError(str(e)) from None
+        _validate(payload)
+        check_timestamp(payload['timestamp'])
+        data = payload['data']
+        return SensorReading(field_id, payload['sensor_id'], payload['timestamp'],
+                             payload['signature'], data, numeric_fields(data))
+
@@ -0,0 +1,297 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Columnar Archive                             ║
+║  "Every verified reading, ready for the notebook"                  ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Tees verified readings into compressed columnar files (Parquet or Arrow
+IPC) for offline analysis and replay, laid out as a hive-partitioned
+dataset:
+
+    <dir>/date=2026-10-18/field_id=north-40/part-<ms>-<pid>-<seq>.parquet
+
+The ``field_id`` value comes from the MQTT topic and is URI-escaped
+(``/`` becomes ``%2F``), which is how pyarrow's hive partitioning decodes it.
+
+Columns: ``sensor_id``, ``time`` (UTC, µs), ``fields`` (metric -> value),
+``confidence`` and ``payload``, the reading re-encoded as the JSON message
+the sensor sent so ``python -m src.replay`` can push it back through
+verification and storage. Readings from a binary frame keep the frame
+itself as the payload of the frame's first row in each file (null on the
+other rows), since its signature covers all of them. The hot path only appends readings to a list;
+grouping, encoding and file I/O happen in a worker thread. Files are
+written under a hidden ``.tmp`` name and renamed when closed, so readers
+of the directory only ever see complete files.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .codec import SensorReading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; only needed with ORACLE_COLUMNAR_DIR set
+    pa = None
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:  # optional fast path
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('parquet', 'arrow')
+
+
+def partition_directory(directory: str, date: str, field_id: str) -> str:
+    """Hive partition directory of one date and field, with the field id URI-escaped"""
+    return os.path.join(directory, f"date={date}", f"field_id={urllib.parse.quote(field_id, safe='')}")
+
+
+def archive_schema():
+    return pa.schema([
+        ('sensor_id', pa.string()),
+        ('time', pa.timestamp('us', tz='UTC')),
+        ('fields', pa.map_(pa.string(), pa.float64())),
+        ('confidence', pa.float64()),
+        ('payload', pa.binary()),
+    ])
+
+
+class _Partition:
+    __slots__ = ('directory', 'buffer', 'buffer_since', 'writer', 'sink', 'tmp_path', 'path',
+                 'opened_at', 'last_write', 'last_frame')
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.buffer: List[SensorReading] = []
+        self.buffer_since = 0.0
+        self.writer = None
+        self.sink = None
+        self.tmp_path = None
+        self.path = None
+        self.opened_at = 0.0
+        self.last_write = 0.0
+        self.last_frame = None
+
+
+class ColumnarTee:
+    """Buffers readings per (date, field_id) and writes them as row groups.
+
+    A partition's buffer becomes a row group once it holds
+    ``row_group_rows`` readings or has waited ``flush_interval`` seconds.
+    Files are closed (and become visible) after ``rotate_seconds``, after
+    a partition has been idle for two flush intervals, or when more than
+    ``max_open_files`` are open. Readings beyond ``max_pending`` waiting
+    for the worker thread are dropped and counted rather than growing
+    memory without bound.
+    """
+
+    def __init__(self, directory: str, fmt: str = 'parquet', compression: str = 'zstd',
+                 row_group_rows: int = 65536, flush_interval: float = 30.0, rotate_seconds: float = 900.0,
+                 max_open_files: int = 256, max_pending: int = 500000):
+        if pa is None:
+            raise ValueError("Columnar export needs pyarrow, which is not installed")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown columnar format '{fmt}', expected one of {FORMATS}")
+        self.directory = directory
+        self.format = fmt
+        self.compression = None if compression == 'none' else compression
+        self.row_group_rows = row_group_rows
+        self.flush_interval = flush_interval
+        self.rotate_seconds = rotate_seconds
+        self.max_open_files = max_open_files
+        self.max_pending = max_pending
+        self.schema = archive_schema()
+
+        self._pending: List[SensorReading] = []
+        self._partitions: Dict[Tuple[int, str], _Partition] = {}
+        self._dates: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._open_files = 0
+        self._task = None
+
+        # Metrics
+        self.readings_archived = 0
+        self.readings_dropped = 0
+        self.row_groups_written = 0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+
+    def add(self, readings: List[SensorReading]):
+        """Queue readings for the archive (event loop only; never blocks)"""
+        if len(self._pending) + len(readings) > self.max_pending:
+            if not self.readings_dropped:
+                logger.warning("Columnar archive is falling behind, dropping readings")
+            self.readings_dropped += len(readings)
+            return
+        self._pending.extend(readings)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Write everything still buffered and close all files"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        pending, self._pending = self._pending, []
+        await asyncio.to_thread(self._ingest, pending, time.time(), True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(1.0)
+            pending, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._ingest, pending, time.time(), False)
+            except Exception as e:
+                logger.error(f"Error writing columnar archive: {e}")
+
+    def _date(self, day: int) -> str:
+        date = self._dates.get(day)
+        if date is None:
+            date = self._dates[day] = datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%d')
+        return date
+
+    def _ingest(self, readings: List[SensorReading], now: float, force: bool):
+        """Group readings into partitions and write what is due (worker thread)"""
+        with self._lock:
+            partitions = self._partitions
+            for reading in readings:
+                key = (int(reading.timestamp // 86400), reading.field_id)
+                partition = partitions.get(key)
+                if partition is None:
+                    partition = partitions[key] = _Partition(
+                        partition_directory(self.directory, self._date(key[0]), reading.field_id))
+                if not partition.buffer:
+                    partition.buffer_since = now
+                partition.buffer.append(reading)
+
+            for key, partition in list(partitions.items()):
+                if partition.buffer and (force or len(partition.buffer) >= self.row_group_rows
+                                         or now - partition.buffer_since >= self.flush_interval):
+                    self._write_buffer(partition, now)
+                if partition.writer and (force or now - partition.opened_at >= self.rotate_seconds
+                                         or now - partition.last_write >= 2 * self.flush_interval):
+                    self._close_file(partition)
+                if not partition.buffer and not partition.writer:
+                    del partitions[key]
+
+            open_files = [p for p in partitions.values() if p.writer]
+            if len(open_files) > self.max_open_files:
+                open_files.sort(key=lambda p: p.last_write)
+                for partition in open_files[:len(open_files) - self.max_open_files]:
+                    self._close_file(partition)
+
+    def _payloads(self, partition: _Partition, readings: List[SensorReading]) -> List[Optional[bytes]]:
+        payloads = []
+        last_frame = partition.last_frame
+        for r in readings:
+            frame = r.frame
+            if frame is None:
+                payloads.append(_dumps({'timestamp': r.timestamp, 'sensor_id': r.sensor_id,
+                                        'signature': r.signature, 'data': r.data}))
+            elif frame is last_frame:
+                payloads.append(None)
+            else:
+                payloads.append(frame)
+                last_frame = frame
+        partition.last_frame = last_frame
+        return payloads
+
+    def _table(self, partition: _Partition, readings: List[SensorReading]):
+        return pa.Table.from_arrays([
+            pa.array([r.sensor_id for r in readings], pa.string()),
+            pa.array([int(r.timestamp * 1_000_000) for r in readings], pa.timestamp('us', tz='UTC')),
+            pa.array([[(k, float(v)) for k, v in r.fields.items()] for r in readings], self.schema.field('fields').type),
+            pa.array([r.confidence for r in readings], pa.float64()),
+            pa.array(self._payloads(partition, readings), pa.binary()),
+        ], schema=self.schema)
+
+    def _write_buffer(self, partition: _Partition, now: float):
+        readings, partition.buffer = partition.buffer, []
+        try:
+            table = self._table(partition, readings)
+            if partition.writer is None:
+                self._open_file(partition, now)
+            if self.format == 'parquet':
+                partition.writer.write_table(table, row_group_size=len(readings))
+            else:
+                partition.writer.write_table(table)
+        except (OSError, pa.ArrowException) as e:
+            self.write_errors += 1
+            self.readings_dropped += len(readings)
+            logger.error(f"Error archiving {len(readings)} readings to {partition.directory}: {e}")
+            # The frame payload may have gone down with the dropped rows
+            partition.last_frame = None
+            if partition.writer is not None:
+                self._close_file(partition)
+            return
+        partition.last_write = now
+        self.readings_archived += len(readings)
+        self.row_groups_written += 1
+
+    def _open_file(self, partition: _Partition, now: float):
+        os.makedirs(partition.directory, exist_ok=True)
+        self._sequence += 1
+        name = f"part-{int(now * 1000)}-{os.getpid()}-{self._sequence}.{self.format}"
+        partition.path = os.path.join(partition.directory, name)
+        partition.tmp_path = os.path.join(partition.directory, f".{name}.tmp")
+        if self.format == 'parquet':
+            partition.writer = pq.ParquetWriter(partition.tmp_path, self.schema,
+                                                compression=self.compression or 'none')
+        else:
+            partition.sink = pa.OSFile(partition.tmp_path, 'wb')
+            partition.writer = pa.ipc.new_file(partition.sink, self.schema,
+                                               options=pa.ipc.IpcWriteOptions(compression=self.compression))
+        partition.opened_at = now
+        self._open_files += 1
+
+    def _close_file(self, partition: _Partition):
+        try:
+            partition.writer.close()
+            if partition.sink is not None:
+                partition.sink.close()
+            os.replace(partition.tmp_path, partition.path)
+            self.bytes_written += os.path.getsize(partition.path)
+            self.files_written += 1
+        except (OSError, pa.ArrowException) as e:
+            self.write_errors += 1
+            logger.error(f"Error closing columnar file {partition.path}: {e}")
+        partition.writer = partition.sink = None
+        # A frame continuing into the next file must carry its payload again there
+        partition.last_frame = None
+        self._open_files -= 1
+
+    def stats(self) -> Dict:
+        """Snapshot of archive backlog and output"""
+        return {
+            "directory": self.directory,
+            "format": self.format,
+            "compression": self.compression,
+            "pending": len(self._pending),
+            "open_files": self._open_files,
+            "readings_archived": self.readings_archived,
+            "readings_dropped": self.readings_dropped,
+            "row_groups_written": self.row_groups_written,
+            "files_written": self.files_written,
+            "bytes_written": self.bytes_written,
+            "write_errors": self.write_errors,
+        }
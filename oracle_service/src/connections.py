@@ -0,0 +1,184 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Connection Supervisor                        ║
+║  "Come up at once, heal in the background"                         ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Each external dependency (MQTT broker, InfluxDB) is a ``ManagedLink`` with a
+background task that connects, watches and reconnects it. Startup never
+waits on a link: the Oracle serves its API in a degraded state while links
+come up, and a dropped link is re-established with the jittered Fibonacci
+backoff of ``src.retry`` so a fleet of Oracles does not reconnect in lockstep.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DOWN = 'down'
+CONNECTING = 'connecting'
+UP = 'up'
+
+
+class ManagedLink:
+    """A dependency kept connected by a background task.
+
+    ``connect`` is awaited until it returns without raising. While the link
+    is up, ``probe`` (if given) is awaited every ``probe_interval`` seconds
+    and a False result or an exception marks the link down; code that
+    notices a failure itself calls ``mark_down`` (or ``mark_down_threadsafe``
+    from a foreign thread). ``on_up``/``on_down`` run on the event loop at
+    each transition.
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Awaitable[None]], backoff,
+                 probe: Optional[Callable[[], Awaitable[bool]]] = None, probe_interval: float = 10.0,
+                 on_up: Optional[Callable[[], None]] = None, on_down: Optional[Callable[[], None]] = None,
+                 max_delay: float = 60.0, history: int = 20):
+        self.name = name
+        self._connect = connect
+        self.backoff = backoff
+        self._probe = probe
+        self.probe_interval = probe_interval
+        self._on_up = on_up
+        self._on_down = on_down
+        self.max_delay = max_delay
+
+        self.state = DOWN
+        self.since = time.time()
+        self.attempt = 0
+        self._last_delay: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.transitions = collections.deque(maxlen=history)
+        self._changed = asyncio.Event()
+        self._up = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task = None
+
+        # Metrics
+        self.connects = 0
+        self.disconnects = 0
+        self.failed_attempts = 0
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def is_up(self) -> bool:
+        return self.state == UP
+
+    async def wait_up(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the link is up; returns False on timeout"""
+        try:
+            await asyncio.wait_for(self._up.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def mark_down(self, reason: str):
+        """Report a lost connection; the supervisor task reconnects it"""
+        if self.state != UP:
+            return
+        self.disconnects += 1
+        self.last_error = reason
+        self._transition(DOWN, reason)
+        if self._on_down:
+            self._on_down()
+
+    def mark_down_threadsafe(self, reason: str):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.mark_down, reason)
+
+    def _transition(self, state: str, reason: Optional[str] = None):
+        if state == self.state:
+            return
+        previous, self.state, self.since = self.state, state, time.time()
+        if state == UP:
+            self._up.set()
+        else:
+            self._up.clear()
+        self.transitions.append({
+            "at": datetime.fromtimestamp(self.since, timezone.utc).isoformat(),
+            "from": previous,
+            "to": state,
+            "reason": reason,
+        })
+        if state in (UP, DOWN):
+            log = logger.info if state == UP else logger.warning
+            log(f"{self.name} link {previous} -> {state}" + (f": {reason}" if reason else ""))
+        self._changed.set()
+
+    def next_delay(self) -> float:
+        """Jittered backoff for the current attempt, capped at ``max_delay``"""
+        self._last_delay = min(self.backoff.delay(self.attempt, self._last_delay), self.max_delay)
+        return self._last_delay
+
+    async def _run(self):
+        while True:
+            if self.state != UP:
+                self._transition(CONNECTING)
+                try:
+                    await self._connect()
+                except Exception as e:
+                    self.failed_attempts += 1
+                    self.last_error = str(e)
+                    delay = self.next_delay()
+                    self.attempt += 1
+                    self._transition(DOWN, str(e))
+                    logger.warning(f"{self.name} connection attempt {self.attempt} failed: {e}. "
+                                   f"Retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.attempt = 0
+                self._last_delay = None
+                self.connects += 1
+                self._transition(UP)
+                if self._on_up:
+                    self._on_up()
+
+            # Up: sleep until a failure is reported or the next probe is due
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.probe_interval)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            if self._probe and self.state == UP:
+                try:
+                    healthy = await self._probe()
+                    reason = "health probe failed"
+                except Exception as e:
+                    healthy, reason = False, f"health probe failed: {e}"
+                if not healthy:
+                    self.mark_down(reason)
+
+    def stats(self) -> Dict:
+        """Current state and recent transitions"""
+        return {
+            "state": self.state,
+            "since": datetime.fromtimestamp(self.since, timezone.utc).isoformat(),
+            "attempt": self.attempt,
+            "last_error": self.last_error,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "failed_attempts": self.failed_attempts,
+            "transitions": list(self.transitions),
+        }
@@ -0,0 +1,205 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Deduplication and Reordering                 ║
+║  "Every reading counts once, in the order it happened"             ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+QoS 1 redeliveries and gateway retries deliver the same reading more than
+once. ``DedupIndex`` remembers recent ``(field_id, sensor_id, timestamp)``
+keys in time buckets that expire as a whole, so memory stays bounded without
+per-key timers. ``ReorderBuffer`` optionally holds readings for a short delay
+and releases each sensor's readings in timestamp order.
+"""
+
+import collections
+import heapq
+import itertools
+from typing import Dict, List, Tuple
+
+from .codec import SensorReading
+
+
+class DedupIndex:
+    """Time-bucketed set of recently seen reading keys.
+
+    A key lives in the bucket of its reading's timestamp; buckets older than
+    ``window`` seconds (by wall clock) are dropped whole, and the oldest
+    buckets are evicted early if more than ``max_keys`` keys are held.
+    Readings older than the window cannot be checked and are let through, as
+    are readings stamped more than ``window`` seconds ahead: their buckets
+    would outlive the window and make the bucket count unbounded.
+    Keys are stored as 64-bit hashes, which keeps an entry to ~70 bytes.
+    """
+
+    def __init__(self, window: float = 120.0, bucket_seconds: float = 5.0, max_keys: int = 1000000):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.max_keys = max_keys
+        self._buckets: Dict[int, set] = {}
+        self._keys = 0
+
+        # Metrics
+        self.checked = 0
+        self.duplicates = 0
+        self.too_old = 0
+        self.too_new = 0
+        self.evicted_keys = 0
+
+    def _expire(self, now: float):
+        horizon = int((now - self.window) // self.bucket_seconds)
+        while self._buckets:
+            oldest = min(self._buckets)
+            if oldest >= horizon and self._keys <= self.max_keys:
+                break
+            dropped = len(self._buckets.pop(oldest))
+            self._keys -= dropped
+            if oldest >= horizon:
+                self.evicted_keys += dropped
+
+    def filter(self, readings: List[SensorReading], now: float) -> Tuple[List[SensorReading], List[SensorReading]]:
+        """Split a batch into first sightings and duplicates, remembering the former"""
+        self._expire(now)
+        horizon = now - self.window
+        ahead = now + self.window
+        buckets = self._buckets
+        unique: List[SensorReading] = []
+        duplicates: List[SensorReading] = []
+        for reading in readings:
+            timestamp = reading.timestamp
+            if timestamp < horizon:
+                self.too_old += 1
+                unique.append(reading)
+                continue
+            if timestamp > ahead:
+                self.too_new += 1
+                unique.append(reading)
+                continue
+            bucket_id = int(timestamp // self.bucket_seconds)
+            bucket = buckets.get(bucket_id)
+            if bucket is None:
+                bucket = buckets[bucket_id] = set()
+            key = hash((reading.field_id, reading.sensor_id, timestamp))
+            if key in bucket:
+                duplicates.append(reading)
+                continue
+            bucket.add(key)
+            self._keys += 1
+            unique.append(reading)
+        self.checked += len(readings)
+        self.duplicates += len(duplicates)
+        return unique, duplicates
+
+    def stats(self) -> Dict:
+        """Snapshot of index size and suppression counters"""
+        return {
+            "window_s": self.window,
+            "keys": self._keys,
+            "max_keys": self.max_keys,
+            "buckets": len(self._buckets),
+            "checked": self.checked,
+            "duplicates_suppressed": self.duplicates,
+            "too_old_to_check": self.too_old,
+            "too_new_to_check": self.too_new,
+            "evicted_keys": self.evicted_keys,
+        }
+
+
+class ReorderBuffer:
+    """Per-sensor min-heaps releasing readings in timestamp order.
+
+    A reading is released once its sensor has reported a timestamp ``delay``
+    seconds newer, or once it has been held for ``delay`` seconds; releasing
+    a reading also releases everything older from the same sensor. A reading
+    older than one already released for its sensor is passed straight
+    through and counted as late.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: Dict[tuple, list] = {}
+        self._deadlines = collections.deque()  # (release_at, key, timestamp), in arrival order
+        self._newest: Dict[tuple, float] = {}
+        self._released: Dict[tuple, float] = {}
+        self._sequence = itertools.count()
+        self._held = 0
+
+        # Metrics
+        self.out_of_order = 0
+        self.late = 0
+        self.released = 0
+
+    def push(self, readings: List[SensorReading], now: float) -> List[SensorReading]:
+        """Buffer a batch; return the readings that are now ready, in order per sensor"""
+        ready: List[SensorReading] = []
+        touched = set()
+        release_at = now + self.delay
+        for reading in readings:
+            key = (reading.field_id, reading.sensor_id)
+            timestamp = reading.timestamp
+            if timestamp <= self._released.get(key, float('-inf')):
+                self.late += 1
+                ready.append(reading)
+                continue
+            heap = self._pending.get(key)
+            if heap is None:
+                heap = self._pending[key] = []
+            heapq.heappush(heap, (timestamp, next(self._sequence), reading))
+            newest = self._newest.get(key)
+            if newest is None or timestamp > newest:
+                self._newest[key] = timestamp
+            else:
+                self.out_of_order += 1
+            self._deadlines.append((release_at, key, timestamp))
+            self._held += 1
+            touched.add(key)
+        for key in touched:
+            ready.extend(self._release(key, self._newest[key] - self.delay))
+        ready.extend(self.expire(now))
+        return ready
+
+    def expire(self, now: float) -> List[SensorReading]:
+        """Release readings held for longer than the delay"""
+        ready: List[SensorReading] = []
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, key, timestamp = deadlines.popleft()
+            ready.extend(self._release(key, timestamp))
+        return ready
+
+    def drain(self) -> List[SensorReading]:
+        """Release everything, e.g. on shutdown"""
+        ready: List[SensorReading] = []
+        for key in list(self._pending):
+            ready.extend(self._release(key, float('inf')))
+        self._deadlines.clear()
+        return ready
+
+    def _release(self, key: tuple, upto: float) -> List[SensorReading]:
+        heap = self._pending.get(key)
+        ready: List[SensorReading] = []
+        while heap and heap[0][0] <= upto:
+            ready.append(heapq.heappop(heap)[2])
+        if ready:
+            self._released[key] = ready[-1].timestamp
+            self._held -= len(ready)
+            self.released += len(ready)
+            if not heap:
+                del self._pending[key]
+        return ready
+
+    def pending(self) -> int:
+        """Number of readings being held"""
+        return self._held
+
+    def stats(self) -> Dict:
+        """Snapshot of buffer occupancy and ordering counters"""
+        return {
+            "delay_ms": round(self.delay * 1000.0, 1),
+            "pending": self._held,
+            "sensors_pending": len(self._pending),
+            "released": self.released,
+            "out_of_order": self.out_of_order,
+            "late": self.late,
+        }
@@ -0,0 +1,182 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Binary Sensor Frames                         ║
+║  "Numbers travel as numbers"                                       ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Compact alternative to the JSON payload, published on
+``field/<id>/sensors/bin``. One frame carries N readings of one sensor that
+share a set of M metrics (little-endian throughout):
+
+    offset  size  field
+    0       2     magic b'HF'
+    2       1     version (1)
+    3       1     flags (bit 0: values are float32 rather than float64)
+    4       2     N, readings in the frame
+    6       2     M, metrics per reading
+    8       2     G, signature length (0 = unsigned)
+    10      2     L, length of the metric name block
+    12      1     S, sensor_id length
+    13      3     reserved (0)
+    16      S     sensor_id, UTF-8
+            L     M metric names, each a length byte followed by UTF-8
+            ...   zero padding to a multiple of 8 bytes from the frame start
+            8N    timestamps, float64 seconds since the epoch
+            8NM   values, row-major (4NM with the float32 flag)
+            G     raw signature over every preceding byte of the frame
+
+The arrays are 8-byte aligned, so besides ``struct.unpack_from`` (used
+here, which reads them in place) they can be viewed without copying via
+``memoryview.cast`` or ``numpy.frombuffer``. The metric name block is
+usually identical from frame to frame and is decoded once per distinct
+block. Keys are the same per-sensor keyring entries as for JSON (ed25519 or
+hmac-sha256), but the signature is binary and covers the frame bytes
+themselves, so nothing has to be re-serialised to verify it.
+"""
+
+import struct
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .codec import TIMESTAMP_MAX, TIMESTAMP_MIN, PayloadError, SensorReading, numeric_fields
+
+MAGIC = b'HF'
+VERSION = 1
+FLAG_FLOAT32 = 0x01
+FRAME_TOPIC = 'field/+/sensors/bin'
+SIGNATURE_LENGTHS = {'ed25519': 64, 'hmac-sha256': 32}
+
+_HEADER = struct.Struct('<2sBBHHHHB3x')
+_INF = float('inf')
+
+
+def encode_frame(sensor_id: str, metrics: Sequence[str], timestamps: Sequence[float],
+                 values: Sequence[Sequence[float]], float32: bool = False,
+                 sign: Optional[Callable[[bytes], bytes]] = None, signature_length: int = 0) -> bytes:
+    """Build a frame from N timestamps and N rows of M ``values``.
+
+    ``sign(message) -> signature`` signs the frame; ``signature_length``
+    must match what it returns (see ``SIGNATURE_LENGTHS``), since the
+    length is part of the signed header.
+    """
+    sensor = sensor_id.encode()
+    names = b''.join(bytes((len(encoded),)) + encoded for encoded in (name.encode() for name in metrics))
+    if sign is None:
+        signature_length = 0
+    header = _HEADER.pack(MAGIC, VERSION, FLAG_FLOAT32 if float32 else 0, len(timestamps), len(metrics),
+                          signature_length, len(names), len(sensor))
+    prefix = header + sensor + names
+    flat = [float(value) for row in values for value in row]
+    if len(flat) != len(timestamps) * len(metrics):
+        raise ValueError(f"Expected {len(timestamps)} x {len(metrics)} values, got {len(flat)}")
+    message = (prefix + b'\0' * (-len(prefix) % 8)
+               + struct.pack(f'<{len(timestamps)}d', *timestamps)
+               + struct.pack(f"<{len(flat)}{'f' if float32 else 'd'}", *flat))
+    if sign is None:
+        return message
+    signature = sign(message)
+    if len(signature) != signature_length:
+        raise ValueError(f"Signature is {len(signature)} bytes, header declares {signature_length}")
+    return message + signature
+
+
+class FrameDecoder:
+    """Decodes binary frames into ``SensorReading`` objects"""
+
+    def __init__(self, max_readings: int = 4096, cache_size: int = 1024):
+        self.max_readings = max_readings
+        self.cache_size = cache_size
+        self._names: Dict[bytes, Tuple[str, ...]] = {}
+        self._arrays: Dict[Tuple[int, bool], struct.Struct] = {}
+
+        # Metrics
+        self.frames = 0
+        self.readings = 0
+
+    def _array(self, count: int, float32: bool) -> struct.Struct:
+        array = self._arrays.get((count, float32))
+        if array is None:
+            array = struct.Struct(f"<{count}{'f' if float32 else 'd'}")
+            if len(self._arrays) < self.cache_size:
+                self._arrays[(count, float32)] = array
+        return array
+
+    def _metric_names(self, block: bytes, columns: int) -> Tuple[str, ...]:
+        names = self._names.get(block)
+        if names is not None:
+            return names
+        parsed = []
+        offset = 0
+        try:
+            while offset < len(block):
+                length = block[offset]
+                parsed.append(block[offset + 1:offset + 1 + length].decode())
+                offset += 1 + length
+        except UnicodeDecodeError as e:
+            raise PayloadError(f"malformed metric name: {e}") from None
+        if offset != len(block) or len(parsed) != columns:
+            raise PayloadError(f"metric name block does not hold {columns} names")
+        if len(set(parsed)) != columns:
+            raise PayloadError("frame repeats a metric name")
+        names = tuple(parsed)
+        if len(self._names) < self.cache_size:
+            self._names[block] = names
+        return names
+
+    def decode(self, field_id: str, raw: bytes) -> List[SensorReading]:
+        """All readings in one frame; raises ``PayloadError`` on a malformed frame"""
+        size = len(raw)
+        if size < _HEADER.size:
+            raise PayloadError(f"frame of {size} bytes is shorter than the header")
+        magic, version, flags, rows, columns, signature_length, names_length, sensor_length = \
+            _HEADER.unpack_from(raw)
+        if magic != MAGIC or version != VERSION:
+            raise PayloadError("not a version 1 HeadyField frame")
+        if not 0 < rows <= self.max_readings:
+            raise PayloadError(f"frame holds {rows} readings, expected 1..{self.max_readings}")
+
+        float32 = bool(flags & FLAG_FLOAT32)
+        names_offset = _HEADER.size + sensor_length
+        offset = names_offset + names_length
+        offset += -offset % 8
+        values_offset = offset + 8 * rows
+        signed_length = values_offset + (4 if float32 else 8) * rows * columns
+        if signed_length + signature_length != size:
+            raise PayloadError(f"frame is {size} bytes, header describes {signed_length + signature_length}")
+
+        try:
+            sensor_id = raw[_HEADER.size:names_offset].decode()
+        except UnicodeDecodeError as e:
+            raise PayloadError(f"malformed sensor_id: {e}") from None
+        if not sensor_id:
+            raise PayloadError("frame has an empty sensor_id")
+        metrics = self._metric_names(raw[names_offset:names_offset + names_length], columns)
+
+        timestamps = self._array(rows, False).unpack_from(raw, offset)
+        if not -_INF < sum(timestamps) < _INF:
+            raise PayloadError("frame has a non-finite timestamp")
+        if min(timestamps) < TIMESTAMP_MIN or max(timestamps) > TIMESTAMP_MAX:
+            raise PayloadError("frame has a timestamp outside the accepted range")
+        values = self._array(rows * columns, float32).unpack_from(raw, values_offset)
+        # A non-finite sum means some value is NaN/inf (or the sum overflowed); filter per reading then
+        finite = -_INF < sum(values) < _INF
+        signature = raw[signed_length:]
+
+        if rows == 1:
+            data = dict(zip(metrics, values))
+            readings = [SensorReading(field_id, sensor_id, timestamps[0], signature, data,
+                                      data if finite else numeric_fields(data), 1.0, raw)]
+        else:
+            readings = []
+            for row, timestamp in enumerate(timestamps):
+                data = dict(zip(metrics, values[row * columns:(row + 1) * columns]))
+                readings.append(SensorReading(field_id, sensor_id, timestamp, signature, data,
+                                              data if finite else numeric_fields(data), 1.0, raw))
+        self.frames += 1
+        self.readings += rows
+        return readings
+
+    def stats(self) -> Dict:
+        """Frames and readings decoded so far"""
+        return {"frames": self.frames, "readings": self.readings}
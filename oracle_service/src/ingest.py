@@ -0,0 +1,109 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - MQTT Ingest Bridge                           ║
+║  "From the network thread to the event loop, nothing lost quietly" ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import collections
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueue:
+    """Bounded queue filled from a foreign thread and drained on an asyncio loop.
+
+    paho invokes its callbacks on the ``loop_start()`` network thread, where no
+    event loop is running. ``put_threadsafe`` appends under a plain lock and
+    wakes the loop with ``call_soon_threadsafe`` only when no wakeup is already
+    pending, so a burst of messages costs one loop wakeup rather than one per
+    message. When the queue is full the item is dropped and counted.
+    """
+
+    def __init__(self, maxsize: int = 10000, name: str = "ingest"):
+        self.maxsize = maxsize
+        self.name = name
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = asyncio.Event()
+        self._wakeup_pending = False
+
+        # Metrics
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the queue to the loop its consumers run on"""
+        self._loop = loop
+
+    def put_threadsafe(self, item: Any) -> bool:
+        """Enqueue from any thread; returns False if the item was dropped"""
+        loop = self._loop
+        with self._lock:
+            if loop is None or len(self._items) >= self.maxsize:
+                self.dropped += 1
+                dropped = self.dropped
+                schedule = False
+            else:
+                self._items.append(item)
+                self.enqueued += 1
+                depth = len(self._items)
+                if depth > self.high_water:
+                    self.high_water = depth
+                schedule = not self._wakeup_pending
+                self._wakeup_pending = True
+                dropped = 0
+
+        if dropped:
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"{self.name} queue overflow: {dropped} messages dropped so far")
+            return False
+
+        if schedule:
+            try:
+                loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+        return True
+
+    def _wake(self):
+        with self._lock:
+            self._wakeup_pending = False
+        self._ready.set()
+
+    async def get_batch(self, max_items: int) -> List[Any]:
+        """Wait for at least one item and return up to ``max_items``"""
+        while True:
+            with self._lock:
+                if self._items:
+                    count = min(max_items, len(self._items))
+                    popleft = self._items.popleft
+                    batch = [popleft() for _ in range(count)]
+                    self.dequeued += count
+                    return batch
+            self._ready.clear()
+            await self._ready.wait()
+
+    def depth(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict:
+        """Snapshot of queue depth and overflow counters"""
+        return {
+            "depth": len(self._items),
+            "capacity": self.maxsize,
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped": self.dropped,
+        }
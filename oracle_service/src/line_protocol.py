@@ -0,0 +1,63 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - InfluxDB Line Protocol Encoder               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+from typing import Dict, Optional, Union
+
+# Newline, carriage return and tab are escaped like influxdb_client's Point does: left
+# raw, a sensor_id or metric key from a payload could end the line and start new points
+_TAG_ESCAPES = str.maketrans({',': '\\,', ' ': '\\ ', '=': '\\=', '\\': '\\\\',
+                              '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+_MEASUREMENT_ESCAPES = str.maketrans({',': '\\,', ' ': '\\ ', '\\': '\\\\',
+                                      '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def escape_tag(value: str) -> str:
+    """Escape a tag key, tag value or field key"""
+    return value.translate(_TAG_ESCAPES)
+
+
+def escape_measurement(value: str) -> str:
+    return value.translate(_MEASUREMENT_ESCAPES)
+
+
+def format_field(value: Union[int, float, bool]) -> Optional[str]:
+    """Field value in line protocol; None for an int outside InfluxDB's int64 range"""
+    value_type = type(value)
+    if value_type is bool:
+        return 'true' if value else 'false'
+    if value_type is int:
+        return f"{value}i" if INT64_MIN <= value <= INT64_MAX else None
+    return repr(value)
+
+
+def encode_point(measurement: str, tags: Dict[str, str], fields: Dict[str, Union[int, float, bool]],
+                 timestamp_ns: int) -> Optional[str]:
+    """Encode one point; returns None when there are no (representable) fields to write"""
+    if not fields:
+        return None
+    field_part = ','.join(f"{escape_tag(k)}={formatted}" for k, formatted
+                          in ((k, format_field(v)) for k, v in fields.items()) if formatted is not None)
+    if not field_part:
+        return None
+    tag_part = ''.join(f",{escape_tag(k)}={escape_tag(v)}" for k, v in sorted(tags.items()) if v)
+    return f"{escape_measurement(measurement)}{tag_part} {field_part} {timestamp_ns}"
+
+
+def seconds_to_ns(timestamp: Union[int, float]) -> int:
+    """Epoch seconds to nanoseconds, at the microsecond precision of datetime.
+
+    Raises ``ValueError`` (``OverflowError`` for infinities) when the result
+    is not a timestamp InfluxDB can store.
+    """
+    ns = int(round(timestamp * 1_000_000)) * 1000
+    if not INT64_MIN <= ns <= INT64_MAX:
+        raise ValueError(f"timestamp {timestamp!r} is outside InfluxDB's range")
+    return ns
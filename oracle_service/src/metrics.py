@@ -0,0 +1,323 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Metrics Registry                             ║
+║  "Measure the pulse without slowing the heart"                     ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Minimal Prometheus text-format metrics. Hot-path metrics are only updated
+from the event loop thread, so plain attribute increments are safe and no
+locks are taken; values owned by other threads (e.g. the ingest queue's
+overflow counter) are exported through callback metrics read at scrape time.
+"""
+
+import asyncio
+import bisect
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _CounterChild] = {}
+        if not self.labelnames:
+            self._unlabelled = self._children[()] = _CounterChild()
+
+    def labels(self, *values: str) -> _CounterChild:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _CounterChild()
+        return child
+
+    def inc(self, amount: float = 1):
+        self._unlabelled.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child.value)}"
+                for labels, child in self._children.items()]
+
+
+class BoundedCounter:
+    """Labelled counter whose first label comes from untrusted input (e.g. a
+    field id taken from the MQTT topic).
+
+    The first ``limit`` distinct values get their own series; later ones are
+    counted under ``overflow``, so a flood of made-up ids cannot grow the
+    exposition without bound. Children are cached per value, so ``count``
+    costs a dict lookup and an increment per value.
+    """
+
+    def __init__(self, counter: Counter, limit: int, overflow: str = 'other'):
+        self.counter = counter
+        self.limit = limit
+        self.overflow = overflow
+        self._values: Set[str] = set()
+        # other label values -> {first label value: child}
+        self._children: Dict[Tuple[str, ...], Dict[str, _CounterChild]] = {}
+
+    def child(self, value: str, *labels: str) -> _CounterChild:
+        children = self._children.get(labels)
+        if children is None:
+            children = self._children[labels] = {}
+        child = children.get(value)
+        if child is None:
+            if value not in self._values:
+                if len(self._values) >= self.limit:
+                    return self.counter.labels(self.overflow, *labels)  # not cached per overflowing value
+                self._values.add(value)
+            child = children[value] = self.counter.labels(value, *labels)
+        return child
+
+    def count(self, values: Iterable[str], *labels: str):
+        """Increment the series of each of ``values`` (with the other ``labels``) once per occurrence"""
+        children = self._children.get(labels)
+        if children is None:
+            children = self._children[labels] = {}
+        for value in values:
+            child = children.get(value)
+            if child is None:
+                child = self.child(value, *labels)
+            child.value += 1
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float):
+        self._unlabelled.value = value
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally labelled"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        if not self.labelnames:
+            self._unlabelled = self._children[()] = _HistogramChild(self.bounds)
+
+    def labels(self, *values: str) -> _HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _HistogramChild(self.bounds)
+        return child
+
+    def observe(self, value: float):
+        self._unlabelled.observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{label_str} {child.count}")
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge whose value(s) are read from a callback at scrape time.
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers for labelled metrics.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable, kind: str = 'gauge',
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        value = self.callback()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            return [f"{self.name} {_format_value(value)}"]
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+                for labels, v in value.items()]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, callback: Callable, kind: str = 'gauge',
+                 labelnames: Sequence[str] = ()) -> CallbackMetric:
+        """Register (or replace) a metric read from ``callback`` at scrape time"""
+        metric = CallbackMetric(name, documentation, callback, kind, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def merge_expositions(expositions: Dict[str, str], label: str = 'worker') -> str:
+    """Merge text-format expositions from several processes into one.
+
+    Every sample gets a ``label`` naming its source, and each metric family's
+    HELP/TYPE header is emitted once, followed by the samples of all sources.
+    """
+    families: Dict[str, List[str]] = {}
+    headers: Dict[str, List[str]] = {}
+    for source, text in expositions.items():
+        tag = f'{label}="{_escape(source)}"'
+        family = None
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith('#'):
+                parts = line.split(' ', 3)
+                if len(parts) >= 3 and parts[1] in ('HELP', 'TYPE'):
+                    family = parts[2]
+                    if family not in families:
+                        families[family] = []
+                        headers[family] = []
+                    if len(headers[family]) < 2:
+                        headers[family].append(line)
+                continue
+            brace = line.find('{')
+            space = line.find(' ')
+            if brace != -1 and brace < space:
+                sample = f"{line[:brace + 1]}{tag},{line[brace + 1:]}"
+            else:
+                sample = f"{line[:space]}{{{tag}}}{line[space:]}"
+            families.setdefault(family or line[:space], []).append(sample)
+    lines = []
+    for family, samples in families.items():
+        lines.extend(headers.get(family, ()))
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag as the overshoot of a periodic sleep"""
+
+    def __init__(self, interval: float = 0.25, registry: Optional[MetricsRegistry] = None):
+        registry = registry or REGISTRY
+        self.interval = interval
+        self.lag_seconds = 0.0
+        self._histogram = registry.histogram(
+            'oracle_event_loop_lag_seconds', 'Event loop scheduling lag')
+        registry.callback('oracle_event_loop_lag_last_seconds',
+                          'Most recent event loop lag sample', lambda: self.lag_seconds)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag_seconds = max(0.0, time.perf_counter() - expected)
+            self._histogram.observe(self.lag_seconds)
@@ -9,43 +9,61 @@ HEADY_BRAND:END
 """
 
 import asyncio
-import json
 import logging
+import math
 import os
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
-import uvicorn
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from paho.mqtt.client import Client as MQTTClient
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 
+from .admission import MODES, NORMAL, STORE_ONLY, AdmissionController, parse_priorities
+from .batch_writer import InfluxBatchWriter, is_rejected_write
+from .brain_client import HeadyBrainClient, is_retryable
+from .columnar import ColumnarTee
+from .connections import ManagedLink
+from .codec import PayloadDecoder, PayloadError, SensorReading
+from .dedup import DedupIndex, ReorderBuffer
+from .frames import FrameDecoder
+from .ingest import IngestQueue
+from .line_protocol import encode_point, seconds_to_ns
+from .metrics import REGISTRY, SIZE_BUCKETS, BoundedCounter, LoopLagMonitor
+from .retry import FibonacciBackoff, RetryBudget, RetryPolicy
+from .rollup import RollupAggregator, check_rollup_scale_mode, parse_tiers
+from .scoring import AnomalyScorer
+from .sharding import FieldRouter
+from .spool import SpoolReplayer, WriteAheadSpool
+from .streaming import FanoutHub, StreamLimitReached, json_array, parse_filter, sse_event
+from .supervisor import run_supervisor, serve, worker_processes
+from .timeseries import TimeSeriesStore
+from .verification import SignatureVerifier
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="HeadyField Oracle", version="1.0.0")
 
-class FibonacciBackoff:
-    """Fibonacci sequence backoff for resilient retries"""
-    
-    def __init__(self, max_retries: int = 13, base_delay: int = 1000):
-        self.max_retries = max_retries
-        self.base_delay = base_delay
-        self.sequence = self._generate_fibonacci(max_retries)
-    
-    def _generate_fibonacci(self, n: int) -> List[int]:
-        fib = [1, 1]
-        for i in range(2, n):
-            fib.append(fib[i-1] + fib[i-2])
-        return fib
-    
-    def get_delay(self, attempt: int) -> int:
-        if attempt >= len(self.sequence):
-            return self.sequence[-1] * self.base_delay
-        return self.sequence[attempt] * self.base_delay
+# Hot-path metrics (updated on the event loop thread only)
+STAGE_DURATION = REGISTRY.histogram(
+    'oracle_stage_duration_seconds', 'Time spent on one ingest batch per pipeline stage', ['stage'])
+BATCH_SIZE = REGISTRY.histogram(
+    'oracle_ingest_batch_messages', 'Messages per ingest batch', buckets=SIZE_BUCKETS)
+BRAIN_LATENCY = REGISTRY.histogram(
+    'oracle_brain_analysis_seconds', 'HeadyBrain analysis latency per reading')
+MESSAGES = REGISTRY.counter(
+    'oracle_messages_total', 'Sensor messages by field and outcome', ['field_id', 'outcome'])
+# Field ids come from MQTT topics: past the limit they are counted as field_id="other"
+FIELD_MESSAGES = BoundedCounter(MESSAGES, int(os.getenv('ORACLE_METRICS_MAX_FIELDS', '500')))
+_DECODE = STAGE_DURATION.labels('decode')
+_VERIFY = STAGE_DURATION.labels('verify')
+_SCORE = STAGE_DURATION.labels('score')
+_STORE = STAGE_DURATION.labels('store')
 
 class HeadyOracle:
     """Main oracle service for cryptographic verification of field data"""
@@ -54,14 +72,27 @@ class HeadyOracle:
         self.mqtt_client = MQTTClient()
         self.influx_client = None
         self.write_api = None
-        self.backoff = FibonacciBackoff()
+        self.backoff = FibonacciBackoff.from_env()
+        # One budget for every retry policy, so an outage cannot turn into a retry storm
+        self.retry_budget = RetryBudget(
+            ratio=float(os.getenv('ORACLE_RETRY_BUDGET_RATIO', '0.2')),
+            min_per_second=float(os.getenv('ORACLE_RETRY_BUDGET_MIN_PER_SECOND', '1'))
+        )
+        reconnect_max_delay = int(os.getenv('ORACLE_RECONNECT_MAX_DELAY_MS', '60000')) / 1000.0
         self.verification_threshold = float(os.getenv('VERIFICATION_THRESHOLD', '0.95'))
+        self.decoder = PayloadDecoder.from_env()
+        self.frames = FrameDecoder(max_readings=int(os.getenv('ORACLE_FRAME_MAX_READINGS', '4096')))
+        self.verifier = SignatureVerifier.from_env()
         
         # MQTT Configuration
         self.mqtt_broker = os.getenv('MQTT_BROKER', 'heady_mqtt')
         self.mqtt_port = int(os.getenv('MQTT_PORT', '1883'))
         self.mqtt_username = os.getenv('MQTT_USERNAME', 'heady_field')
         self.mqtt_password = os.getenv('MQTT_PASSWORD', '')
+        self.mqtt_client.username_pw_set(self.mqtt_username, self.mqtt_password)
+        self.mqtt_client.on_connect = self._on_mqtt_connect
+        self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
+        self.mqtt_client.on_message = self._on_mqtt_message
         
         # InfluxDB Configuration
         self.influx_url = os.getenv('INFLUX_URL', 'http://heady_vault:8086')
@@ -69,155 +100,892 @@ class HeadyOracle:
         self.influx_org = os.getenv('INFLUX_ORG', 'HeadyConnection')
         self.influx_bucket = os.getenv('INFLUX_BUCKET', 'field_data')
         
+        # Both links are (re)connected in the background; the API is up from the start
+        self.mqtt_link = ManagedLink(
+            'mqtt', self._connect_mqtt, self.backoff,
+            probe=self._probe_mqtt, probe_interval=5.0, max_delay=reconnect_max_delay
+        )
+        self.influx_link = ManagedLink(
+            'influxdb', self._connect_influxdb, self.backoff,
+            probe=self._probe_influxdb, probe_interval=10.0, max_delay=reconnect_max_delay,
+            on_up=self._on_influx_up, on_down=self._on_influx_down
+        )
+        
+        # Disk spool absorbing writes while InfluxDB is unavailable
+        spool_dir = os.getenv('ORACLE_SPOOL_DIR', '/app/spool')
+        self.spool = WriteAheadSpool(
+            spool_dir,
+            segment_bytes=int(os.getenv('ORACLE_SPOOL_SEGMENT_MB', '16')) * 1024 * 1024,
+            max_bytes=int(os.getenv('ORACLE_SPOOL_MAX_MB', '1024')) * 1024 * 1024,
+            fsync=os.getenv('ORACLE_SPOOL_FSYNC', 'interval')
+        ) if spool_dir else None
+        self.spool_replayer = SpoolReplayer(
+            self.spool,
+            self._write_records,
+            self._influx_healthy,
+            on_recovered=self._on_influx_recovered,
+            rate=float(os.getenv('ORACLE_SPOOL_REPLAY_RATE', '50000')),
+            batch_size=int(os.getenv('INFLUX_BATCH_SIZE', '5000')),
+            is_rejected=is_rejected_write
+        ) if self.spool else None
+        
+        self.writer = InfluxBatchWriter(
+            self._write_records,
+            self.influx_bucket,
+            batch_size=int(os.getenv('INFLUX_BATCH_SIZE', '5000')),
+            flush_interval=int(os.getenv('INFLUX_FLUSH_INTERVAL_MS', '1000')) / 1000.0,
+            max_buffered=int(os.getenv('INFLUX_MAX_BUFFERED', '100000')),
+            spool=self.spool,
+            retry=self._retry_policy('influx_write', 'INFLUX_RETRY', attempts=3, base_delay_ms=200,
+                                     deadline_ms=5000, retryable=self._is_retryable_write_error),
+            latency_half_life=float(os.getenv('INFLUX_LATENCY_HALF_LIFE_SECONDS', '10'))
+        )
+        
+        # Raw points can go to a short-retention bucket, or be replaced by rollups entirely
+        self.store_raw = os.getenv('ORACLE_STORE_RAW', 'on') != 'off'
+        self.raw_bucket = os.getenv('ORACLE_RAW_BUCKET') or self.influx_bucket
+        self.rollup_bucket = os.getenv('ORACLE_ROLLUP_BUCKET') or self.influx_bucket
+        rollup_tiers = parse_tiers(os.getenv('ORACLE_ROLLUP_TIERS', ''))
+        check_rollup_scale_mode(rollup_tiers, os.getenv('ORACLE_SCALE_MODE', 'single'))
+        self.rollup = RollupAggregator(
+            rollup_tiers,
+            grace=float(os.getenv('ORACLE_ROLLUP_GRACE_SECONDS', '10'))
+        ) if rollup_tiers else None
+        self._rollup_task = None
+        
+        # Optional columnar archive of every stored reading, for offline analysis and replay
+        columnar_dir = os.getenv('ORACLE_COLUMNAR_DIR', '')
+        self.columnar = ColumnarTee(
+            columnar_dir,
+            fmt=os.getenv('ORACLE_COLUMNAR_FORMAT', 'parquet'),
+            compression=os.getenv('ORACLE_COLUMNAR_COMPRESSION', 'zstd'),
+            row_group_rows=int(os.getenv('ORACLE_COLUMNAR_ROW_GROUP', '65536')),
+            flush_interval=float(os.getenv('ORACLE_COLUMNAR_FLUSH_SECONDS', '30')),
+            rotate_seconds=float(os.getenv('ORACLE_COLUMNAR_ROTATE_SECONDS', '900'))
+        ) if columnar_dir else None
+
+        # Live fan-out of stored readings over SSE/WebSocket
+        self.streaming = FanoutHub(
+            max_subscribers=int(os.getenv('ORACLE_STREAM_MAX_SUBSCRIBERS', '5000')),
+            buffer=int(os.getenv('ORACLE_STREAM_BUFFER', '1000')),
+            keepalive=float(os.getenv('ORACLE_STREAM_KEEPALIVE_SECONDS', '15')),
+            min_interval=int(os.getenv('ORACLE_STREAM_MIN_INTERVAL_MS', '100')) / 1000.0
+        ) if os.getenv('ORACLE_STREAMING', 'on') != 'off' else None
+        
+        # Recent readings kept in memory for dashboard queries
+        self.timeseries = TimeSeriesStore(
+            capacity=int(os.getenv('ORACLE_WINDOW_CAPACITY', '1200')),
+            retention=float(os.getenv('ORACLE_WINDOW_SECONDS', '600')),
+            max_series=int(os.getenv('ORACLE_WINDOW_MAX_SERIES', '10000')),
+            max_points=int(os.getenv('ORACLE_SERIES_MAX_POINTS', '1000'))
+        )
+        
+        # Redelivered readings are dropped; optionally hold readings briefly to restore order
+        self.dedup = DedupIndex(
+            window=float(os.getenv('ORACLE_DEDUP_WINDOW_SECONDS', '120')),
+            max_keys=int(os.getenv('ORACLE_DEDUP_MAX_KEYS', '1000000'))
+        ) if os.getenv('ORACLE_DEDUP', 'on') != 'off' else None
+        reorder_window = int(os.getenv('ORACLE_REORDER_WINDOW_MS', '0')) / 1000.0
+        self.reorder = ReorderBuffer(reorder_window) if reorder_window > 0 else None
+        self._reorder_task = None
+        
+        # Local anomaly scoring: only readings below the threshold go to HeadyBrain
+        self.scorer = AnomalyScorer(
+            self.verification_threshold,
+            alpha=float(os.getenv('ORACLE_SCORING_ALPHA', '0.05')),
+            history=int(os.getenv('ORACLE_SCORING_HISTORY', '64')),
+            min_samples=int(os.getenv('ORACLE_SCORING_MIN_SAMPLES', '16')),
+            z_scale=float(os.getenv('ORACLE_SCORING_Z_SCALE', '10'))
+        ) if os.getenv('ORACLE_SCORING', 'on') != 'off' else None
+        
         # HeadyBrain Integration
         self.brain_endpoint = os.getenv('HEADY_BRAIN_ENDPOINT', 'https://headyio.com/api/brain/analyze')
+        self.brain = HeadyBrainClient(
+            self.brain_endpoint,
+            self.verification_threshold,
+            batch_window=int(os.getenv('HEADY_BRAIN_BATCH_WINDOW_MS', '20')) / 1000.0,
+            max_batch=int(os.getenv('HEADY_BRAIN_MAX_BATCH', '100')),
+            max_in_flight=int(os.getenv('HEADY_BRAIN_MAX_IN_FLIGHT', '16')),
+            timeout=int(os.getenv('HEADY_BRAIN_TIMEOUT_MS', '2000')) / 1000.0,
+            max_connections=int(os.getenv('HEADY_BRAIN_MAX_CONNECTIONS', '32')),
+            retry=self._retry_policy('brain', 'HEADY_BRAIN_RETRY', attempts=2, base_delay_ms=50,
+                                     deadline_ms=int(os.getenv('HEADY_BRAIN_TIMEOUT_MS', '2000')),
+                                     retryable=is_retryable)
+        ) if self.brain_endpoint else None
+        
+        # Scale-out: which fields this replica subscribes to and processes
+        self.router = FieldRouter.from_env()
+        
+        # Ingest pipeline: paho network thread -> bounded queue -> asyncio workers
+        self.ingest_queue = IngestQueue(maxsize=int(os.getenv('ORACLE_INGEST_QUEUE_SIZE', '10000')))
+        self.ingest_workers = int(os.getenv('ORACLE_INGEST_WORKERS', '8'))
+        self.ingest_batch_size = int(os.getenv('ORACLE_INGEST_BATCH_SIZE', '256'))
+        self.messages_processed = 0
+        self.messages_failed = 0
+        self.messages_invalid = 0
+        self.readings_unencodable = 0
+        self._worker_tasks: List[asyncio.Task] = []
         
+        # HeadyBrain analyses run beside ingest; past the limit suspicious readings are stored unanalyzed
+        self.max_pending_analyses = int(os.getenv('ORACLE_MAX_PENDING_ANALYSES', '1024'))
+        self._analysis_tasks: Set[asyncio.Task] = set()
+        self.analyses_skipped = 0
+        self.loop_lag = LoopLagMonitor()
+        
+        # Load shedding: degrade per field priority while the pipeline is saturated
+        self.admission = AdmissionController(
+            queue_fill=lambda: self.ingest_queue.depth() / self.ingest_queue.maxsize,
+            loop_lag=lambda: self.loop_lag.lag_seconds,
+            write_latency=self.writer.write_latency,
+            queue_limit=float(os.getenv('ORACLE_ADMISSION_QUEUE_FILL', '0.5')),
+            lag_limit=int(os.getenv('ORACLE_ADMISSION_LOOP_LAG_MS', '100')) / 1000.0,
+            write_limit=int(os.getenv('ORACLE_ADMISSION_WRITE_LATENCY_MS', '1000')) / 1000.0,
+            sample_every=int(os.getenv('ORACLE_ADMISSION_SAMPLE_EVERY', '10')),
+            priorities=parse_priorities(os.getenv('ORACLE_FIELD_PRIORITIES', '')),
+            cooldown=float(os.getenv('ORACLE_ADMISSION_COOLDOWN_SECONDS', '10'))
+        ) if os.getenv('ORACLE_ADMISSION', 'on') != 'off' else None
+        if self.admission and os.getenv('ORACLE_ADMISSION_MODE', 'auto') != 'auto':
+            self.admission.pin(os.getenv('ORACLE_ADMISSION_MODE'))
+        self._admission_task = None
+        self._register_metrics()
+        
+    def _retry_policy(self, name: str, prefix: str, attempts: int, base_delay_ms: int, deadline_ms: int,
+                      retryable) -> RetryPolicy:
+        """Retry policy configured by <prefix>_ATTEMPTS, _BASE_DELAY_MS and _DEADLINE_MS"""
+        return RetryPolicy(
+            name,
+            FibonacciBackoff(self.backoff.max_retries, int(os.getenv(f'{prefix}_BASE_DELAY_MS', str(base_delay_ms))),
+                             self.backoff.jitter),
+            self.retry_budget,
+            max_attempts=int(os.getenv(f'{prefix}_ATTEMPTS', str(attempts))),
+            deadline=int(os.getenv(f'{prefix}_DEADLINE_MS', str(deadline_ms))) / 1000.0,
+            retryable=retryable
+        )
+    
+    def set_verification_threshold(self, threshold: float):
+        """Change the confidence below which readings are analyzed by HeadyBrain"""
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Verification threshold {threshold} is outside (0, 1]")
+        self.verification_threshold = threshold
+        if self.scorer:
+            self.scorer.threshold = threshold
+        if self.brain:
+            self.brain.verification_threshold = threshold
+        logger.info(f"Verification threshold set to {threshold:.3f}")
+    
+    def _retry_policies(self) -> List[RetryPolicy]:
+        return [policy for policy in (self.writer.retry, self.brain.retry if self.brain else None) if policy]
+    
+    def _register_metrics(self):
+        """Export component counters and queue depths, read at scrape time"""
+        REGISTRY.callback('oracle_ingest_queue_depth', 'Messages waiting in the ingest queue',
+                          self.ingest_queue.depth)
+        REGISTRY.callback('oracle_ingest_queue_high_water', 'Highest ingest queue depth seen',
+                          lambda: self.ingest_queue.high_water)
+        REGISTRY.callback('oracle_ingest_dropped_total', 'Messages dropped on ingest queue overflow',
+                          lambda: self.ingest_queue.dropped, kind='counter')
+        REGISTRY.callback('oracle_influx_buffered_records', 'Records waiting in the InfluxDB batch buffer',
+                          self.writer.buffered)
+        REGISTRY.callback('oracle_influx_records_total', 'Records by InfluxDB write outcome',
+                          lambda: {('written',): self.writer.records_written,
+                                   ('spooled',): self.writer.records_spooled,
+                                   ('dropped',): self.writer.records_dropped,
+                                   ('rejected',): self.writer.records_rejected
+                                   + (self.spool_replayer.records_rejected if self.spool_replayer else 0)},
+                          kind='counter', labelnames=['outcome'])
+        REGISTRY.callback('oracle_spool_pending_bytes', 'Bytes waiting in the disk spool',
+                          lambda: self.spool.pending_bytes() if self.spool else 0)
+        REGISTRY.callback('oracle_reorder_pending', 'Readings held by the reorder buffer',
+                          lambda: self.reorder.pending() if self.reorder else 0)
+        REGISTRY.callback('oracle_dedup_duplicates_total', 'Redelivered readings suppressed',
+                          lambda: self.dedup.duplicates if self.dedup else 0, kind='counter')
+        REGISTRY.callback('oracle_admission_level', 'Admission mode (0 normal, 1 skip_analysis, 2 store_only, 3 sample)',
+                          lambda: self.admission.level if self.admission else 0)
+        REGISTRY.callback('oracle_brain_in_flight', 'HeadyBrain requests in flight',
+                          lambda: self.brain.in_flight if self.brain else 0)
+        REGISTRY.callback('oracle_brain_analyses_pending', 'Readings awaiting HeadyBrain analysis',
+                          lambda: len(self._analysis_tasks))
+        REGISTRY.callback('oracle_brain_analyses_skipped_total',
+                          'Suspicious readings stored unanalyzed because too many analyses were pending',
+                          lambda: self.analyses_skipped, kind='counter')
+        REGISTRY.callback('oracle_retries_total', 'Retried attempts by operation',
+                          lambda: {(p.name,): p.retries for p in self._retry_policies()},
+                          kind='counter', labelnames=['operation'])
+        REGISTRY.callback('oracle_retry_budget_denied_total', 'Retries refused by the retry budget',
+                          lambda: self.retry_budget.denied, kind='counter')
+        REGISTRY.callback('oracle_stream_subscribers', 'Live SSE/WebSocket subscribers',
+                          lambda: self.streaming.stats()["subscribers"] if self.streaming else 0)
+    
     async def initialize(self):
-        """Initialize all connections"""
-        await self._setup_mqtt()
-        await self._setup_influxdb()
-        logger.info("HeadyField Oracle initialized successfully")
-    
-    async def _setup_mqtt(self):
-        """Setup MQTT connection with Fibonacci backoff"""
-        for attempt in range(self.backoff.max_retries):
+        """Start the pipeline; MQTT and InfluxDB connect in the background"""
+        self._open_spool()
+        self.loop_lag.start()
+        self.writer.mark_vault_unavailable()  # until the InfluxDB link is up
+        self.writer.start()
+        if self.rollup:
+            self._rollup_task = asyncio.create_task(self._rollup_flush_loop())
+        if self.columnar:
+            self.columnar.start()
+        self.verifier.start()
+        if self.brain:
+            await self.brain.start()
+        self._start_ingest_workers()
+        self.influx_link.start()
+        self.mqtt_link.start()
+        logger.info("HeadyField Oracle started, connecting to MQTT and InfluxDB in the background")
+    
+    async def shutdown(self):
+        """Stop ingesting and flush buffered data to InfluxDB"""
+        self.close_streams()
+        await self.mqtt_link.stop()
+        self.mqtt_client.disconnect()
+        await asyncio.to_thread(self.mqtt_client.loop_stop)
+        await self._stop_ingest_workers()
+        if self.brain:
+            await self.brain.close()
+        await self.verifier.close()
+        await self._stop_rollups()
+        if self.columnar:
             try:
-                self.mqtt_client.username_pw_set(self.mqtt_username, self.mqtt_password)
-                self.mqtt_client.connect(self.mqtt_broker, self.mqtt_port, 60)
-                self.mqtt_client.on_message = self._on_mqtt_message
-                self.mqtt_client.subscribe("field/+/sensors")
-                self.mqtt_client.loop_start()
-                logger.info("MQTT connection established")
-                return
+                await self.columnar.close()
             except Exception as e:
-                delay = self.backoff.get_delay(attempt) / 1000.0
-                logger.warning(f"MQTT connection attempt {attempt + 1} failed: {e}. Retrying in {delay}s")
-                await asyncio.sleep(delay)
+                logger.error(f"Error closing columnar archive: {e}")
+        if self.spool_replayer:
+            await self.spool_replayer.stop()
+        await self.writer.close()
+        await self.influx_link.stop()
+        if self.spool:
+            self.spool.close()
+        await self.loop_lag.stop()
+        if self.influx_client:
+            self.influx_client.close()
+        logger.info("HeadyField Oracle shut down")
+    
+    def close_streams(self):
+        """End all live SSE/WebSocket feeds"""
+        if self.streaming:
+            self.streaming.close()
+
+    def _open_spool(self):
+        """Open the disk spool and start replaying anything left from a previous run"""
+        if not self.spool:
+            logger.warning("ORACLE_SPOOL_DIR is empty - writes are dropped while InfluxDB is down")
+            return
+        try:
+            self.spool.open()
+        except OSError as e:
+            logger.error(f"Cannot open spool at {self.spool.directory}: {e}; writes are dropped while InfluxDB is down")
+            self.spool = self.writer.spool = self.spool_replayer = None
+            return
+        self.spool_replayer.start()
+    
+    def _influx_healthy(self) -> bool:
+        """Blocking InfluxDB health probe used by the spool replayer"""
+        if self.influx_client is None or self.write_api is None:
+            return False
+        return self.influx_client.health().status == "pass"
+    
+    def _on_influx_recovered(self):
+        self.writer.mark_vault_available()
+    
+    async def _connect_mqtt(self):
+        """Connect to the broker and start paho's network thread (subscribing happens in on_connect)"""
+        # Join the network thread of a dropped connection before starting a new one
+        await asyncio.to_thread(self.mqtt_client.loop_stop)
+        await asyncio.to_thread(self.mqtt_client.connect, self.mqtt_broker, self.mqtt_port, 60)
+        self.mqtt_client.loop_start()
+    
+    async def _probe_mqtt(self) -> bool:
+        return self.mqtt_client.is_connected()
+    
+    def _on_mqtt_connect(self, client, userdata, flags, rc):
+        """(Re)subscribe on every successful connect (runs on the paho network thread)"""
+        if rc != 0:
+            client.loop_stop()
+            self.mqtt_link.mark_down_threadsafe(f"broker refused connection (rc={rc})")
+            return
+        subscriptions = self.router.subscriptions()
+        client.subscribe([(topic, 0) for topic in subscriptions])
+        logger.info(f"MQTT connection established, subscribed to {', '.join(subscriptions)} "
+                    f"(replica {self.router.replica_index + 1}/{self.router.replica_count}, "
+                    f"{self.router.mode} mode)")
+    
+    def _on_mqtt_disconnect(self, client, userdata, rc):
+        """Hand an unexpected disconnect to the link supervisor instead of paho's own reconnect loop"""
+        if rc != 0:
+            client.loop_stop()
+            self.mqtt_link.mark_down_threadsafe(f"connection lost (rc={rc})")
+    
+    async def _connect_influxdb(self):
+        """Open an InfluxDB client and require a passing health check"""
+        def connect():
+            client = InfluxDBClient(url=self.influx_url, token=self.influx_token, org=self.influx_org)
+            health = client.health()
+            if health.status != "pass":
+                client.close()
+                raise ConnectionError(f"InfluxDB health check failed: {health.message}")
+            return client
         
-        raise Exception("Failed to establish MQTT connection after maximum retries")
+        client = await asyncio.to_thread(connect)
+        if self.influx_client:
+            self.influx_client.close()
+        self.influx_client = client
+        self.write_api = client.write_api(write_options=SYNCHRONOUS)
+    
+    async def _probe_influxdb(self) -> bool:
+        return await asyncio.to_thread(self._influx_healthy)
+    
+    def _on_influx_up(self):
+        """Resume direct writes and replay whatever was spooled while the vault was away"""
+        self.writer.mark_vault_available()
+        if self.spool_replayer:
+            self.spool_replayer.wake()
+    
+    def _on_influx_down(self):
+        self.writer.mark_vault_unavailable()
+    
+    def _start_ingest_workers(self):
+        """Bind the ingest queue to the running loop and start the consumer pool"""
+        self.ingest_queue.bind(asyncio.get_running_loop())
+        for worker_id in range(self.ingest_workers):
+            self._worker_tasks.append(asyncio.create_task(self._ingest_worker(worker_id)))
+        if self.reorder:
+            self._reorder_task = asyncio.create_task(self._reorder_flush_loop())
+        if self.admission:
+            self._admission_task = asyncio.create_task(self._admission_loop())
     
-    async def _setup_influxdb(self):
-        """Setup InfluxDB connection with Fibonacci backoff"""
-        for attempt in range(self.backoff.max_retries):
+    async def _stop_ingest_workers(self, drain_timeout: float = 5.0):
+        """Give the workers a chance to drain the queue, then cancel them"""
+        deadline = time.monotonic() + drain_timeout
+        while self.ingest_queue.depth() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+        if self._admission_task:
+            self._admission_task.cancel()
+            await asyncio.gather(self._admission_task, return_exceptions=True)
+            self._admission_task = None
+        if self._reorder_task:
+            self._reorder_task.cancel()
+            await asyncio.gather(self._reorder_task, return_exceptions=True)
+            self._reorder_task = None
+            await self._dispatch(self.reorder.drain())
+        if self._analysis_tasks:
+            # Analyses store their reading when done; let them finish before the writer drains
+            await asyncio.wait(set(self._analysis_tasks), timeout=drain_timeout)
+    
+    def _on_mqtt_message(self, client, userdata, message):
+        """Handle incoming MQTT sensor data (runs on the paho network thread)"""
+        if self.router.accept(message.topic):
+            self.ingest_queue.put_threadsafe((message.topic, message.payload))
+    
+    async def _ingest_worker(self, worker_id: int):
+        """Drain the ingest queue in batches on the event loop"""
+        while True:
+            batch = await self.ingest_queue.get_batch(self.ingest_batch_size)
+            try:
+                await self._process_batch(batch)
+            except Exception as e:
+                logger.error(f"Ingest worker {worker_id} failed on batch of {len(batch)}: {e}")
+    
+    async def _process_batch(self, batch: List):
+        """Decode, verify and score a batch of raw messages, then analyze or store them"""
+        started = time.perf_counter()
+        BATCH_SIZE.observe(len(batch))
+        decode = self.decoder.decode
+        decode_frame = self.frames.decode
+        # While sampling, shed messages before they cost a decode or a signature check
+        admit = self.admission.admit if self.admission and self.admission.level >= STORE_ONLY else None
+        readings = []
+        shed, invalid = [], []
+        for topic, raw in batch:
             try:
-                self.influx_client = InfluxDBClient(
-                    url=self.influx_url,
-                    token=self.influx_token,
-                    org=self.influx_org
-                )
-                self.write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
-                
-                # Test connection
-                health = self.influx_client.health()
-                if health.status == "pass":
-                    logger.info("InfluxDB connection established")
-                    return
+                topic_parts = topic.split('/')
+                field_id = topic_parts[1]  # Extract field ID from topic
+                if admit and not admit(field_id):
+                    shed.append(field_id)
+                    continue
+                if len(topic_parts) > 3 and topic_parts[3] == 'bin':
+                    readings.extend(decode_frame(field_id, raw))
                 else:
-                    raise Exception(f"InfluxDB health check failed: {health.message}")
-                    
+                    readings.append(decode(field_id, raw))
+            except PayloadError as e:
+                self.messages_invalid += 1
+                invalid.append(field_id)
+                logger.warning(f"Rejected malformed payload on {topic}: {e}")
             except Exception as e:
-                delay = self.backoff.get_delay(attempt) / 1000.0
-                logger.warning(f"InfluxDB connection attempt {attempt + 1} failed: {e}. Retrying in {delay}s")
-                await asyncio.sleep(delay)
+                self.messages_failed += 1
+                logger.error(f"Error processing MQTT message: {e}")
+        decoded = time.perf_counter()
+        _DECODE.observe(decoded - started)
+        if shed:
+            FIELD_MESSAGES.count(shed, 'shed')
+        if invalid:
+            FIELD_MESSAGES.count(invalid, 'invalid')
         
-        raise Exception("Failed to establish InfluxDB connection after maximum retries")
+        # Verify cryptographic signatures for the whole batch at once
+        verdicts = await self.verifier.verify_batch(readings)
+        
+        verified_readings = []
+        rejected = []
+        for reading, verified in zip(readings, verdicts):
+            if not verified:
+                logger.error(f"Invalid signature for field {reading.field_id}")
+                self.messages_failed += 1
+                rejected.append(reading.field_id)
+                continue
+            verified_readings.append(reading)
+        if rejected:
+            FIELD_MESSAGES.count(rejected, 'rejected')
+        FIELD_MESSAGES.count([reading.field_id for reading in verified_readings], 'accepted')
+        _VERIFY.observe(time.perf_counter() - decoded)
+        
+        # Drop redeliveries before they cost a score, an analysis and a write
+        if self.dedup and verified_readings:
+            verified_readings, duplicates = self.dedup.filter(verified_readings, time.time())
+            if duplicates:
+                FIELD_MESSAGES.count([reading.field_id for reading in duplicates], 'duplicate')
+        if self.reorder:
+            verified_readings = self.reorder.push(verified_readings, time.monotonic())
+        await self._dispatch(verified_readings)
     
-    def _on_mqtt_message(self, client, userdata, message):
-        """Handle incoming MQTT sensor data"""
-        try:
-            topic_parts = message.topic.split('/')
-            field_id = topic_parts[1]  # Extract field ID from topic
-            
-            payload = json.loads(message.payload.decode())
-            
-            # Verify cryptographic signature
-            if not self._verify_signature(payload):
-                logger.error(f"Invalid signature for field {field_id}")
-                return
-            
-            # Analyze with HeadyBrain
-            asyncio.create_task(self._analyze_with_brain(field_id, payload))
-            
-        except Exception as e:
-            logger.error(f"Error processing MQTT message: {e}")
+    async def _reorder_flush_loop(self):
+        """Release readings whose reorder delay has passed even if their sensor went quiet"""
+        interval = max(0.01, self.reorder.delay / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._dispatch(self.reorder.expire(time.monotonic()))
+            except Exception as e:
+                logger.error(f"Error releasing reordered readings: {e}")
+    
+    async def _dispatch(self, readings: List[SensorReading]):
+        """Score readings, then analyze the suspicious ones and store the rest"""
+        if not readings:
+            return
+        count = len(readings)
+        
+        # Degraded fields: store_only and sample skip scoring, skip_analysis skips HeadyBrain
+        admission = self.admission
+        degraded = admission is not None and admission.level > NORMAL
+        unscored: List[SensorReading] = []
+        if degraded:
+            scored = []
+            for reading in readings:
+                (unscored if admission.level_for(reading.field_id) >= STORE_ONLY else scored).append(reading)
+            admission.scoring_skipped += len(unscored)
+            readings = scored
+        
+        # Score locally; plausible readings skip the remote analysis
+        if self.scorer and readings:
+            started = time.perf_counter()
+            confidences = self.scorer.score_batch(readings)
+            for reading, confidence in zip(readings, confidences.tolist()):
+                reading.confidence = confidence
+            _SCORE.observe(time.perf_counter() - started)
+            threshold = self.verification_threshold
+            plausible = [r for r in readings if r.confidence >= threshold]
+            suspicious = [r for r in readings if r.confidence < threshold]
+        else:
+            plausible, suspicious = [], readings
+        if degraded and suspicious:
+            analyze = []
+            for reading in suspicious:
+                (analyze if admission.level_for(reading.field_id) == NORMAL else plausible).append(reading)
+            admission.analysis_skipped += len(suspicious) - len(analyze)
+            suspicious = analyze
+        
+        # Analyze suspicious readings with HeadyBrain in the background, so a slow
+        # HeadyBrain never holds up ingest; store the rest right away
+        room = max(0, self.max_pending_analyses - len(self._analysis_tasks))
+        if len(suspicious) > room:
+            self.analyses_skipped += len(suspicious) - room
+            plausible = plausible + suspicious[room:]
+            suspicious = suspicious[:room]
+        for reading in suspicious:
+            task = asyncio.create_task(self._analyze_with_brain(reading))
+            self._analysis_tasks.add(task)
+            task.add_done_callback(self._analysis_tasks.discard)
+        await self._store_readings(plausible + unscored if unscored else plausible)
+        self.messages_processed += count
     
-    def _verify_signature(self, payload: Dict) -> bool:
-        """Verify cryptographic signature of sensor data"""
-        # TODO: Implement actual cryptographic verification
-        # For now, check required fields
-        required_fields = ['timestamp', 'sensor_id', 'signature', 'data']
-        return all(field in payload for field in required_fields)
+    async def _admission_loop(self):
+        """Re-evaluate the admission mode from the current load signals"""
+        while True:
+            await asyncio.sleep(0.25)
+            try:
+                self.admission.evaluate()
+            except Exception as e:
+                logger.error(f"Error evaluating admission mode: {e}")
     
-    async def _analyze_with_brain(self, field_id: str, payload: Dict):
+    async def _analyze_with_brain(self, reading: SensorReading):
         """Send data to HeadyBrain for analysis"""
         try:
-            analysis_payload = {
-                'type': 'FIELD_DATA_ANALYSIS',
-                'field_id': field_id,
-                'timestamp': payload['timestamp'],
-                'sensor_data': payload['data'],
-                'verification_threshold': self.verification_threshold
-            }
-            
-            # TODO: Implement actual HeadyBrain API call
-            # For now, simulate analysis
-            await asyncio.sleep(0.1)  # Simulate network latency
+            # Readings from the same field are coalesced into one batched request;
+            # on timeout the result is None and the reading is stored regardless
+            if self.brain:
+                started = time.perf_counter()
+                await self.brain.analyze(reading)
+                BRAIN_LATENCY.observe(time.perf_counter() - started)
             
             # Store verified data
-            await self._store_field_data(field_id, payload)
+            await self._store_field_data(reading)
             
         except Exception as e:
             logger.error(f"Error in HeadyBrain analysis: {e}")
     
-    async def _store_field_data(self, field_id: str, payload: Dict):
+    async def _store_field_data(self, reading: SensorReading):
         """Store verified field data in InfluxDB"""
+        await self._store_readings([reading])
+    
+    async def _store_readings(self, readings: List[SensorReading]):
+        """Store a batch of verified readings in memory and InfluxDB"""
+        if not readings:
+            return
+        started = time.perf_counter()
         try:
-            point = Point("field_sensors") \
-                .tag("field_id", field_id) \
-                .tag("sensor_id", payload['sensor_id']) \
-                .time(datetime.fromtimestamp(payload['timestamp'], timezone.utc))
-            
-            # Add sensor measurements
-            for key, value in payload['data'].items():
-                if isinstance(value, (int, float)):
-                    point.field(key, value)
+            # Readings too late for a closed rollup bucket (or too far ahead) are kept raw even with raw storage off
+            late = self.rollup.add(readings, time.time()) if self.rollup else []
+            now = time.monotonic()
+            for reading in readings:
+                self.timeseries.add(reading, now)
+            FIELD_MESSAGES.count([reading.field_id for reading in readings if reading.fields], 'stored')
+            if self.columnar:
+                self.columnar.add(readings)
+            if self.streaming:
+                self.streaming.publish(readings)
+            records = []
+            for reading in (readings if self.store_raw else late):
+                # Encoded one by one so a single bad reading cannot take the batch down with it
+                try:
+                    record = encode_point(
+                        "field_sensors",
+                        {"field_id": reading.field_id, "sensor_id": reading.sensor_id},
+                        reading.fields,
+                        seconds_to_ns(reading.timestamp)
+                    )
+                except (ValueError, OverflowError) as e:
+                    self.readings_unencodable += 1
+                    logger.error(f"Cannot encode reading from {reading.sensor_id} in {reading.field_id}: {e}")
+                    continue
+                if record is not None:
+                    records.append(record)
             
-            self.write_api.write(bucket=self.influx_bucket, record=point)
-            logger.info(f"Stored verified data for field {field_id}")
+            if records:
+                await self.writer.write_many(records, self.raw_bucket)
+            logger.debug(f"Buffered {len(records)} verified readings")
             
         except Exception as e:
             logger.error(f"Error storing field data: {e}")
+        _STORE.observe(time.perf_counter() - started)
+    
+    async def _rollup_flush_loop(self):
+        """Write rollup buckets to InfluxDB as they close"""
+        while True:
+            await asyncio.sleep(1.0)
+            try:
+                records = self.rollup.collect(time.time())
+                if records:
+                    await self.writer.write_many(records, self.rollup_bucket)
+            except Exception as e:
+                logger.error(f"Error writing rollups: {e}")
+    
+    async def _stop_rollups(self):
+        """Write the still-open (partial) rollup buckets before the writer drains"""
+        if not self._rollup_task:
+            return
+        self._rollup_task.cancel()
+        await asyncio.gather(self._rollup_task, return_exceptions=True)
+        self._rollup_task = None
+        records = self.rollup.collect(time.time(), force=True)
+        if records:
+            await self.writer.write_many(records, self.rollup_bucket)
+    
+    def _is_retryable_write_error(self, error: BaseException) -> bool:
+        """Server-side and connection errors; not rejected data, nor writes while disconnected"""
+        return self.write_api is not None and not is_rejected_write(error)
+
+    def _write_records(self, bucket: str, records: List[str]):
+        """Blocking batch write, called from the batch writer's worker thread"""
+        if self.write_api is None:
+            raise RuntimeError("InfluxDB is not connected")
+        self.write_api.write(bucket=bucket, org=self.influx_org, record=records)
 
-# Global oracle instance
-oracle = HeadyOracle()
+# Global oracle instance, created on startup: a supervisor imports this module but never serves this app
+oracle: Optional[HeadyOracle] = None
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize oracle on startup"""
+    """Create and initialize the oracle on startup"""
+    global oracle
+    if oracle is None:
+        oracle = HeadyOracle()
     await oracle.initialize()
 
+def _close_streams():
+    if oracle is not None:
+        oracle.close_streams()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered writes on shutdown"""
+    await oracle.shutdown()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; degraded (still 200) while a dependency is reconnecting"""
+    links = (oracle.mqtt_link, oracle.influx_link)
     return {
-        "status": "healthy",
+        "status": "healthy" if all(link.is_up for link in links) else "degraded",
+        "connections": {link.name: link.state for link in links},
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "service": "HeadyField Oracle",
         "version": "1.0.0"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/status")
 async def get_status():
     """Get detailed oracle status"""
     return {
         "mqtt_connected": oracle.mqtt_client.is_connected(),
-        "influx_health": "connected" if oracle.influx_client else "disconnected",
+        "influx_health": "connected" if oracle.influx_link.is_up else "disconnected",
+        "connections": {link.name: link.stats() for link in (oracle.mqtt_link, oracle.influx_link)},
         "verification_threshold": oracle.verification_threshold,
-        "fibonacci_backoff": {
-            "max_retries": oracle.backoff.max_retries,
-            "base_delay": oracle.backoff.base_delay
+        "fibonacci_backoff": oracle.backoff.stats(),
+        "retry": {
+            "budget": oracle.retry_budget.stats(),
+            "policies": {policy.name: policy.stats() for policy in oracle._retry_policies()}
+        },
+        "influx_writer": oracle.writer.stats(),
+        "spool": {**oracle.spool.stats(), **oracle.spool_replayer.stats()} if oracle.spool else {"enabled": False},
+        "verification": oracle.verifier.stats(),
+        "brain": oracle.brain.stats() if oracle.brain else {"enabled": False},
+        "timeseries": oracle.timeseries.stats(),
+        "storage": {
+            "store_raw": oracle.store_raw,
+            "raw_bucket": oracle.raw_bucket,
+            "rollup_bucket": oracle.rollup_bucket if oracle.rollup else None,
+            "rollup": oracle.rollup.stats() if oracle.rollup else {"enabled": False}
+        },
+        "scoring": oracle.scorer.stats() if oracle.scorer else {"enabled": False},
+        "columnar": oracle.columnar.stats() if oracle.columnar else {"enabled": False},
+        "streaming": oracle.streaming.stats() if oracle.streaming else {"enabled": False},
+        "dedup": oracle.dedup.stats() if oracle.dedup else {"enabled": False},
+        "reorder": oracle.reorder.stats() if oracle.reorder else {"enabled": False},
+        "scaling": oracle.router.stats(),
+        "admission": oracle.admission.stats() if oracle.admission else {"enabled": False},
+        "ingest": {
+            "workers": len(oracle._worker_tasks),
+            "batch_size": oracle.ingest_batch_size,
+            "processed": oracle.messages_processed,
+            "analyses_pending": len(oracle._analysis_tasks),
+            "analyses_skipped": oracle.analyses_skipped,
+            "failed": oracle.messages_failed,
+            "invalid": oracle.messages_invalid,
+            "unencodable": oracle.readings_unencodable,
+            "decoder": oracle.decoder.backend,
+            "frames": oracle.frames.stats(),
+            "queue": oracle.ingest_queue.stats()
         }
     }
 
+def _get_admission():
+    if oracle.admission is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Admission control is disabled")
+    return oracle.admission
+
+@app.get("/admission")
+async def get_admission():
+    """Current admission mode, load signals and field priorities"""
+    return _get_admission().stats()
+
+@app.put("/admission")
+async def set_admission_mode(mode: str):
+    """Pin the admission mode (normal, skip_analysis, store_only, sample) or return it to auto"""
+    admission = _get_admission()
+    try:
+        admission.pin(mode)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return admission.stats()
+
+@app.put("/admission/fields/{field_id}")
+async def set_field_priority(field_id: str, priority: str):
+    """Set a field's shedding priority (high, normal, low)"""
+    admission = _get_admission()
+    try:
+        admission.set_priority(field_id, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return {"field_id": field_id, "priority": priority, "mode": MODES[admission.level_for(field_id)]}
+
+@app.put("/verification")
+async def set_verification_threshold(threshold: float):
+    """Change the verification threshold at runtime"""
+    try:
+        oracle.set_verification_threshold(threshold)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return {"verification_threshold": oracle.verification_threshold}
+
+@app.put("/backoff")
+async def set_backoff_base_delay(base_delay_ms: int):
+    """Change the base delay of the Fibonacci reconnect backoff at runtime"""
+    if base_delay_ms <= 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="base_delay_ms must be positive")
+    oracle.backoff.base_delay = base_delay_ms
+    return oracle.backoff.stats()
+
+def _get_streaming(interval_ms: int) -> FanoutHub:
+    if oracle.streaming is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Live streaming is disabled")
+    if interval_ms < 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="interval_ms must not be negative")
+    try:
+        oracle.streaming.check_capacity()
+    except StreamLimitReached as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return oracle.streaming
+
+@app.get("/stream")
+async def stream_readings(field_id: Optional[str] = None, sensor_id: Optional[str] = None,
+                          latest: bool = False, interval_ms: int = 0):
+    """Server-Sent Events feed of verified readings, optionally filtered by comma-separated ids"""
+    hub = _get_streaming(interval_ms)
+
+    async def events():
+        # Subscribe only once the response is being sent, so an abandoned request cannot leak a subscriber
+        try:
+            subscriber = hub.subscribe(parse_filter(field_id), parse_filter(sensor_id), latest,
+                                       interval_ms / 1000.0, 'sse')
+        except StreamLimitReached:
+            return
+        try:
+            yield b'retry: 3000\n\n'
+            while not subscriber.closed:
+                messages = await subscriber.next_batch(hub.keepalive)
+                if messages:
+                    yield sse_event(messages)
+                elif not subscriber.closed:
+                    yield b': keepalive\n\n'
+                if subscriber.interval:
+                    await asyncio.sleep(subscriber.interval)
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def _close_on_disconnect(websocket: WebSocket, subscriber):
+    """Consume client frames until the client goes away (they carry nothing we act on)"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            subscriber.close()
+            return
+
+@app.websocket("/ws")
+async def stream_readings_ws(websocket: WebSocket, field_id: Optional[str] = None, sensor_id: Optional[str] = None,
+                             latest: bool = False, interval_ms: int = 0):
+    """WebSocket feed of verified readings; each frame is a JSON array of readings"""
+    try:
+        hub = _get_streaming(interval_ms)
+    except HTTPException as e:
+        await websocket.close(code=1013 if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE else 1008,
+                              reason=e.detail)
+        return
+    await websocket.accept()
+    try:
+        subscriber = hub.subscribe(parse_filter(field_id), parse_filter(sensor_id), latest,
+                                   interval_ms / 1000.0, 'websocket')
+    except StreamLimitReached as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    receiver = asyncio.create_task(_close_on_disconnect(websocket, subscriber))
+    try:
+        while not subscriber.closed:
+            messages = await subscriber.next_batch(hub.keepalive)
+            if messages:
+                await websocket.send_text(json_array(messages))
+            if subscriber.interval:
+                await asyncio.sleep(subscriber.interval)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscriber)
+
+def _get_series(field_id: str, sensor_id: str, metric: str):
+    buffer = oracle.timeseries.get(field_id, sensor_id, metric)
+    if buffer is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"No recent data for {field_id}/{sensor_id}/{metric}")
+    return buffer
+
+@app.get("/fields")
+async def list_fields():
+    """Fields with readings in the in-memory window"""
+    return {
+        field_id: {"sensors": len(oracle.timeseries.sensors(field_id))}
+        for field_id in oracle.timeseries.field_ids()
+    }
+
+@app.get("/fields/{field_id}/latest")
+async def get_field_latest(field_id: str):
+    """Latest value of every sensor metric in a field"""
+    latest = oracle.timeseries.latest(field_id)
+    if latest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No recent data for field {field_id}")
+    return {"field_id": field_id, "sensors": latest}
+
+@app.get("/fields/{field_id}/sensors/{sensor_id}/metrics/{metric}/stats")
+async def get_metric_stats(field_id: str, sensor_id: str, metric: str,
+                           window: float = 60.0, percentiles: str = "50,90,99"):
+    """Windowed min/max/mean/percentiles of one sensor metric"""
+    buffer = _get_series(field_id, sensor_id, metric)
+    try:
+        ps = [float(p) for p in percentiles.split(',') if p.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid percentiles")
+    if window <= 0 or any(p < 0 or p > 100 for p in ps):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid window or percentiles")
+    return {
+        "field_id": field_id,
+        "sensor_id": sensor_id,
+        "metric": metric,
+        "window_s": min(window, oracle.timeseries.retention),
+        "stats": oracle.timeseries.window_stats(buffer, window, ps)
+    }
+
+@app.get("/fields/{field_id}/sensors/{sensor_id}/metrics/{metric}/series")
+async def get_metric_series(field_id: str, sensor_id: str, metric: str,
+                            window: float = 600.0, step: float = 10.0):
+    """Downsampled series of one sensor metric"""
+    buffer = _get_series(field_id, sensor_id, metric)
+    if not (0 < window < math.inf and 0 < step < math.inf):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="window and step must be positive and finite")
+    return {
+        "field_id": field_id,
+        "sensor_id": sensor_id,
+        "metric": metric,
+        "window_s": min(window, oracle.timeseries.retention),
+        "step_s": max(step, oracle.timeseries.min_step(window)),
+        "points": oracle.timeseries.downsample(buffer, window, step)
+    }
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    host = os.getenv('ORACLE_HOST', '0.0.0.0')
+    port = int(os.getenv('ORACLE_PORT', '8080'))
+    processes = worker_processes(os.getenv('ORACLE_PROCESSES', '1'))
+    if processes > 1:
+        run_supervisor(processes, FibonacciBackoff.from_env(), host=host, port=port)
+    else:
+        serve(app, host, port, _close_streams)
@@ -0,0 +1,148 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Archive Replay                               ║
+║  "Yesterday's harvest, through today's pipeline"                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Feeds a columnar archive written by ORACLE_COLUMNAR_DIR back through the
+Oracle's ingest pipeline (decode, signature check, dedup, scoring,
+storage) as fast as it will go, for backfilling InfluxDB or benchmarking:
+
+    python -m src.replay /data/columnar --since 2026-10-01 --fields north-40,south-12
+    python -m src.replay /data/columnar --dry-run          # pipeline only, writes discarded
+
+Configuration comes from the usual environment (INFLUX_*, ORACLE_SENSOR_KEYS,
+ORACLE_ROLLUP_TIERS, ...). HeadyBrain analysis, admission control, the disk
+spool, reordering and the archive tee itself are switched off for the run.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from .frames import MAGIC
+
+
+class _DiscardingWriteApi:
+    """Stands in for the InfluxDB write API on a dry run"""
+
+    def write(self, bucket, org, record):
+        pass
+
+
+def _configure_env():
+    """Must run before src.oracle_server is imported, which builds the Oracle from the environment"""
+    os.environ['ORACLE_COLUMNAR_DIR'] = ''
+    os.environ['ORACLE_SPOOL_DIR'] = ''
+    os.environ['ORACLE_ADMISSION'] = 'off'
+    os.environ['ORACLE_REORDER_WINDOW_MS'] = '0'
+    os.environ['ORACLE_SCALE_MODE'] = 'single'
+    os.environ['HEADY_BRAIN_ENDPOINT'] = ''
+
+
+def _batches(args, batch_size: int):
+    """(topic, payload) batches from the archive, partition by partition"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # Declare the partition keys as strings so numeric-looking field_ids are not inferred as ints;
+    # field_id values are URI-escaped by the archive
+    partitioning = ds.HivePartitioning(pa.schema([('date', pa.string()), ('field_id', pa.string())]),
+                                       segment_encoding='uri')
+    dataset = ds.dataset(args.directory, format=args.format, partitioning=partitioning)
+    conditions = []
+    if args.since:
+        conditions.append(ds.field('date') >= args.since)
+    if args.until:
+        conditions.append(ds.field('date') <= args.until)
+    if args.fields:
+        conditions.append(ds.field('field_id').isin(args.fields.split(',')))
+    condition = None
+    for part in conditions:
+        condition = part if condition is None else condition & part
+    for record_batch in dataset.to_batches(columns=['field_id', 'payload'], filter=condition,
+                                           batch_size=batch_size):
+        field_ids = record_batch.column('field_id').to_pylist()
+        payloads = record_batch.column('payload').to_pylist()
+        yield [(f"field/{field_id}/sensors/bin" if payload.startswith(MAGIC) else f"field/{field_id}/sensors", payload)
+               for field_id, payload in zip(field_ids, payloads) if payload is not None]
+
+
+async def replay(args) -> dict:
+    _configure_env()
+    from . import oracle_server
+
+    oracle = oracle_server.HeadyOracle()
+    if args.dry_run:
+        oracle.write_api = _DiscardingWriteApi()
+    else:
+        oracle.influx_link.start()
+        if not await oracle.influx_link.wait_up(args.connect_timeout):
+            raise SystemExit(f"Could not reach InfluxDB at {oracle.influx_url}")
+    oracle.writer.start()
+    if oracle.rollup:
+        oracle._rollup_task = asyncio.create_task(oracle._rollup_flush_loop())
+    oracle.verifier.start()
+
+    started = time.perf_counter()
+    sent = 0
+    in_flight = set()
+    for batch in _batches(args, oracle.ingest_batch_size):
+        if len(in_flight) >= oracle.ingest_workers:
+            _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        in_flight.add(asyncio.create_task(oracle._process_batch(batch)))
+        sent += len(batch)
+        if args.rate:
+            delay = sent / args.rate - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+    await asyncio.gather(*in_flight)
+    await oracle.shutdown()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'messages': sent,
+        'processed': oracle.messages_processed,
+        'rejected': oracle.messages_failed + oracle.messages_invalid,
+        'duplicates': oracle.dedup.duplicates if oracle.dedup else 0,
+        'records_written': oracle.writer.records_written,
+        'records_dropped': oracle.writer.records_dropped,
+        'elapsed_s': elapsed,
+        'rate': sent / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help='archive root (ORACLE_COLUMNAR_DIR)')
+    parser.add_argument('--format', choices=('parquet', 'arrow'), default='parquet')
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help='first date partition to replay')
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help='last date partition to replay')
+    parser.add_argument('--fields', metavar='ID,...', help='only these field_ids')
+    parser.add_argument('--rate', type=float, default=0.0, help='messages/s (0 = as fast as possible)')
+    parser.add_argument('--dry-run', action='store_true', help='run the pipeline but discard InfluxDB writes')
+    parser.add_argument('--connect-timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        sys.exit("Replaying the columnar archive needs pyarrow, which is not installed")
+
+    results = asyncio.run(replay(args))
+    print(f"replayed:  {results['messages']} messages in {results['elapsed_s']:.1f}s "
+          f"({results['rate']:,.0f} msg/s)")
+    print(f"pipeline:  {results['processed']} processed, {results['rejected']} rejected, "
+          f"{results['duplicates']} duplicates suppressed")
+    print(f"vault:     {results['records_written']} records written, {results['records_dropped']} dropped"
+          + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
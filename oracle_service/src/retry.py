@@ -0,0 +1,240 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Retry Policies                               ║
+║  "Try again, but not all at once"                                  ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Fibonacci backoff with jitter, retry policies with per-operation deadlines,
+and a retry budget shared by every policy of the process.
+
+Jitter spreads the retries of many clients that failed at the same moment
+(every replica losing InfluxDB together) instead of having them return in
+lockstep: ``full`` sleeps a uniform fraction of the Fibonacci delay,
+``equal`` at least half of it, and ``decorrelated`` a uniform delay between
+the base and three times the previous delay. The budget caps retries at a
+fraction of recent calls, so an outage costs each caller one attempt plus
+a trickle of retries rather than multiplying the load on a dependency that
+is already struggling.
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JITTERS = ('none', 'full', 'equal', 'decorrelated')
+
+
+@functools.lru_cache(maxsize=None)
+def fibonacci(n: int) -> Tuple[int, ...]:
+    """The first ``n`` (at least two) terms of 1, 1, 2, 3, 5, ..., computed once per length"""
+    sequence = [1, 1]
+    for i in range(2, n):
+        sequence.append(sequence[i - 1] + sequence[i - 2])
+    return tuple(sequence)
+
+
+class FibonacciBackoff:
+    """Fibonacci sequence backoff for resilient retries.
+
+    ``get_delay`` is the plain delay in milliseconds; ``delay`` is the
+    jittered delay in seconds, capped at the last term of the sequence.
+    """
+
+    def __init__(self, max_retries: int = 13, base_delay: int = 1000, jitter: str = 'decorrelated'):
+        if jitter not in JITTERS:
+            raise ValueError(f"Unknown jitter '{jitter}', expected one of {', '.join(JITTERS)}")
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.jitter = jitter
+        self.sequence = fibonacci(max_retries)
+
+    @classmethod
+    def from_env(cls) -> 'FibonacciBackoff':
+        return cls(
+            max_retries=int(os.getenv('FIBONACCI_MAX_RETRIES', '13')),
+            base_delay=int(os.getenv('FIBONACCI_BASE_DELAY', '1000')),
+            jitter=os.getenv('FIBONACCI_JITTER', 'decorrelated')
+        )
+
+    def get_delay(self, attempt: int) -> int:
+        if attempt >= len(self.sequence):
+            return self.sequence[-1] * self.base_delay
+        return self.sequence[attempt] * self.base_delay
+
+    def delay(self, attempt: int, previous: Optional[float] = None) -> float:
+        """Seconds to wait before retry ``attempt`` (0-based).
+
+        ``previous`` is the delay slept before the last retry; decorrelated
+        jitter grows from it, and falls back to the attempt's Fibonacci delay
+        when it is not known.
+        """
+        plain = self.get_delay(attempt) / 1000.0
+        if self.jitter == 'full':
+            return random.uniform(0.0, plain)
+        if self.jitter == 'equal':
+            return plain / 2.0 + random.uniform(0.0, plain / 2.0)
+        if self.jitter == 'decorrelated':
+            base = self.base_delay / 1000.0
+            cap = self.sequence[-1] * base
+            return min(cap, random.uniform(base, 3.0 * max(previous or plain, base)))
+        return plain
+
+    def stats(self) -> Dict:
+        return {"max_retries": self.max_retries, "base_delay": self.base_delay, "jitter": self.jitter}
+
+
+class RetryBudget:
+    """Allows retries up to ``ratio`` of the calls in the last ``window``
+    seconds, plus ``min_per_second`` so rarely used operations can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._buckets = collections.deque()  # [second, calls, retries], oldest first
+
+        # Metrics
+        self.granted = 0
+        self.denied = 0
+
+    def _bucket(self, now: float):
+        second = int(now)
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= second - self.window:
+            buckets.popleft()
+        if not buckets or buckets[-1][0] != second:
+            buckets.append([second, 0, 0])
+        return buckets[-1]
+
+    def record_call(self, now: Optional[float] = None):
+        self._bucket(time.monotonic() if now is None else now)[1] += 1
+
+    def try_retry(self, now: Optional[float] = None) -> bool:
+        """Take one retry from the budget, if there is one left"""
+        bucket = self._bucket(time.monotonic() if now is None else now)
+        calls = sum(b[1] for b in self._buckets)
+        retries = sum(b[2] for b in self._buckets)
+        if retries >= self.min_per_second * self.window + self.ratio * calls:
+            self.denied += 1
+            return False
+        bucket[2] += 1
+        self.granted += 1
+        return True
+
+    def stats(self) -> Dict:
+        """Budget settings and how often it was drawn on or ran dry"""
+        self._bucket(time.monotonic())
+        return {
+            "ratio": self.ratio,
+            "min_per_second": self.min_per_second,
+            "window_s": self.window,
+            "recent_calls": sum(b[1] for b in self._buckets),
+            "recent_retries": sum(b[2] for b in self._buckets),
+            "granted": self.granted,
+            "denied": self.denied,
+        }
+
+
+class RetryPolicy:
+    """Retries an async operation with backoff, within a deadline and a shared budget.
+
+    An attempt that raises is retried if ``retryable(error)`` holds, fewer
+    than ``max_attempts`` attempts were made, the next attempt could start
+    before the deadline and the budget grants it; otherwise the last error
+    is raised to the caller, which handles it as it would without retries.
+    """
+
+    def __init__(self, name: str, backoff: FibonacciBackoff, budget: Optional[RetryBudget] = None,
+                 max_attempts: int = 3, deadline: Optional[float] = None,
+                 retryable: Callable[[BaseException], bool] = lambda error: True):
+        self.name = name
+        self.backoff = backoff
+        self.budget = budget
+        self.max_attempts = max(1, max_attempts)
+        self.deadline = deadline
+        self.retryable = retryable
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.failed = 0
+        self.not_retryable = 0
+        self.attempts_exhausted = 0
+        self.deadline_exceeded = 0
+        self.budget_denied = 0
+
+    async def call(self, operation: Callable[..., Awaitable], *args, deadline: Optional[float] = None):
+        """``await operation(*args)``, retried; ``deadline`` (seconds) overrides the policy's"""
+        self.calls += 1
+        if self.budget:
+            self.budget.record_call()
+        deadline = self.deadline if deadline is None else deadline
+        give_up_at = time.monotonic() + deadline if deadline is not None else None
+        previous = None
+        attempt = 0
+        while True:
+            try:
+                result = await operation(*args)
+            except Exception as e:
+                delay = self.backoff.delay(attempt, previous)
+                if not self._may_retry(e, attempt, delay, give_up_at):
+                    self.failed += 1
+                    raise
+                attempt += 1
+                previous = delay
+                self.retries += 1
+                logger.debug(f"{self.name} attempt {attempt} failed ({e}), retrying in {delay:.3f}s")
+                await asyncio.sleep(delay)
+                continue
+            if attempt:
+                self.recovered += 1
+            return result
+
+    def _may_retry(self, error: Exception, attempt: int, delay: float, give_up_at: Optional[float]) -> bool:
+        if not self.retryable(error):
+            self.not_retryable += 1
+            return False
+        if attempt + 1 >= self.max_attempts:
+            self.attempts_exhausted += 1
+            return False
+        if give_up_at is not None and time.monotonic() + delay >= give_up_at:
+            self.deadline_exceeded += 1
+            return False
+        if self.budget and not self.budget.try_retry():
+            self.budget_denied += 1
+            return False
+        return True
+
+    def wrap(self, operation: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """``operation`` with this policy applied to every call"""
+        @functools.wraps(operation)
+        async def retried(*args):
+            return await self.call(operation, *args)
+        return retried
+
+    def stats(self) -> Dict:
+        """Calls, retries and why retrying stopped"""
+        return {
+            "max_attempts": self.max_attempts,
+            "deadline_s": self.deadline,
+            "base_delay_ms": self.backoff.base_delay,
+            "calls": self.calls,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "failed": self.failed,
+            "not_retryable": self.not_retryable,
+            "attempts_exhausted": self.attempts_exhausted,
+            "deadline_exceeded": self.deadline_exceeded,
+            "budget_denied": self.budget_denied,
+        }
@@ -0,0 +1,157 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Edge Rollups                                 ║
+║  "Send the vault the shape of the data, not every grain of it"     ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Incremental min/max/mean/count aggregates per field, sensor and metric over
+fixed time tiers (``ORACLE_ROLLUP_TIERS``, e.g. ``10s,1m,1h``). Each tier is
+written as its own measurement (``field_sensors_10s`` ...), one point per
+series and bucket, tagged with ``metric``, and timestamped at the bucket
+start. A bucket is emitted once ``grace`` seconds have passed after its end.
+Readings arriving after that (e.g. a gateway uploading its backlog) are left
+out of the tier, since writing the bucket again would overwrite the complete
+point with a partial one; ``add`` returns them so they can be stored raw.
+So are readings stamped more than one bucket width plus ``grace`` into the
+future (sensor clock skew): their bucket would not close for a long time
+and would sit in memory meanwhile.
+
+For the same reason rollups need every reading of a series to reach one
+process: with ``ORACLE_SCALE_MODE=shared`` the broker spreads a series over
+the replicas, each would write its own partial point for the same bucket and
+the last write would win. Rollups are therefore refused in shared mode; the
+``hash`` mode keeps each field on one replica.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from .codec import SensorReading
+from .line_protocol import encode_point
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_tiers(spec: str) -> List[Tuple[str, int]]:
+    """Parse ``10s,1m,1h`` into [(label, seconds), ...]"""
+    tiers = []
+    for label in (part.strip() for part in spec.split(',')):
+        if not label:
+            continue
+        match = re.fullmatch(r'(\d+)([smhd])', label)
+        if not match or int(match.group(1)) == 0:
+            raise ValueError(f"Invalid rollup tier '{label}', expected e.g. 10s, 1m, 1h, 1d")
+        tiers.append((label, int(match.group(1)) * _UNITS[match.group(2)]))
+    return sorted(set(tiers), key=lambda tier: tier[1])
+
+
+def check_rollup_scale_mode(tiers: List[Tuple[str, int]], scale_mode: str):
+    """Raise ValueError if rollups are configured for a scale mode that splits series across replicas"""
+    if tiers and scale_mode == 'shared':
+        raise ValueError("ORACLE_ROLLUP_TIERS cannot be used with ORACLE_SCALE_MODE=shared: replicas would "
+                         "overwrite each other's partial rollups; use ORACLE_SCALE_MODE=hash")
+
+
+class _Tier:
+    __slots__ = ('label', 'width', 'measurement', 'buckets')
+
+    def __init__(self, label: str, width: int, measurement: str):
+        self.label = label
+        self.width = width
+        self.measurement = measurement
+        # bucket start (s) -> {(field_id, sensor_id, metric): [min, max, sum, count]}
+        self.buckets: Dict[int, Dict[tuple, list]] = {}
+
+
+class RollupAggregator:
+    """Streaming per-series aggregates over one or more time tiers"""
+
+    def __init__(self, tiers: List[Tuple[str, int]], measurement: str = 'field_sensors', grace: float = 10.0):
+        self.tiers = [_Tier(label, width, f"{measurement}_{label}") for label, width in tiers]
+        self.grace = grace
+
+        # Metrics
+        self.readings_added = 0
+        self.late_readings = 0
+        self.future_readings = 0
+        self.points_emitted: Dict[str, int] = {tier.label: 0 for tier in self.tiers}
+
+    def add(self, readings: List[SensorReading], now: float) -> List[SensorReading]:
+        """Fold a batch into every tier's open buckets; returns readings too late or too far ahead for a tier"""
+        late = set()
+        future = set()
+        for tier in self.tiers:
+            width = tier.width
+            buckets = tier.buckets
+            closed_before = now - width - self.grace
+            opens_after = now + width + self.grace
+            for position, reading in enumerate(readings):
+                start = int(reading.timestamp // width) * width
+                group = buckets.get(start)
+                if group is None:
+                    if start <= closed_before:
+                        late.add(position)
+                        continue
+                    if start > opens_after:
+                        future.add(position)
+                        continue
+                    group = buckets[start] = {}
+                field_id = reading.field_id
+                sensor_id = reading.sensor_id
+                for metric, value in reading.fields.items():
+                    value = float(value)
+                    key = (field_id, sensor_id, metric)
+                    acc = group.get(key)
+                    if acc is None:
+                        group[key] = [value, value, value, 1]
+                    else:
+                        if value < acc[0]:
+                            acc[0] = value
+                        if value > acc[1]:
+                            acc[1] = value
+                        acc[2] += value
+                        acc[3] += 1
+        self.readings_added += len(readings)
+        self.late_readings += len(late)
+        self.future_readings += len(future)
+        return [readings[position] for position in sorted(late | future)]
+
+    def collect(self, now: float, force: bool = False) -> List[str]:
+        """Line protocol for every bucket past its grace period (all buckets if ``force``)"""
+        records: List[str] = []
+        for tier in self.tiers:
+            closed_before = now - tier.width - self.grace
+            for start in sorted(tier.buckets):
+                if not force and start > closed_before:
+                    break
+                group = tier.buckets.pop(start)
+                timestamp_ns = start * 1_000_000_000
+                for (field_id, sensor_id, metric), (low, high, total, count) in group.items():
+                    records.append(encode_point(
+                        tier.measurement,
+                        {"field_id": field_id, "sensor_id": sensor_id, "metric": metric},
+                        {"min": low, "max": high, "mean": total / count, "count": count},
+                        timestamp_ns
+                    ))
+                self.points_emitted[tier.label] += len(group)
+        return records
+
+    def stats(self) -> Dict:
+        """Snapshot of open buckets and emitted points per tier"""
+        return {
+            "grace_s": self.grace,
+            "readings_added": self.readings_added,
+            "late_readings": self.late_readings,
+            "future_readings": self.future_readings,
+            "tiers": {
+                tier.label: {
+                    "measurement": tier.measurement,
+                    "open_buckets": len(tier.buckets),
+                    "open_series": sum(len(group) for group in tier.buckets.values()),
+                    "points_emitted": self.points_emitted[tier.label],
+                }
+                for tier in self.tiers
+            }
+        }
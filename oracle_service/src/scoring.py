@@ -0,0 +1,198 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Local Anomaly Scoring                        ║
+║  "Only the suspicious pay for a second opinion"                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Every (field_id, sensor_id, metric) series keeps an EWMA mean/variance and a
+short history for a median/MAD estimate, refreshed every few samples. A
+value's z-score is the smaller of the EWMA and the robust MAD z-scores, so
+both estimates must agree before a value looks unusual. Its confidence is
+``exp(-0.5 * (z / z_scale) ** 2)``; with the default ``z_scale`` of 10, a
+VERIFICATION_THRESHOLD of 0.95 flags values beyond roughly 3.2 sigma. A
+reading's confidence is that of its least plausible metric, and series with
+fewer than ``min_samples`` values score 1.0.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from .codec import SensorReading
+
+_MAD_TO_SIGMA = 0.6745
+_EPSILON = 1e-9
+
+
+def _row_nanmedian(rows: np.ndarray) -> np.ndarray:
+    """Median of each row ignoring NaN padding (np.nanmedian is slow on many short rows)"""
+    ordered = np.sort(rows, axis=1)  # NaNs sort last
+    valid = rows.shape[1] - np.count_nonzero(np.isnan(rows), axis=1)
+    at = np.arange(len(rows))
+    return 0.5 * (ordered[at, (valid - 1) // 2] + ordered[at, valid // 2])
+
+
+class AnomalyScorer:
+    """Batch-vectorized rolling EWMA / z-score / MAD scorer per series"""
+
+    def __init__(self, threshold: float, alpha: float = 0.05, history: int = 64,
+                 min_samples: int = 16, z_scale: float = 10.0, max_series: int = 100000):
+        self.threshold = threshold
+        self.alpha = alpha
+        self.history = history
+        self.min_samples = min_samples
+        self.z_scale = z_scale
+        self.max_series = max_series
+
+        # (field_id, sensor_id) -> {metric: series index}
+        self._index: Dict[tuple, Dict[str, int]] = {}
+        # (field_id, sensor_id) -> (metric names, series indices) of the last layout seen
+        self._layouts: Dict[tuple, tuple] = {}
+        self._refresh_every = max(1, history // 8)
+        self._series = 0
+        self._allocate(1024)
+
+        # Metrics
+        self.readings_scored = 0
+        self.readings_flagged = 0
+        self.flagged_by_field: Dict[str, int] = {}
+        self.series_rejected = 0
+
+    def _allocate(self, capacity: int):
+        """Grow the per-series state arrays to ``capacity`` rows"""
+        old = self._series
+        mean = np.zeros(capacity)
+        var = np.zeros(capacity)
+        count = np.zeros(capacity, dtype=np.int64)
+        history = np.full((capacity, self.history), np.nan)
+        median = np.zeros(capacity)
+        mad = np.zeros(capacity)
+        if old:
+            mean[:old] = self._mean[:old]
+            var[:old] = self._var[:old]
+            count[:old] = self._count[:old]
+            history[:old] = self._history[:old]
+            median[:old] = self._median[:old]
+            mad[:old] = self._mad[:old]
+        self._mean, self._var, self._count = mean, var, count
+        self._history, self._median, self._mad = history, median, mad
+        self._capacity = capacity
+
+    def _series_index(self, field_id: str, sensor_id: str, metric: str) -> int:
+        metrics = self._index.get((field_id, sensor_id))
+        if metrics is None:
+            metrics = self._index[(field_id, sensor_id)] = {}
+        idx = metrics.get(metric)
+        if idx is None:
+            if self._series >= self.max_series:
+                self.series_rejected += 1
+                return -1
+            if self._series >= self._capacity:
+                self._allocate(min(self._capacity * 2, self.max_series))
+            idx = metrics[metric] = self._series
+            self._series += 1
+        return idx
+
+    def _layout(self, key: tuple, fields: Dict) -> tuple:
+        all_indices = [self._series_index(key[0], key[1], metric) for metric in fields]
+        return tuple(fields), [idx for idx in all_indices if idx >= 0], all_indices
+
+    def score_batch(self, readings: List[SensorReading]) -> np.ndarray:
+        """Score a batch of readings, update the rolling state, return confidences"""
+        confidences = np.ones(len(readings))
+        if not readings:
+            return confidences
+
+        indices: List[int] = []
+        values: List[float] = []
+        owners: List[int] = []
+        layouts = self._layouts
+        for position, reading in enumerate(readings):
+            fields = reading.fields
+            key = (reading.field_id, reading.sensor_id)
+            names = tuple(fields)
+            layout = layouts.get(key)
+            if layout is None or layout[0] != names:
+                layout = layouts[key] = self._layout(key, fields)
+            if len(layout[1]) == len(names):
+                indices.extend(layout[1])
+                values.extend(fields.values())
+            else:
+                # Some series were rejected by max_series; score the rest
+                for metric, idx in zip(names, layout[2]):
+                    if idx >= 0:
+                        indices.append(idx)
+                        values.append(fields[metric])
+            owners.extend([position] * len(layout[1]))
+        if not indices:
+            return confidences
+
+        idx = np.asarray(indices, dtype=np.int64)
+        x = np.asarray(values, dtype=np.float64)
+        owner = np.asarray(owners, dtype=np.int64)
+
+        # Score against the state as it was before this batch
+        z_ewma = np.abs(x - self._mean[idx]) / (np.sqrt(self._var[idx]) + _EPSILON)
+        z_mad = _MAD_TO_SIGMA * np.abs(x - self._median[idx]) / (self._mad[idx] + _EPSILON)
+        z = np.minimum(z_ewma, z_mad)
+        metric_confidence = np.exp(-0.5 * np.square(z / self.z_scale))
+        metric_confidence[self._count[idx] < self.min_samples] = 1.0
+        np.minimum.at(confidences, owner, metric_confidence)
+
+        self._update(idx, x)
+
+        flagged = np.flatnonzero(confidences < self.threshold)
+        self.readings_scored += len(readings)
+        self.readings_flagged += len(flagged)
+        for position in flagged:
+            field_id = readings[position].field_id
+            self.flagged_by_field[field_id] = self.flagged_by_field.get(field_id, 0) + 1
+        return confidences
+
+    def _update(self, idx: np.ndarray, x: np.ndarray):
+        """Fold a batch into the EWMA, history and median/MAD state"""
+        touched, group, n = np.unique(idx, return_inverse=True, return_counts=True)
+        batch_mean = np.bincount(group, weights=x) / n
+        batch_var = np.bincount(group, weights=np.square(x - batch_mean[group])) / n
+
+        # Block EWMA: n observations at once carry weight 1 - (1 - alpha)^n
+        old_mean = self._mean[touched]
+        fresh = self._count[touched] == 0
+        keep = np.power(1.0 - self.alpha, n)
+        keep[fresh] = 0.0
+        self._mean[touched] = keep * old_mean + (1.0 - keep) * batch_mean
+        self._var[touched] = keep * self._var[touched] + (1.0 - keep) * (
+            batch_var + np.square(batch_mean - old_mean) * ~fresh)
+        self._count[touched] += n
+
+        # Append to each series' history ring, preserving arrival order per series
+        order = np.argsort(group, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+        rank = np.empty(len(x), dtype=np.int64)
+        rank[order] = np.arange(len(x)) - np.repeat(starts, n)
+        slots = (self._count[idx] - n[group] + rank) % self.history
+        self._history[idx, slots] = x
+
+        # Median/MAD move slowly; refresh them during warm-up and then every few samples
+        count = self._count[touched]
+        step = self._refresh_every
+        due = (count <= 2 * self.min_samples) | (count // step != (count - n) // step)
+        refresh = touched[due]
+        if len(refresh):
+            window = self._history[refresh]
+            median = _row_nanmedian(window)
+            self._median[refresh] = median
+            self._mad[refresh] = _row_nanmedian(np.abs(window - median[:, None]))
+
+    def stats(self) -> Dict:
+        """Snapshot of scoring counters"""
+        return {
+            "threshold": self.threshold,
+            "series": self._series,
+            "series_rejected": self.series_rejected,
+            "readings_scored": self.readings_scored,
+            "readings_flagged": self.readings_flagged,
+            "flagged_by_field": dict(self.flagged_by_field),
+        }
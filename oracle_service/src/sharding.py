@@ -0,0 +1,145 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Replica Scale-Out                            ║
+║  "Many oracles, one truth per field"                               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Splits sensor traffic across N Oracle replicas (``ORACLE_SCALE_MODE``):
+
+``single``  every message is processed here (one replica only).
+``shared``  subscribe to ``$share/<group>/field/+/sensors`` (and ``.../bin``); the broker hands
+            each message to one replica of the group. Network load is split
+            too, but a field's readings are spread over all replicas, so
+            per-series state (scoring, windows) only sees part of a series.
+``hash``    every replica subscribes to ``field/+/sensors[/bin]`` and keeps only the
+            fields it owns by rendezvous hashing of ``field_id``. Each field
+            stays on one replica, and changing ``ORACLE_REPLICA_COUNT`` only
+            moves the fields of the replicas that were added or removed.
+"""
+
+import collections
+import hashlib
+import os
+import re
+from typing import Dict, List, Sequence
+
+from .frames import FRAME_TOPIC
+
+SENSOR_TOPIC = 'field/+/sensors'
+
+
+def _replica_index_from_env() -> int:
+    """ORACLE_REPLICA_INDEX, else the ordinal of a StatefulSet-style hostname (oracle-2)"""
+    index = os.getenv('ORACLE_REPLICA_INDEX')
+    if index:
+        return int(index)
+    match = re.search(r'-(\d+)$', os.getenv('HOSTNAME', ''))
+    return int(match.group(1)) if match else 0
+
+
+def rendezvous_owner(field_id: str, replica_count: int) -> int:
+    """Replica with the highest hash score for ``field_id``"""
+    best, best_score = 0, -1
+    for replica in range(replica_count):
+        digest = hashlib.blake2b(f"{replica}/{field_id}".encode(), digest_size=8).digest()
+        score = int.from_bytes(digest, 'big')
+        if score > best_score:
+            best, best_score = replica, score
+    return best
+
+
+class FieldRouter:
+    """Chooses this replica's MQTT subscription and which fields it processes.
+
+    ``accept`` runs on the paho network thread for every message, so
+    ownership is computed once per field and cached. Field ids come from
+    untrusted topics, so the cache keeps the ``max_fields`` most recently
+    seen fields, and per-field message counts are kept for the first
+    ``max_fields`` fields only; later ones are counted together.
+    """
+
+    MODES = ('single', 'shared', 'hash')
+
+    def __init__(self, mode: str = 'single', replica_index: int = 0, replica_count: int = 1,
+                 share_group: str = 'heady-oracle', topics: Sequence[str] = (SENSOR_TOPIC, FRAME_TOPIC),
+                 max_fields: int = 10000):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown scale mode '{mode}', expected one of {self.MODES}")
+        if replica_count < 1 or not 0 <= replica_index < replica_count:
+            raise ValueError(f"Replica index {replica_index} is outside 0..{replica_count - 1}")
+        self.mode = mode
+        self.replica_index = replica_index
+        self.replica_count = replica_count if mode != 'single' else 1
+        self.share_group = share_group
+        self.topics = tuple(topics)
+        self.max_fields = max_fields
+        self._owned: Dict[str, bool] = collections.OrderedDict()
+
+        # Metrics (paho thread)
+        self.fields: Dict[str, int] = {}
+        self.other_fields_messages = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls) -> 'FieldRouter':
+        return cls(
+            mode=os.getenv('ORACLE_SCALE_MODE', 'single'),
+            replica_index=_replica_index_from_env(),
+            replica_count=int(os.getenv('ORACLE_REPLICA_COUNT', '1')),
+            share_group=os.getenv('ORACLE_SHARE_GROUP', 'heady-oracle'),
+            max_fields=int(os.getenv('ORACLE_SCALE_MAX_FIELDS', '10000'))
+        )
+
+    def subscriptions(self) -> List[str]:
+        """Topic filters this replica subscribes to"""
+        if self.mode == 'shared':
+            return [f"$share/{self.share_group}/{topic}" for topic in self.topics]
+        return list(self.topics)
+
+    def owns(self, field_id: str) -> bool:
+        if self.mode != 'hash':
+            return True
+        owned = self._owned.get(field_id)
+        if owned is None:
+            owned = self._owned[field_id] = rendezvous_owner(field_id, self.replica_count) == self.replica_index
+            if len(self._owned) > self.max_fields:
+                self._owned.popitem(last=False)
+        else:
+            self._owned.move_to_end(field_id)
+        return owned
+
+    def accept(self, topic: str) -> bool:
+        """Whether this replica should process a message on ``topic``"""
+        parts = topic.split('/', 2)
+        if len(parts) < 2:
+            return True  # malformed; let the pipeline reject it
+        field_id = parts[1]
+        if not self.owns(field_id):
+            self.skipped += 1
+            return False
+        fields = self.fields
+        count = fields.get(field_id)
+        if count is not None:
+            fields[field_id] = count + 1
+        elif len(fields) < self.max_fields:
+            fields[field_id] = 1
+        else:
+            self.other_fields_messages += 1
+        return True
+
+    def stats(self) -> Dict:
+        """This replica's scale-out configuration and the fields it has processed"""
+        fields = dict(self.fields)
+        return {
+            "mode": self.mode,
+            "replica_index": self.replica_index,
+            "replica_count": self.replica_count,
+            "subscriptions": self.subscriptions(),
+            "messages_skipped": self.skipped,
+            "owned_fields": len(fields),
+            "max_fields": self.max_fields,
+            "fields": dict(sorted(fields.items())),
+            "messages_other_fields": self.other_fields_messages,
+        }
@@ -0,0 +1,304 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Write-Ahead Spool                            ║
+║  "When the vault sleeps, the ledger keeps writing"                 ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Line-protocol batches that cannot reach InfluxDB are appended to segment
+files ``spool-<seq>.seg``. Each record is ``<u32 length><u32 crc32>`` followed
+by ``bucket\\nline\\nline...`` in UTF-8; a torn or corrupt tail (e.g. after a
+crash) ends the segment on replay. Replays are safe to repeat because
+InfluxDB treats a rewritten point (same series and timestamp) as an upsert.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('<II')
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+class WriteAheadSpool:
+    """Bounded, append-only on-disk spool of line-protocol batches (thread-safe)"""
+
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024,
+                 max_bytes: int = 1024 * 1024 * 1024, fsync: str = 'interval',
+                 fsync_interval: float = 1.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {FSYNC_POLICIES}")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._closed_segments: List[str] = []
+        self._closed_bytes = 0
+        self._current_path: Optional[str] = None
+        self._current = None
+        self._current_bytes = 0
+        self._next_seq = 0
+        self._last_fsync = 0.0
+
+        # Metrics
+        self.records_spooled = 0
+        self.records_rejected = 0
+        self.segments_evicted = 0
+        self.bytes_evicted = 0
+
+    def open(self):
+        """Create the spool directory and pick up segments left by a previous run"""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = sorted(name for name in os.listdir(self.directory)
+                          if name.startswith('spool-') and name.endswith('.seg'))
+        for name in existing:
+            path = os.path.join(self.directory, name)
+            self._closed_segments.append(path)
+            self._closed_bytes += os.path.getsize(path)
+        if existing:
+            self._next_seq = int(existing[-1][len('spool-'):-len('.seg')]) + 1
+            logger.info(f"Spool holds {len(existing)} segments ({self._closed_bytes} bytes) from a previous run")
+
+    def append(self, bucket: str, records: List[str]) -> bool:
+        """Durably append one batch; returns False if the disk budget is exhausted"""
+        payload = (bucket + '\n' + '\n'.join(records)).encode()
+        frame = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if not self._make_room(len(frame)):
+                self.records_rejected += len(records)
+                return False
+            if self._current is None:
+                self._open_segment()
+            self._current.write(frame)
+            self._current.flush()
+            self._current_bytes += len(frame)
+            self._sync()
+            self.records_spooled += len(records)
+            if self._current_bytes >= self.segment_bytes:
+                self._close_segment()
+        return True
+
+    def take_segments(self) -> List[str]:
+        """Seal the active segment and return all sealed segments, oldest first"""
+        with self._lock:
+            if self._current is not None and self._current_bytes:
+                self._close_segment()
+            return list(self._closed_segments)
+
+    def remove(self, path: str):
+        """Delete a segment once it has been fully replayed"""
+        with self._lock:
+            if path in self._closed_segments:
+                self._closed_segments.remove(path)
+                self._closed_bytes -= os.path.getsize(path)
+                os.remove(path)
+
+    @staticmethod
+    def read_segment(path: str) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (bucket, records) batches, stopping at a torn or corrupt record"""
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                length, checksum = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    logger.warning(f"Spool segment {path} has a corrupt tail; replaying up to it")
+                    return
+                bucket, _, body = payload.decode().partition('\n')
+                yield bucket, body.split('\n')
+
+    def pending_bytes(self) -> int:
+        return self._closed_bytes + self._current_bytes
+
+    def is_empty(self) -> bool:
+        return not self._closed_segments and not self._current_bytes
+
+    def close(self):
+        with self._lock:
+            if self._current is not None:
+                if self._current_bytes:
+                    self._close_segment()
+                else:
+                    self._current.close()
+                    os.remove(self._current_path)
+                    self._current = None
+
+    def _open_segment(self):
+        self._current_path = os.path.join(self.directory, f"spool-{self._next_seq:012d}.seg")
+        self._next_seq += 1
+        self._current = open(self._current_path, 'ab', buffering=1024 * 1024)
+        self._current_bytes = 0
+
+    def _close_segment(self):
+        self._current.flush()
+        if self.fsync != 'never':
+            os.fsync(self._current.fileno())
+        self._current.close()
+        self._closed_segments.append(self._current_path)
+        self._closed_bytes += self._current_bytes
+        self._current = None
+        self._current_path = None
+        self._current_bytes = 0
+
+    def _sync(self):
+        if self.fsync == 'always':
+            os.fsync(self._current.fileno())
+        elif self.fsync == 'interval':
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._current.fileno())
+                self._last_fsync = now
+
+    def _make_room(self, size: int) -> bool:
+        """Evict the oldest sealed segments until ``size`` more bytes fit"""
+        while self.pending_bytes() + size > self.max_bytes and self._closed_segments:
+            oldest = self._closed_segments.pop(0)
+            evicted = os.path.getsize(oldest)
+            os.remove(oldest)
+            self._closed_bytes -= evicted
+            self.segments_evicted += 1
+            self.bytes_evicted += evicted
+            logger.error(f"Spool over budget: evicted oldest segment {oldest} ({evicted} bytes)")
+        return self.pending_bytes() + size <= self.max_bytes
+
+    def stats(self) -> Dict:
+        """Snapshot of spool usage"""
+        return {
+            "directory": self.directory,
+            "pending_bytes": self.pending_bytes(),
+            "max_bytes": self.max_bytes,
+            "segments": len(self._closed_segments) + (1 if self._current_bytes else 0),
+            "fsync": self.fsync,
+            "records_spooled": self.records_spooled,
+            "records_rejected": self.records_rejected,
+            "segments_evicted": self.segments_evicted,
+            "bytes_evicted": self.bytes_evicted,
+        }
+
+
+class SpoolReplayer:
+    """Replays spooled batches once the vault's health check passes again.
+
+    ``health_fn`` and ``write_fn(bucket, records)`` are blocking and run in a
+    worker thread. Replay is throttled to ``rate`` records per second so a
+    recovering vault is not flattened by the backlog.
+
+    A chunk the vault rejects (``is_rejected(error)``) is skipped and counted;
+    any other error interrupts the replay, which resumes from the same
+    segment once the vault is healthy again.
+    """
+
+    def __init__(self, spool: WriteAheadSpool, write_fn: Callable[[str, List[str]], None],
+                 health_fn: Callable[[], bool], on_recovered: Optional[Callable[[], None]] = None,
+                 rate: float = 50000.0, batch_size: int = 5000, check_interval: float = 5.0,
+                 is_rejected: Callable[[BaseException], bool] = lambda error: False):
+        self.spool = spool
+        self._write_fn = write_fn
+        self._health_fn = health_fn
+        self._on_recovered = on_recovered
+        self.rate = rate
+        self.batch_size = batch_size
+        self.check_interval = check_interval
+        self.is_rejected = is_rejected
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        # Metrics
+        self.records_replayed = 0
+        self.records_rejected = 0
+        self.segments_replayed = 0
+        self.replay_failures = 0
+        self.replaying = False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """Check for a healthy vault now rather than at the next interval"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self.spool.is_empty():
+                continue
+            try:
+                healthy = await asyncio.to_thread(self._health_fn)
+            except Exception:
+                healthy = False
+            if not healthy:
+                continue
+            if self._on_recovered:
+                self._on_recovered()
+            try:
+                await self.replay()
+            except Exception as e:
+                self.replay_failures += 1
+                logger.warning(f"Spool replay interrupted: {e}")
+
+    async def replay(self):
+        """Replay every sealed segment, oldest first, deleting each when done"""
+        self.replaying = True
+        try:
+            for path in await asyncio.to_thread(self.spool.take_segments):
+                batches = await asyncio.to_thread(lambda: list(self.spool.read_segment(path)))
+                for bucket, records in batches:
+                    for i in range(0, len(records), self.batch_size):
+                        chunk = records[i:i + self.batch_size]
+                        started = time.monotonic()
+                        try:
+                            await asyncio.to_thread(self._write_fn, bucket, chunk)
+                        except Exception as e:
+                            if not self.is_rejected(e):
+                                raise
+                            self.records_rejected += len(chunk)
+                            logger.error(f"InfluxDB rejected {len(chunk)} spooled records from {path}, "
+                                         f"skipping them: {e}")
+                            continue
+                        self.records_replayed += len(chunk)
+                        # Throttle to the configured replay rate
+                        remaining = len(chunk) / self.rate - (time.monotonic() - started)
+                        if remaining > 0:
+                            await asyncio.sleep(remaining)
+                await asyncio.to_thread(self.spool.remove, path)
+                self.segments_replayed += 1
+                logger.info(f"Replayed spool segment {path}")
+        finally:
+            self.replaying = False
+
+    def stats(self) -> Dict:
+        return {
+            "replaying": self.replaying,
+            "records_replayed": self.records_replayed,
+            "records_rejected": self.records_rejected,
+            "segments_replayed": self.segments_replayed,
+            "replay_failures": self.replay_failures,
+            "replay_rate_limit": self.rate,
+        }
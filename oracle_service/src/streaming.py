@@ -0,0 +1,309 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Live Reading Fan-Out                         ║
+║  "Watch the field without knocking on the vault"                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Pushes verified readings to live subscribers (dashboards) as they are
+stored, over Server-Sent Events (``GET /stream``) or WebSocket (``/ws``),
+so nobody has to poll InfluxDB for current values. Subscribers filter by
+``field_id`` and ``sensor_id``.
+
+Publishing appends each reading, encoded to JSON once, to a log per
+watched field (and to one log of all fields while anyone watches
+everything); subscribers keep a cursor into the logs of their fields and
+copy out what is new when they wake. Publishing therefore costs the same
+for one subscriber as for thousands, and a client costs a cursor rather
+than a private queue.
+
+Each client's backlog is bounded by ``buffer`` readings per log. A client
+that reads too slowly to keep up and falls further behind than that gets
+the latest reading per (field, sensor) instead of the whole backlog, so a
+slow dashboard sees fewer, fresher updates and never holds memory.
+Deliveries to one client are at least ``min_interval`` apart (100 ms by
+default), which batches a busy field's readings into one write instead of
+waking every handler for every ingest batch. Subscribers may ask for a
+longer ``interval`` and for ``latest`` delivery (always coalesced).
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .codec import SensorReading
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:  # optional fast path
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+class StreamLimitReached(Exception):
+    """Raised when the hub already serves ``max_subscribers`` clients"""
+
+
+def parse_filter(spec: Optional[str]) -> Optional[Set[str]]:
+    """Comma-separated ids, or None (no filter) for an empty spec"""
+    ids = {part.strip() for part in (spec or '').split(',') if part.strip()}
+    return ids or None
+
+
+def sse_event(messages: Iterable[bytes]) -> bytes:
+    """Server-Sent Events chunk carrying one event per message"""
+    return b''.join(b'data: ' + message + b'\n\n' for message in messages)
+
+
+def json_array(messages: List[bytes]) -> str:
+    """WebSocket text frame carrying a batch of messages"""
+    return (b'[' + b','.join(messages) + b']').decode()
+
+
+class _Log:
+    """Recent encoded readings of one field (or of every field), shared by its subscribers.
+
+    Keeps between ``capacity`` and twice as many readings; ``base`` is the
+    sequence number of the oldest one kept.
+    """
+
+    __slots__ = ('capacity', 'base', 'keys', 'messages', 'waiters')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.base = 0
+        self.keys: List[Tuple[str, str]] = []
+        self.messages: List[bytes] = []
+        self.waiters: Set['Subscriber'] = set()
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.messages)
+
+    def trim(self):
+        excess = len(self.messages) - self.capacity
+        if excess > self.capacity:
+            del self.keys[:excess]
+            del self.messages[:excess]
+            self.base += excess
+
+    def wake(self):
+        for subscriber in self.waiters:
+            subscriber._event.set()
+        self.waiters.clear()
+
+
+class Subscriber:
+    """One client's filter and read position in the logs of its fields"""
+
+    __slots__ = ('fields', 'sensors', 'limit', 'latest_only', 'interval', 'transport', 'connected_at',
+                 'closed', '_cursors', '_event', 'delivered', 'coalesced')
+
+    def __init__(self, fields: Optional[Set[str]], sensors: Optional[Set[str]], logs: List[_Log], limit: int,
+                 latest_only: bool = False, interval: float = 0.0, transport: str = 'sse'):
+        self.fields = fields
+        self.sensors = sensors
+        self.limit = limit
+        self.latest_only = latest_only
+        self.interval = interval
+        self.transport = transport
+        self.connected_at = time.time()
+        self.closed = False
+        self._cursors = [[log, log.end] for log in logs]  # new readings only
+        self._event = asyncio.Event()
+
+        # Metrics
+        self.delivered = 0
+        self.coalesced = 0
+
+    def backlog(self) -> int:
+        return sum(log.end - cursor for log, cursor in self._cursors)
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+    def _collect(self) -> List[bytes]:
+        collected = []
+        sensors = self.sensors
+        for cursor in self._cursors:
+            log, position = cursor
+            end = log.end
+            if position >= end:
+                continue
+            cursor[1] = end
+            behind = end - position
+            start = max(0, position - log.base)
+            if sensors is None and behind <= self.limit and not self.latest_only:
+                collected.extend(log.messages[start:])
+                continue
+            keys = log.keys[start:]
+            messages = log.messages[start:]
+            if sensors is not None:
+                selected = [i for i, key in enumerate(keys) if key[1] in sensors]
+                keys = [keys[i] for i in selected]
+                messages = [messages[i] for i in selected]
+            if self.latest_only or behind > self.limit:
+                # Slow client (or asked for latest only): newest reading of each series, the rest is skipped
+                latest = dict(zip(keys, messages))
+                self.coalesced += len(messages) - len(latest)
+                messages = list(latest.values())
+            collected.extend(messages)
+        self.delivered += len(collected)
+        return collected
+
+    async def next_batch(self, timeout: float) -> List[bytes]:
+        """Readings new since the last call; empty after ``timeout`` seconds without any"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            messages = self._collect()
+            remaining = deadline - loop.time()
+            if messages or self.closed or remaining <= 0:
+                return messages
+            self._event.clear()
+            for log, _ in self._cursors:
+                log.waiters.add(self)
+            try:
+                await asyncio.wait_for(self._event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                for log, _ in self._cursors:
+                    log.waiters.discard(self)
+
+
+class FanoutHub:
+    """Appends stored readings to the logs of watched fields and wakes their subscribers"""
+
+    def __init__(self, max_subscribers: int = 5000, buffer: int = 1000, keepalive: float = 15.0,
+                 min_interval: float = 0.1):
+        self.max_subscribers = max_subscribers
+        self.buffer = buffer
+        self.keepalive = keepalive
+        self.min_interval = min_interval
+        self._subscribers: Set[Subscriber] = set()
+        self._logs: Dict[str, _Log] = {}
+        self._watchers: Dict[str, int] = {}
+        self._everything: Optional[_Log] = None
+        self._everything_watchers = 0
+
+        # Metrics
+        self.subscriptions_total = 0
+        self.rejected = 0
+        self.published = 0
+        self.delivered = 0  # of subscribers that have disconnected; live ones are summed in stats()
+        self.coalesced = 0
+
+    def check_capacity(self):
+        """Raise ``StreamLimitReached`` if another subscriber would exceed ``max_subscribers``"""
+        if len(self._subscribers) >= self.max_subscribers:
+            self.rejected += 1
+            raise StreamLimitReached(f"Already streaming to {len(self._subscribers)} subscribers")
+
+    def subscribe(self, fields: Optional[Set[str]] = None, sensors: Optional[Set[str]] = None,
+                  latest_only: bool = False, interval: float = 0.0, transport: str = 'sse') -> Subscriber:
+        self.check_capacity()
+        if fields is None:
+            if self._everything is None:
+                self._everything = _Log(self.buffer)
+            self._everything_watchers += 1
+            logs = [self._everything]
+        else:
+            logs = []
+            for field_id in fields:
+                log = self._logs.get(field_id)
+                if log is None:
+                    log = self._logs[field_id] = _Log(self.buffer)
+                self._watchers[field_id] = self._watchers.get(field_id, 0) + 1
+                logs.append(log)
+        subscriber = Subscriber(fields, sensors, logs, self.buffer, latest_only,
+                                max(interval, self.min_interval), transport)
+        self._subscribers.add(subscriber)
+        self.subscriptions_total += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber not in self._subscribers:
+            return
+        self._subscribers.discard(subscriber)
+        if subscriber.fields is None:
+            self._everything_watchers -= 1
+            if not self._everything_watchers:
+                self._everything = None
+        else:
+            for field_id in subscriber.fields:
+                self._watchers[field_id] -= 1
+                if not self._watchers[field_id]:
+                    del self._watchers[field_id]
+                    del self._logs[field_id]
+        subscriber.close()
+        self.delivered += subscriber.delivered
+        self.coalesced += subscriber.coalesced
+
+    @staticmethod
+    def encode(reading: SensorReading) -> bytes:
+        return _dumps({
+            "field_id": reading.field_id,
+            "sensor_id": reading.sensor_id,
+            "timestamp": reading.timestamp,
+            "fields": reading.fields,
+            "confidence": reading.confidence,
+        })
+
+    def publish(self, readings: List[SensorReading]):
+        """Append stored readings to the watched logs and wake their subscribers (event loop only)"""
+        if not self._subscribers:
+            return
+        logs = self._logs
+        everything = self._everything
+        touched = set()
+        for reading in readings:
+            if not reading.fields:
+                continue
+            log = logs.get(reading.field_id)
+            if log is None and everything is None:
+                continue
+            key = (reading.field_id, reading.sensor_id)
+            message = self.encode(reading)
+            if log is not None:
+                log.keys.append(key)
+                log.messages.append(message)
+                touched.add(log)
+            if everything is not None:
+                everything.keys.append(key)
+                everything.messages.append(message)
+                touched.add(everything)
+            self.published += 1
+        for log in touched:
+            log.trim()
+            log.wake()
+
+    def close(self):
+        """Disconnect every subscriber (their handlers return)"""
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict:
+        """Snapshot of subscribers and fan-out counters"""
+        live = self._subscribers
+        return {
+            "subscribers": len(live),
+            "max_subscribers": self.max_subscribers,
+            "by_transport": {t: sum(1 for s in live if s.transport == t) for t in ('sse', 'websocket')},
+            "watched_fields": len(self._logs),
+            "watching_all_fields": self._everything_watchers,
+            "buffer": self.buffer,
+            "min_interval_s": self.min_interval,
+            "retained": sum(len(log.messages) for log in self._logs.values())
+            + (len(self._everything.messages) if self._everything else 0),
+            "backlog": sum(s.backlog() for s in live),
+            "subscriptions_total": self.subscriptions_total,
+            "rejected": self.rejected,
+            "readings_published": self.published,
+            "delivered": self.delivered + sum(s.delivered for s in live),
+            "coalesced": self.coalesced + sum(s.coalesced for s in live),
+        }
@@ -0,0 +1,644 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Multi-Process Supervisor                     ║
+║  "One oracle per core, one voice to the world"                     ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+With ``ORACLE_PROCESSES`` > 1 (or ``auto``), ``python -m src.oracle_server``
+becomes a supervisor that runs K complete Oracle processes, each with its own
+MQTT client, pipeline and InfluxDB writer, so decoding, verification and line
+protocol encoding scale past one GIL. Workers split the sensor traffic with
+the replica scale-out modes (``ORACLE_WORKER_SCALE_MODE``):
+
+``shared`` (default) makes every worker a member of the broker's shared
+subscription, so each message reaches one worker only. A field's readings
+are spread over the workers, so per-series state (scoring windows, the
+in-memory window, dedup) sees part of each series.
+``hash`` gives each worker its own slots in the rendezvous ring, so fields
+never move between processes, but every worker's MQTT client receives all
+traffic and drops what it does not own, which costs each of them the MQTT
+decoding of every message. It is used when rollups are configured (they need
+whole series), and whenever the containers themselves are hash-sharded.
+
+Runtime settings (admission, verification threshold, backoff) PUT to the
+supervisor are kept and replayed to a worker once it is back after a
+restart.
+
+Workers serve their API on loopback ports, a free one picked at each start
+(or ``ORACLE_WORKER_BASE_PORT`` + index when set); the supervisor owns the public
+port and serves aggregated ``/health``, ``/status`` and ``/metrics``, routing
+``/fields/<id>/...`` queries to the worker that owns the field and merging
+the workers' live ``/stream`` feeds (also offered as ``/ws``). Crashed
+workers are restarted with jittered Fibonacci backoff.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from .metrics import MetricsRegistry, merge_expositions
+from .rollup import check_rollup_scale_mode, parse_tiers
+from .sharding import FieldRouter, rendezvous_owner
+from .streaming import json_array, parse_filter, sse_event
+
+try:
+    import psutil
+except ImportError:  # optional; os.cpu_count() counts logical cores instead
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def physical_cores() -> int:
+    """Physical cores available to this process, as reported by scripts/ops/profile_node.py"""
+    cores = (psutil.cpu_count(logical=False) if psutil else None) or os.cpu_count() or 1
+    if hasattr(os, 'sched_getaffinity'):
+        cores = min(cores, len(os.sched_getaffinity(0)))
+    return max(1, cores)
+
+
+def worker_processes(setting: str) -> int:
+    """Parse ORACLE_PROCESSES: a number, or ``auto`` for one worker per physical core"""
+    if setting.strip().lower() == 'auto':
+        return physical_cores()
+    return max(1, int(setting))
+
+
+def worker_scale_mode(setting: str, container_mode: str, rollups: bool) -> str:
+    """Scale mode for the workers: ORACLE_WORKER_SCALE_MODE (``auto``, ``shared`` or ``hash``).
+
+    Workers follow the containers' mode when those are sharded; otherwise
+    ``auto`` shares the subscription unless rollups need whole series.
+    """
+    setting = setting.strip().lower()
+    if setting not in ('auto', 'shared', 'hash'):
+        raise ValueError(f"Unknown worker scale mode '{setting}', expected auto, shared or hash")
+    if container_mode in ('shared', 'hash'):
+        if setting not in ('auto', container_mode):
+            raise ValueError(f"ORACLE_WORKER_SCALE_MODE={setting} conflicts with ORACLE_SCALE_MODE={container_mode}")
+        return container_mode
+    if setting == 'auto':
+        return 'hash' if rollups else 'shared'
+    return setting
+
+
+def free_loopback_port() -> int:
+    """A loopback port nothing listens on right now, from the OS's ephemeral range"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class WorkerProcess:
+    """One Oracle child process and its restart bookkeeping"""
+
+    def __init__(self, index: int, port: Optional[int] = None):
+        self.index = index
+        self.fixed_port = port  # None: a free port is picked at every start
+        self.port = port or 0
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.failures = 0  # consecutive early exits, drives the restart backoff
+        self.restart_at: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class OracleSupervisor:
+    """Spawns, monitors and aggregates K Oracle worker processes"""
+
+    def __init__(self, processes: int, backoff, worker_base_port: Optional[int] = None,
+                 stable_after: float = 60.0, stop_timeout: float = 15.0):
+        self.processes = processes
+        self.backoff = backoff
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.workers = [WorkerProcess(i, worker_base_port + i if worker_base_port else None)
+                        for i in range(processes)]
+
+        # Outer replica layout (containers); each container contributes K slots
+        self.router = FieldRouter.from_env()
+        # Fail here rather than in every worker's restart loop
+        rollup_tiers = parse_tiers(os.getenv('ORACLE_ROLLUP_TIERS', ''))
+        self.worker_mode = worker_scale_mode(os.getenv('ORACLE_WORKER_SCALE_MODE', 'auto'), self.router.mode,
+                                             bool(rollup_tiers))
+        check_rollup_scale_mode(rollup_tiers, self.worker_mode)
+        # Runtime settings PUT to the workers, by path, replayed to restarted workers
+        self.settings: Dict[str, Dict] = {}
+        self._replay_tasks: Set[asyncio.Task] = set()
+        self.spool_dir = os.getenv('ORACLE_SPOOL_DIR', '/app/spool')
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stream_client: Optional[httpx.AsyncClient] = None
+        self._monitor_task = None
+        self._stopping = False
+        self.max_streams = int(os.getenv('ORACLE_STREAM_MAX_SUBSCRIBERS', '5000'))
+        self.stream_buffer = int(os.getenv('ORACLE_STREAM_BUFFER', '1000'))
+        self.stream_keepalive = float(os.getenv('ORACLE_STREAM_KEEPALIVE_SECONDS', '15'))
+        self.streams = 0
+        self._streams_closing = False
+
+        self.registry = MetricsRegistry()
+        self.registry.callback('oracle_supervisor_workers', 'Configured worker processes',
+                               lambda: self.processes)
+        self.registry.callback('oracle_supervisor_workers_alive', 'Worker processes running',
+                               lambda: sum(w.alive() for w in self.workers))
+        self.registry.callback('oracle_supervisor_worker_restarts_total', 'Worker process restarts',
+                               lambda: {(str(w.index),): w.restarts for w in self.workers},
+                               kind='counter', labelnames=['worker'])
+
+    def _worker_env(self, worker: WorkerProcess) -> Dict[str, str]:
+        env = dict(os.environ)
+        env['ORACLE_PROCESSES'] = '1'
+        env['ORACLE_HOST'] = '127.0.0.1'
+        env['ORACLE_PORT'] = str(worker.port)
+        env['ORACLE_SCALE_MODE'] = self.worker_mode
+        env['ORACLE_REPLICA_INDEX'] = str(self.router.replica_index * self.processes + worker.index)
+        env['ORACLE_REPLICA_COUNT'] = str(self.router.replica_count * self.processes)
+        if self.spool_dir:
+            env['ORACLE_SPOOL_DIR'] = os.path.join(self.spool_dir, f"worker-{worker.index}")
+        if 'ORACLE_VERIFY_WORKERS' not in os.environ:
+            # Share the cores between the workers' verification pools
+            env['ORACLE_VERIFY_WORKERS'] = str(max(1, (os.cpu_count() or 1) // self.processes))
+        return env
+
+    def _spawn(self, worker: WorkerProcess):
+        if worker.fixed_port is None:
+            # Something may take the port before the worker binds it; the worker then exits and is
+            # restarted on another one
+            worker.port = free_loopback_port()
+        worker.process = subprocess.Popen(
+            [sys.executable, '-m', 'src.oracle_server'],
+            env=self._worker_env(worker)
+        )
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logger.info(f"Started Oracle worker {worker.index} (pid {worker.process.pid}, port {worker.port})")
+
+    def _check_leftover_spools(self):
+        """Warn about spools of workers that no longer exist (ORACLE_PROCESSES was lowered)"""
+        if not self.spool_dir or not os.path.isdir(self.spool_dir):
+            return
+        for name in sorted(os.listdir(self.spool_dir)):
+            index = name[len('worker-'):]
+            path = os.path.join(self.spool_dir, name)
+            if name.startswith('worker-') and index.isdigit() and int(index) >= self.processes and os.listdir(path):
+                logger.warning(f"Spool {path} belongs to a worker that is no longer started; "
+                               f"its data is replayed only if ORACLE_PROCESSES is raised again")
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=httpx.Timeout(2.0))
+        # One long-lived upstream connection per subscriber and worker, so no pool limit and no read timeout
+        self._stream_client = httpx.AsyncClient(timeout=httpx.Timeout(2.0, read=None),
+                                                limits=httpx.Limits(max_connections=None))
+        self._check_leftover_spools()
+        for worker in self.workers:
+            self._spawn(worker)
+        self._monitor_task = asyncio.create_task(self._monitor())
+        logger.info(f"Oracle supervisor running {self.processes} workers ({self.worker_mode} sharding)")
+
+    async def stop(self):
+        """Ask every worker to shut down gracefully, killing stragglers"""
+        self._stopping = True
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+        for task in self._replay_tasks:
+            task.cancel()
+        await asyncio.gather(*self._replay_tasks, return_exceptions=True)
+        for worker in self.workers:
+            if worker.alive():
+                worker.process.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + self.stop_timeout
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                await asyncio.to_thread(worker.process.wait, max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Worker {worker.index} did not stop within {self.stop_timeout}s, killing it")
+                worker.process.kill()
+        if self._client is not None:
+            await self._client.aclose()
+        if self._stream_client is not None:
+            await self._stream_client.aclose()
+        logger.info("Oracle supervisor stopped")
+
+    async def _monitor(self):
+        while not self._stopping:
+            now = time.monotonic()
+            for worker in self.workers:
+                if worker.alive():
+                    if worker.failures and now - worker.started_at > self.stable_after:
+                        worker.failures = 0
+                    continue
+                if worker.restart_at is None:
+                    code = worker.process.returncode if worker.process else None
+                    delay = self.backoff.delay(worker.failures)
+                    worker.failures += 1
+                    worker.restart_at = now + delay
+                    logger.error(f"Oracle worker {worker.index} exited with code {code}; restarting in {delay:.1f}s")
+                elif now >= worker.restart_at:
+                    worker.restarts += 1
+                    self._spawn(worker)
+                    if self.settings:
+                        task = asyncio.create_task(self._replay_settings(worker, worker.process))
+                        self._replay_tasks.add(task)
+                        task.add_done_callback(self._replay_tasks.discard)
+            await asyncio.sleep(0.5)
+
+    async def _replay_settings(self, worker: WorkerProcess, process: subprocess.Popen, ready_timeout: float = 120.0):
+        """Once a restarted worker answers, PUT it every runtime setting the other workers have"""
+        deadline = time.monotonic() + ready_timeout
+        while worker.process is process and worker.alive():
+            response = await self._get(worker, '/health')
+            if response is not None and response.status_code == 200:
+                break
+            if time.monotonic() > deadline:
+                logger.error(f"Worker {worker.index} did not come up; runtime settings not replayed")
+                return
+            await asyncio.sleep(0.5)
+        else:
+            return  # exited again; its next start replays the settings
+        for path in list(self.settings):
+            # Read the value now, so a setting changed meanwhile is not overwritten with an older one
+            response = await self._put(worker, path, self.settings[path])
+            if response is None or response.status_code != 200:
+                logger.error(f"Could not replay {path} to worker {worker.index}: "
+                             f"{'no answer' if response is None else f'HTTP {response.status_code}'}")
+        logger.info(f"Replayed {len(self.settings)} runtime settings to worker {worker.index}")
+
+    async def _get(self, worker: WorkerProcess, path: str, params=None) -> Optional[httpx.Response]:
+        if not worker.alive():
+            return None
+        try:
+            return await self._client.get(worker.url + path, params=params)
+        except httpx.HTTPError as e:
+            logger.debug(f"Worker {worker.index} did not answer {path}: {e}")
+            return None
+
+    async def _put(self, worker: WorkerProcess, path: str, params=None) -> Optional[httpx.Response]:
+        if not worker.alive():
+            return None
+        try:
+            return await self._client.put(worker.url + path, params=params)
+        except httpx.HTTPError as e:
+            logger.debug(f"Worker {worker.index} did not answer PUT {path}: {e}")
+            return None
+
+    @staticmethod
+    def _body(worker: WorkerProcess, response: httpx.Response, path: str):
+        """A worker's JSON answer; a non-JSON one (a crash's plain 500) becomes a 502 naming the worker"""
+        try:
+            return response.json()
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY,
+                                detail=f"Worker {worker.index} answered {path} with HTTP {response.status_code} "
+                                       f"and no JSON body") from None
+
+    async def _gather_json(self, path: str) -> List[Optional[Dict]]:
+        responses = await asyncio.gather(*(self._get(w, path) for w in self.workers))
+        results = []
+        for worker, response in zip(self.workers, responses):
+            try:
+                results.append(self._body(worker, response, path)
+                               if response is not None and response.status_code == 200 else None)
+            except HTTPException:
+                results.append(None)
+        return results
+
+    def owner(self, field_id: str) -> Optional[WorkerProcess]:
+        """Local worker owning ``field_id`` in hash mode (None if another container owns it)"""
+        slot = rendezvous_owner(field_id, self.router.replica_count * self.processes)
+        local = slot - self.router.replica_index * self.processes
+        return self.workers[local] if 0 <= local < self.processes else None
+
+    def stream_workers(self, fields: Optional[Set[str]]) -> List[WorkerProcess]:
+        """Workers that can produce readings for ``fields`` (None = all fields)"""
+        if fields is None or self.worker_mode == 'shared':
+            return list(self.workers)
+        owners = {self.owner(field_id) for field_id in fields}
+        return [worker for worker in self.workers if worker in owners]
+
+    async def _relay_stream(self, worker: WorkerProcess, params, queue: asyncio.Queue):
+        """Copy one worker's SSE messages into ``queue``, reconnecting across worker restarts"""
+        while True:
+            if worker.alive():
+                try:
+                    async with self._stream_client.stream('GET', worker.url + '/stream', params=params) as response:
+                        if response.status_code == 200:
+                            async for line in response.aiter_lines():
+                                if line.startswith('data: '):
+                                    await queue.put(line[6:].encode())
+                        elif response.status_code < 500:
+                            # Bad parameters or streaming disabled: retrying will not help
+                            logger.warning(f"Worker {worker.index} rejected a stream: HTTP {response.status_code}")
+                            return
+                        else:
+                            logger.warning(f"Worker {worker.index} refused a stream: HTTP {response.status_code}")
+                except httpx.HTTPError as e:
+                    logger.debug(f"Stream from worker {worker.index} ended: {e}")
+            await asyncio.sleep(1.0)
+
+    def open_stream(self, fields: Optional[Set[str]]) -> List[WorkerProcess]:
+        """Check a new subscriber can be served; returns the workers to merge"""
+        workers = self.stream_workers(fields)
+        if not workers:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="The requested fields are owned by other Oracle replicas")
+        if self.streams >= self.max_streams:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail=f"Already streaming to {self.streams} subscribers")
+        return workers
+
+    async def stream(self, workers: List[WorkerProcess], params) -> AsyncIterator[List[bytes]]:
+        """Merge the workers' live feeds into batches of messages ([] when idle for a keepalive interval).
+
+        The merge queue is bounded, so a slow subscriber stalls the relays and
+        the workers coalesce its readings rather than the supervisor buffering them.
+        """
+        self.streams += 1
+        queue = asyncio.Queue(maxsize=self.stream_buffer)
+        relays = [asyncio.create_task(self._relay_stream(worker, params, queue)) for worker in workers]
+        idle = 0.0
+        try:
+            while not self._streams_closing:
+                try:
+                    batch = [await asyncio.wait_for(queue.get(), 1.0)]
+                except asyncio.TimeoutError:
+                    idle += 1.0
+                    if idle >= self.stream_keepalive:
+                        idle = 0.0
+                        yield []
+                    continue
+                idle = 0.0
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                yield batch
+        finally:
+            self.streams -= 1
+            for relay in relays:
+                relay.cancel()
+            await asyncio.gather(*relays, return_exceptions=True)
+
+    def close_streams(self):
+        """End every merged stream (within a second) so shutdown need not wait for subscribers"""
+        self._streams_closing = True
+
+    def worker_info(self, worker: WorkerProcess) -> Dict:
+        return {
+            "pid": worker.process.pid if worker.process else None,
+            "port": worker.port,
+            "alive": worker.alive(),
+            "restarts": worker.restarts,
+            "uptime_s": round(time.monotonic() - worker.started_at, 1) if worker.alive() else 0.0,
+        }
+
+    async def health(self) -> Dict:
+        results = await self._gather_json('/health')
+        healthy = sum(1 for r in results if r and r.get("status") == "healthy")
+        return {
+            "status": "healthy" if healthy == self.processes else "degraded" if healthy else "unhealthy",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "service": "HeadyField Oracle",
+            "version": "1.0.0",
+            "workers_healthy": healthy,
+            "workers": self.processes,
+        }
+
+    async def status(self) -> Dict:
+        results = await self._gather_json('/status')
+        totals = {"processed": 0, "failed": 0, "invalid": 0, "records_written": 0, "owned_fields": 0}
+        for result in results:
+            if result:
+                for key in ("processed", "failed", "invalid"):
+                    totals[key] += result["ingest"][key]
+                totals["records_written"] += result["influx_writer"]["records_written"]
+                totals["owned_fields"] += result["scaling"]["owned_fields"]
+        return {
+            "supervisor": {
+                "processes": self.processes,
+                "mode": self.worker_mode,
+                "replica_index": self.router.replica_index,
+                "replica_count": self.router.replica_count,
+                "streams": self.streams,
+            },
+            "totals": totals,
+            "workers": {
+                str(w.index): {**self.worker_info(w), "status": result}
+                for w, result in zip(self.workers, results)
+            }
+        }
+
+    async def metrics(self) -> str:
+        responses = await asyncio.gather(*(self._get(w, '/metrics') for w in self.workers))
+        expositions = {str(w.index): r.text for w, r in zip(self.workers, responses)
+                       if r is not None and r.status_code == 200}
+        return self.registry.render() + merge_expositions(expositions)
+
+    async def fields(self) -> Dict:
+        merged = {}
+        for result in await self._gather_json('/fields'):
+            for field_id, info in (result or {}).items():
+                entry = merged.setdefault(field_id, {"sensors": 0})
+                entry["sensors"] = max(entry["sensors"], info["sensors"])
+        return merged
+
+    async def admission(self) -> Dict:
+        results = await self._gather_json('/admission')
+        return {str(w.index): result for w, result in zip(self.workers, results)}
+
+    async def put_all(self, path: str, params) -> Dict:
+        """Apply a runtime setting (admission, verification threshold, backoff) to every worker.
+
+        Workers that are down get it replayed once they are back, as do
+        workers restarted later.
+        """
+        responses = await asyncio.gather(*(self._put(w, path, params) for w in self.workers))
+        results = {}
+        for worker, response in zip(self.workers, responses):
+            if response is None:
+                results[str(worker.index)] = None
+                continue
+            body = self._body(worker, response, path)
+            if response.status_code != 200:
+                detail = body.get("detail") if isinstance(body, dict) else body
+                raise HTTPException(status_code=response.status_code, detail=detail)
+            results[str(worker.index)] = body
+        if all(result is None for result in results.values()):
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="No Oracle worker is available")
+        self.settings.pop(path, None)  # keep replay order the order settings were last changed in
+        self.settings[path] = dict(params)
+        return results
+
+    async def field_query(self, field_id: str, path: str, params) -> JSONResponse:
+        """Answer a per-field query from the worker holding that field's window"""
+        if self.worker_mode == 'shared':
+            # Any worker may hold readings for the field; use the first that does
+            for worker in self.workers:
+                response = await self._get(worker, path, params)
+                if response is not None and response.status_code != 404:
+                    return JSONResponse(self._body(worker, response, path), status_code=response.status_code)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No recent data for field {field_id}")
+        worker = self.owner(field_id)
+        if worker is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Field {field_id} is owned by another Oracle replica")
+        response = await self._get(worker, path, params)
+        if response is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail=f"Worker {worker.index} owning field {field_id} is unavailable")
+        return JSONResponse(self._body(worker, response, path), status_code=response.status_code)
+
+
+def create_app(supervisor: OracleSupervisor) -> FastAPI:
+    app = FastAPI(title="HeadyField Oracle Supervisor", version="1.0.0")
+
+    @app.on_event("startup")
+    async def startup_event():
+        await supervisor.start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await supervisor.stop()
+
+    @app.get("/health")
+    async def health_check():
+        """Aggregated worker health"""
+        return await supervisor.health()
+
+    @app.get("/status")
+    async def get_status():
+        """Supervisor view plus every worker's status"""
+        return await supervisor.status()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def get_metrics():
+        """Prometheus metrics of all workers, labelled by worker"""
+        return PlainTextResponse(await supervisor.metrics(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/fields")
+    async def list_fields():
+        """Fields with readings in any worker's in-memory window"""
+        return await supervisor.fields()
+
+    @app.get("/admission")
+    async def get_admission():
+        """Every worker's admission mode"""
+        return await supervisor.admission()
+
+    @app.put("/admission")
+    async def set_admission_mode(request: Request):
+        """Pin or release the admission mode on all workers"""
+        return await supervisor.put_all(request.url.path, dict(request.query_params))
+
+    @app.put("/admission/fields/{field_id}")
+    async def set_field_priority(field_id: str, request: Request):
+        """Set a field's shedding priority on all workers"""
+        return await supervisor.put_all(request.url.path, dict(request.query_params))
+
+    @app.put("/verification")
+    async def set_verification_threshold(request: Request):
+        """Change the verification threshold on all workers"""
+        return await supervisor.put_all(request.url.path, dict(request.query_params))
+
+    @app.put("/backoff")
+    async def set_backoff_base_delay(request: Request):
+        """Change the reconnect backoff base delay on all workers"""
+        return await supervisor.put_all(request.url.path, dict(request.query_params))
+
+    @app.get("/stream")
+    async def stream_readings(request: Request, field_id: Optional[str] = None):
+        """Server-Sent Events feed merged from the workers holding the requested fields"""
+        workers = supervisor.open_stream(parse_filter(field_id))
+        batches = supervisor.stream(workers, dict(request.query_params))
+
+        async def events():
+            yield b'retry: 3000\n\n'
+            async for messages in batches:
+                yield sse_event(messages) if messages else b': keepalive\n\n'
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.websocket("/ws")
+    async def stream_readings_ws(websocket: WebSocket, field_id: Optional[str] = None):
+        """WebSocket feed merged from the workers' SSE feeds; each frame is a JSON array of readings"""
+        try:
+            workers = supervisor.open_stream(parse_filter(field_id))
+        except HTTPException as e:
+            await websocket.close(code=1013 if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE else 1008,
+                                  reason=e.detail)
+            return
+        batches = supervisor.stream(workers, dict(websocket.query_params))
+        await websocket.accept()
+
+        async def forward():
+            async for messages in batches:
+                if messages:
+                    await websocket.send_text(json_array(messages))
+
+        sender = asyncio.create_task(forward())
+        receiver = asyncio.create_task(websocket.receive())
+        try:
+            while not sender.done():
+                await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver.done():
+                    if receiver.result()["type"] == "websocket.disconnect":
+                        break
+                    receiver = asyncio.create_task(websocket.receive())
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            pass
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+            await batches.aclose()
+
+    @app.get("/fields/{field_id}/{rest:path}")
+    async def field_query(field_id: str, rest: str, request: Request):
+        """Per-field queries, answered by the owning worker"""
+        return await supervisor.field_query(field_id, request.url.path, dict(request.query_params))
+
+    return app
+
+
+def serve(app: FastAPI, host: str, port: int, on_exit: Callable[[], None]):
+    """``uvicorn.run`` that calls ``on_exit`` as soon as a shutdown signal arrives.
+
+    Uvicorn waits for in-flight responses before running the app's shutdown
+    handlers, so endless responses (live streams) have to be ended first.
+    """
+    class Server(uvicorn.Server):
+        def handle_exit(self, sig, frame):
+            on_exit()
+            super().handle_exit(sig, frame)
+
+    Server(uvicorn.Config(app, host=host, port=port)).run()
+
+
+def run_supervisor(processes: int, backoff, host: str = '0.0.0.0', port: int = 8080):
+    """Serve the supervisor API on the public port and run ``processes`` workers"""
+    base_port = os.getenv('ORACLE_WORKER_BASE_PORT')
+    supervisor = OracleSupervisor(processes, backoff, worker_base_port=int(base_port) if base_port else None)
+    serve(create_app(supervisor), host, port, supervisor.close_streams)
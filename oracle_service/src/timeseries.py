@@ -0,0 +1,227 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - In-Memory Time-Series Window                 ║
+║  "Recent truth, answered from memory"                              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .codec import SensorReading
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) buffer backed by two float64 arrays"""
+
+    __slots__ = ('capacity', '_timestamps', '_values', '_head', '_count', 'updated_at')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.updated_at = 0.0  # monotonic time of the last append, for expiry
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._head = 0  # next slot to write
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        head = self._head
+        self._timestamps[head] = timestamp
+        self._values[head] = value
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self._count:
+            return None
+        last = self._head - 1
+        return float(self._timestamps[last]), float(self._values[last])
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples with timestamp >= since, in arrival order"""
+        if self._count < self.capacity:
+            timestamps = self._timestamps[:self._count]
+            values = self._values[:self._count]
+        else:
+            timestamps = np.roll(self._timestamps, -self._head)
+            values = np.roll(self._values, -self._head)
+        mask = timestamps >= since
+        return timestamps[mask], values[mask]
+
+
+class TimeSeriesStore:
+    """Ring buffer per (field_id, sensor_id, metric) holding the recent window.
+
+    ``capacity`` bounds the samples kept per series, ``retention`` (seconds)
+    bounds how far back queries may look, and ``max_series`` bounds how many
+    series are tracked at all; readings for series beyond it are counted and
+    ignored rather than growing memory. A series that has received nothing
+    for ``retention`` seconds holds nothing a query can return, so it is
+    expired (checked every ``sweep_interval`` seconds, and at most once a
+    second while the store is full) and its slot freed. ``max_points``
+    bounds the buckets a downsampled query may return, however small the
+    requested step.
+    """
+
+    def __init__(self, capacity: int = 1200, retention: float = 600.0, max_series: int = 10000,
+                 max_points: int = 1000, sweep_interval: float = 60.0):
+        self.capacity = capacity
+        self.retention = retention
+        self.max_series = max_series
+        self.max_points = max_points
+        self.sweep_interval = sweep_interval
+        self._fields: Dict[str, Dict[str, Dict[str, RingBuffer]]] = {}
+        self._last_sweep = time.monotonic()
+        self.series_count = 0
+        self.series_rejected = 0
+        self.series_expired = 0
+        self.samples_added = 0
+
+    def add(self, reading: SensorReading, now: Optional[float] = None):
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.expire(now)
+        sensors = self._fields.get(reading.field_id)
+        metrics = sensors.get(reading.sensor_id) if sensors is not None else None
+        timestamp = reading.timestamp
+        for metric, value in reading.fields.items():
+            buffer = metrics.get(metric) if metrics is not None else None
+            if buffer is None:
+                # Nothing is allocated for a series (nor its sensor or field) unless it fits
+                if self.series_count >= self.max_series and now - self._last_sweep >= 1.0:
+                    self.expire(now)
+                if self.series_count >= self.max_series:
+                    self.series_rejected += 1
+                    continue
+                if metrics is None:
+                    if sensors is None:
+                        sensors = self._fields[reading.field_id] = {}
+                    metrics = sensors[reading.sensor_id] = {}
+                buffer = metrics[metric] = RingBuffer(self.capacity)
+                self.series_count += 1
+            buffer.append(timestamp, value)
+            buffer.updated_at = now
+            self.samples_added += 1
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop series that have received nothing for ``retention`` seconds; returns how many"""
+        if now is None:
+            now = time.monotonic()
+        self._last_sweep = now
+        cutoff = now - self.retention
+        expired = 0
+        for field_id, sensors in list(self._fields.items()):
+            for sensor_id, metrics in list(sensors.items()):
+                for metric, buffer in list(metrics.items()):
+                    if buffer.updated_at < cutoff:
+                        del metrics[metric]
+                        expired += 1
+                if not metrics:
+                    del sensors[sensor_id]
+            if not sensors:
+                del self._fields[field_id]
+        self.series_count -= expired
+        self.series_expired += expired
+        return expired
+
+    def field_ids(self) -> List[str]:
+        return list(self._fields)
+
+    def sensors(self, field_id: str) -> Optional[Dict[str, Dict[str, RingBuffer]]]:
+        return self._fields.get(field_id)
+
+    def get(self, field_id: str, sensor_id: str, metric: str) -> Optional[RingBuffer]:
+        return self._fields.get(field_id, {}).get(sensor_id, {}).get(metric)
+
+    def latest(self, field_id: str) -> Optional[Dict[str, Dict[str, Dict[str, float]]]]:
+        """Latest value of every metric of every sensor in a field"""
+        sensors = self._fields.get(field_id)
+        if sensors is None:
+            return None
+        result = {}
+        for sensor_id, metrics in sensors.items():
+            result[sensor_id] = {}
+            for metric, buffer in metrics.items():
+                latest = buffer.latest()
+                if latest is not None:
+                    result[sensor_id][metric] = {'timestamp': latest[0], 'value': latest[1]}
+        return result
+
+    def _window(self, buffer: RingBuffer, window: float) -> Tuple[np.ndarray, np.ndarray]:
+        window = min(window, self.retention)
+        return buffer.window(time.time() - window)
+
+    def window_stats(self, buffer: RingBuffer, window: float, percentiles: Sequence[float]) -> Dict:
+        """min/max/mean/percentiles of one series over the last ``window`` seconds"""
+        _, values = self._window(buffer, window)
+        if not len(values):
+            return {'count': 0}
+        stats = {
+            'count': int(len(values)),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+        }
+        if percentiles:
+            for p, value in zip(percentiles, np.percentile(values, percentiles)):
+                stats[f"p{p:g}"] = float(value)
+        return stats
+
+    def min_step(self, window: float) -> float:
+        """Smallest step ``downsample`` uses over ``window``, so it returns at most ``max_points`` buckets"""
+        return min(window, self.retention) / self.max_points
+
+    def downsample(self, buffer: RingBuffer, window: float, step: float) -> List[Dict]:
+        """Per-``step`` mean/min/max/count buckets over the last ``window`` seconds.
+
+        ``step`` is raised to ``min_step(window)``.
+        """
+        step = max(step, self.min_step(window))
+        timestamps, values = self._window(buffer, window)
+        if not len(values):
+            return []
+        origin = np.floor(timestamps.min() / step) * step
+        buckets = ((timestamps - origin) // step).astype(np.int64)
+        # Samples stamped in the future (sensor clock skew) would stretch the buckets past the window
+        in_window = buckets <= self.max_points
+        if not in_window.all():
+            buckets, values = buckets[in_window], values[in_window]
+        size = int(buckets.max()) + 1
+        counts = np.bincount(buckets, minlength=size)
+        sums = np.bincount(buckets, weights=values, minlength=size)
+        minimums = np.full(size, np.inf)
+        maximums = np.full(size, -np.inf)
+        np.minimum.at(minimums, buckets, values)
+        np.maximum.at(maximums, buckets, values)
+        return [
+            {
+                'timestamp': float(origin + i * step),
+                'mean': float(sums[i] / counts[i]),
+                'min': float(minimums[i]),
+                'max': float(maximums[i]),
+                'count': int(counts[i]),
+            }
+            for i in np.flatnonzero(counts)
+        ]
+
+    def stats(self) -> Dict:
+        """Snapshot of store size"""
+        return {
+            "fields": len(self._fields),
+            "series": self.series_count,
+            "max_series": self.max_series,
+            "series_rejected": self.series_rejected,
+            "series_expired": self.series_expired,
+            "samples_added": self.samples_added,
+            "capacity_per_series": self.capacity,
+            "retention_s": self.retention,
+        }
@@ -0,0 +1,229 @@
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Signature Verification Engine                ║
+║  "Don't trust words—trust signatures"                              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Each sensor signs the canonical JSON encoding of its reading, i.e.
+``{"data": ..., "sensor_id": ..., "timestamp": ...}`` with sorted keys and
+compact ``(",", ":")`` separators, and sends the base64 signature in the
+``signature`` field. Binary frames (see ``frames``) instead carry a raw
+signature over the frame bytes, which are verified as they arrived. Keys are
+registered per ``sensor_id`` in a JSON keyring:
+
+    {
+      "soil-007": {"alg": "ed25519", "key": "<base64 raw public key>"},
+      "gw-12":    {"alg": "hmac-sha256", "key": "<base64 shared secret>"}
+    }
+"""
+
+import asyncio
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+from .codec import SensorReading
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ALGORITHMS = ('ed25519', 'hmac-sha256')
+
+# (alg, key_b64, timestamp, sensor_id, data, signature_b64) for JSON readings,
+# (alg, key_b64, None, sensor_id, frame, signature) for binary frames
+VerifyItem = Tuple[str, str, object, str, Union[Dict, bytes], Union[str, bytes]]
+
+
+def canonical_message(timestamp, sensor_id: str, data: Dict) -> bytes:
+    """Bytes a sensor signs for a JSON reading"""
+    return json.dumps(
+        {'data': data, 'sensor_id': sensor_id, 'timestamp': timestamp},
+        sort_keys=True, separators=(',', ':')
+    ).encode()
+
+
+@functools.lru_cache(maxsize=4096)
+def _load_key(alg: str, key_b64: str):
+    """Parse key material once per process; LRU-cached by (alg, key)"""
+    raw = base64.b64decode(key_b64)
+    if alg == 'ed25519':
+        return Ed25519PublicKey.from_public_bytes(raw)
+    if alg == 'hmac-sha256':
+        return raw
+    raise ValueError(f"Unsupported signature algorithm: {alg}")
+
+
+def _verify_item(item: VerifyItem) -> bool:
+    alg, key_b64, timestamp, sensor_id, data, signature = item
+    try:
+        if type(data) is bytes:
+            message = data
+        else:
+            signature = base64.b64decode(signature, validate=True)
+            message = canonical_message(timestamp, sensor_id, data)
+        key = _load_key(alg, key_b64)
+        if alg == 'ed25519':
+            key.verify(signature, message)
+            return True
+        return hmac.compare_digest(hmac.new(key, message, hashlib.sha256).digest(), signature)
+    except (InvalidSignature, binascii.Error, TypeError, ValueError):
+        return False
+
+
+def verify_items(items: List[VerifyItem]) -> List[bool]:
+    """Verify a chunk of readings; runs inside the worker pool"""
+    return [_verify_item(item) for item in items]
+
+
+def load_keyring(path: str) -> Dict[str, Dict]:
+    """Load and validate a sensor keyring file"""
+    with open(path) as f:
+        keyring = json.load(f)
+    for sensor_id, spec in keyring.items():
+        if spec.get('alg') not in SUPPORTED_ALGORITHMS or not spec.get('key'):
+            raise ValueError(f"Invalid keyring entry for sensor {sensor_id}")
+    return keyring
+
+
+class SignatureVerifier:
+    """Verifies batches of sensor readings in a worker pool.
+
+    Readings arrive already structurally validated by the payload codec. With
+    no keyring configured every such reading is accepted (the Oracle's
+    historical behaviour) and a warning is logged at startup.
+    """
+
+    def __init__(self, keyring: Optional[Dict[str, Dict]] = None, pool: str = 'process',
+                 workers: Optional[int] = None, chunk_size: int = 64):
+        self.keyring = keyring
+        self.pool_kind = pool
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[Executor] = None
+
+        # Metrics
+        self.verified = 0
+        self.rejected: Dict[str, int] = {'unknown_sensor': 0, 'bad_signature': 0}
+        self.batches = 0
+        self.last_batch_latency_ms = 0.0
+        self.max_batch_latency_ms = 0.0
+        self._latency_total_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'SignatureVerifier':
+        keyring_path = os.getenv('ORACLE_SENSOR_KEYS')
+        keyring = load_keyring(keyring_path) if keyring_path else None
+        workers = os.getenv('ORACLE_VERIFY_WORKERS')
+        return cls(
+            keyring=keyring,
+            pool=os.getenv('ORACLE_VERIFY_POOL', 'process'),
+            workers=int(workers) if workers else None,
+            chunk_size=int(os.getenv('ORACLE_VERIFY_CHUNK_SIZE', '64'))
+        )
+
+    def start(self):
+        """Create the worker pool; call before MQTT threads are running"""
+        if self.keyring is None:
+            logger.warning("ORACLE_SENSOR_KEYS not set - signatures are NOT verified, structure only")
+            return
+        logger.info(f"Loaded signing keys for {len(self.keyring)} sensors")
+        if self._executor is None:
+            if self.pool_kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix='heady-verify')
+
+    async def close(self):
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, True)
+            self._executor = None
+
+    async def verify_batch(self, readings: List[SensorReading]) -> List[bool]:
+        """Return one verdict per reading, in order"""
+        if not readings:
+            return []
+        if self.keyring is None:
+            self.verified += len(readings)
+            return [True] * len(readings)
+        start = time.perf_counter()
+        verdicts = [False] * len(readings)
+        items: List[VerifyItem] = []
+        positions: List[List[int]] = []
+        frames: Dict[int, int] = {}  # id(frame) -> item index; readings of one frame share a signature
+
+        for i, reading in enumerate(readings):
+            spec = self.keyring.get(reading.sensor_id)
+            if spec is None:
+                self.rejected['unknown_sensor'] += 1
+                continue
+            frame = reading.frame
+            if frame is not None:
+                item_index = frames.get(id(frame))
+                if item_index is not None:
+                    positions[item_index].append(i)
+                    continue
+                frames[id(frame)] = len(items)
+                items.append((spec['alg'], spec['key'], None, reading.sensor_id,
+                              frame[:len(frame) - len(reading.signature)], reading.signature))
+            else:
+                items.append((spec['alg'], spec['key'], reading.timestamp, reading.sensor_id,
+                              reading.data, reading.signature))
+            positions.append([i])
+
+        if items:
+            loop = asyncio.get_running_loop()
+            chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._executor, verify_items, chunk) for chunk in chunks)
+            )
+            flat = [ok for chunk_result in results for ok in chunk_result]
+            for owners, ok in zip(positions, flat):
+                for position in owners:
+                    verdicts[position] = ok
+                if not ok:
+                    self.rejected['bad_signature'] += len(owners)
+
+        self.verified += sum(verdicts)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        self.batches += 1
+        self.last_batch_latency_ms = latency_ms
+        self.max_batch_latency_ms = max(self.max_batch_latency_ms, latency_ms)
+        self._latency_total_ms += latency_ms
+        return verdicts
+
+    def stats(self) -> Dict:
+        """Snapshot of verification counters"""
+        batches = self.batches
+        stats = {
+            "mode": "signature" if self.keyring is not None else "structure_only",
+            "pool": self.pool_kind,
+            "workers": self.workers,
+            "known_sensors": len(self.keyring) if self.keyring is not None else 0,
+            "verified": self.verified,
+            "rejected": dict(self.rejected),
+            "batches": batches,
+            "batch_latency_ms_last": round(self.last_batch_latency_ms, 3),
+            "batch_latency_ms_max": round(self.max_batch_latency_ms, 3),
+            "batch_latency_ms_avg": round(self._latency_total_ms / batches, 3) if batches else 0.0,
+        }
+        if self.pool_kind != 'process':
+            # Process workers keep their own caches; only a thread pool shares ours
+            stats["key_cache"] = _load_key.cache_info()._asdict()
+        return stats
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The service runs as ``python -m src.oracle_server`` from oracle_service/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from src.admission import SAMPLE, SKIP_ANALYSIS, STORE_ONLY, AdmissionController, parse_priorities
+
+
+def controller(load, **kwargs):
+    return AdmissionController(queue_fill=lambda: load['queue'], loop_lag=lambda: 0.0,
+                               write_latency=lambda: 0.0, queue_limit=0.5, step_interval=1.0,
+                               cooldown=10.0, **kwargs)
+
+
+def test_parse_priorities():
+    assert parse_priorities('north-40:high, south:12:low,') == {'north-40': 'high', 'south:12': 'low'}
+    with pytest.raises(ValueError):
+        parse_priorities('north-40:urgent')
+
+
+def test_steps_up_under_pressure_at_most_once_per_interval():
+    t = time.monotonic() + 2.0  # past the first step_interval
+    load = {'queue': 0.9}
+    admission = controller(load)
+    assert admission.evaluate(now=t) == 'skip_analysis'
+    assert admission.evaluate(now=t + 0.5) == 'skip_analysis'
+    assert admission.evaluate(now=t + 1) == 'store_only'
+    assert admission.evaluate(now=t + 2) == 'sample'
+    assert admission.evaluate(now=t + 3) == 'sample'
+    assert admission.escalations == 3
+    assert admission.stats()['signals']['queue_fill'] == {'value': 0.9, 'limit': 0.5}
+
+
+def test_steps_down_after_a_calm_cooldown():
+    t = time.monotonic() + 2.0  # past the first step_interval
+    load = {'queue': 0.9}
+    admission = controller(load)
+    admission.evaluate(now=t)
+    admission.evaluate(now=t + 1)
+    load['queue'] = 0.1
+    assert admission.evaluate(now=t + 2) == 'store_only'
+    assert admission.evaluate(now=t + 11) == 'store_only'
+    assert admission.evaluate(now=t + 12) == 'skip_analysis'
+    load['queue'] = 0.4  # between relax_below and the limit: hold, and restart the cooldown
+    assert admission.evaluate(now=t + 30) == 'skip_analysis'
+    load['queue'] = 0.1
+    assert admission.evaluate(now=t + 31) == 'skip_analysis'
+    assert admission.evaluate(now=t + 41) == 'normal'
+    assert admission.relaxations == 2
+
+
+def test_priorities_shift_the_mode_per_field():
+    admission = controller({'queue': 0.0}, priorities={'vip': 'high', 'bulk': 'low'})
+    admission.pin('skip_analysis')
+    assert admission.level_for('vip') == SKIP_ANALYSIS - 1
+    assert admission.level_for('bulk') == STORE_ONLY
+    admission.pin('sample')
+    assert admission.level_for('vip') == STORE_ONLY
+    assert admission.level_for('other') == SAMPLE
+
+
+def test_sampling_sheds_all_but_every_nth_message():
+    admission = controller({'queue': 0.0}, sample_every=3, priorities={'vip': 'high'})
+    admission.pin('sample')
+    assert [admission.admit('f') for _ in range(6)] == [True, False, False, True, False, False]
+    assert all(admission.admit('vip') for _ in range(6))
+    assert admission.shed == 4
+
+
+def test_pinned_mode_ignores_the_signals():
+    t = time.monotonic() + 2.0  # past the first step_interval
+    load = {'queue': 0.9}
+    admission = controller(load)
+    admission.pin('normal')
+    assert admission.evaluate(now=t) == 'normal'
+    assert admission.pressure == pytest.approx(1.8)
+    admission.pin('auto')
+    assert admission.evaluate(now=t) == 'skip_analysis'
+    with pytest.raises(ValueError):
+        admission.pin('panic')
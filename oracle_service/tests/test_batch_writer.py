@@ -0,0 +1,122 @@
+import asyncio
+
+from src.batch_writer import InfluxBatchWriter, is_rejected_write
+from src.spool import WriteAheadSpool
+
+
+class WriteError(Exception):
+    def __init__(self, status=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_is_rejected_write():
+    assert is_rejected_write(WriteError(400))
+    assert is_rejected_write(WriteError(422))
+    assert not is_rejected_write(WriteError(429))
+    assert not is_rejected_write(WriteError(503))
+    assert not is_rejected_write(ConnectionError())
+
+
+def test_flushes_in_batches_per_bucket():
+    writes = []
+
+    async def scenario():
+        writer = InfluxBatchWriter(lambda bucket, records: writes.append((bucket, list(records))), 'raw',
+                                   batch_size=2)
+        await writer.write_many(['a', 'b', 'c'])
+        await writer.write('r', bucket='rollup')
+        await writer.close()
+        return writer
+
+    writer = run(scenario())
+    assert sorted(writes) == [('raw', ['a', 'b']), ('raw', ['c']), ('rollup', ['r'])]
+    assert writer.records_written == 4 and writer.buffered() == 0
+
+
+def test_backpressure_waits_for_the_flush():
+    async def scenario():
+        writer = InfluxBatchWriter(lambda bucket, records: None, 'raw', batch_size=2, max_buffered=2,
+                                   flush_interval=60)
+        writer.start()
+        await writer.write_many(['a', 'b'])
+        await asyncio.wait_for(writer.write('c'), 1.0)
+        await writer.close()
+        return writer
+
+    writer = run(scenario())
+    assert writer.backpressure_waits >= 1
+    assert writer.records_written == 3
+
+
+def test_without_spool_records_are_held_while_the_vault_is_down():
+    async def scenario():
+        writer = InfluxBatchWriter(lambda bucket, records: None, 'raw')
+        writer.mark_vault_unavailable()
+        await writer.write_many(['a', 'b'])
+        await writer.flush()
+        held = writer.buffered()
+        writer.mark_vault_available()
+        await writer.close()
+        return writer, held
+
+    writer, held = run(scenario())
+    assert held == 2
+    assert writer.records_written == 2
+
+
+def test_rejected_batch_is_dropped_not_spooled(tmp_path):
+    spool = WriteAheadSpool(str(tmp_path), fsync='never')
+    spool.open()
+
+    def write(bucket, records):
+        raise WriteError(400)
+
+    async def scenario():
+        writer = InfluxBatchWriter(write, 'raw', spool=spool)
+        await writer.write_many(['m v="x" 1'])
+        await writer.close()
+        return writer
+
+    writer = run(scenario())
+    assert writer.records_rejected == 1
+    assert writer.records_spooled == 0
+    assert writer.vault_available
+    assert spool.is_empty()
+
+
+def test_unreachable_vault_spools_until_it_recovers(tmp_path):
+    spool = WriteAheadSpool(str(tmp_path), fsync='never')
+    spool.open()
+    calls = []
+
+    def write(bucket, records):
+        calls.append(records)
+        raise ConnectionError("vault down")
+
+    async def scenario():
+        writer = InfluxBatchWriter(write, 'raw', spool=spool)
+        await writer.write_many(['m v=1 1'])
+        await writer.flush()
+        await writer.write_many(['m v=2 2'])
+        await writer.close()
+        return writer
+
+    writer = run(scenario())
+    assert len(calls) == 1  # later batches go straight to the spool
+    assert writer.records_spooled == 2
+    assert not writer.vault_available
+
+
+def test_write_latency_decays_when_idle():
+    async def scenario():
+        writer = InfluxBatchWriter(lambda bucket, records: None, 'raw', latency_half_life=0.05)
+        writer._latency_average = 2.0  # as if recent writes took 2s
+        await asyncio.sleep(0.25)
+        return writer.write_latency()
+
+    assert run(scenario()) < 0.1
@@ -0,0 +1,79 @@
+import asyncio
+
+from src.brain_client import HeadyBrainClient
+from src.codec import SensorReading
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def reading(field_id, i):
+    return SensorReading(field_id, f"s-{i}", 1760000000.0 + i, 'sig', {'v': i}, {'v': i})
+
+
+def slow_client(delay, **kwargs):
+    client = HeadyBrainClient('http://brain.invalid/analyze', 0.9, **kwargs)
+    sizes = []
+
+    async def post(body):
+        sizes.append(len(body['readings']))
+        await asyncio.sleep(delay)
+        return FakeResponse({'results': [{'ok': True}] * len(body['readings'])})
+
+    client._post = post
+    return client, sizes
+
+
+def test_results_map_back_to_readings():
+    async def scenario():
+        client, sizes = slow_client(0.0, batch_window=0.01)
+        results = await asyncio.gather(*(client.analyze(reading('f1', i)) for i in range(5)))
+        await client.close()
+        return results, sizes
+
+    results, sizes = asyncio.run(scenario())
+    assert results == [{'ok': True}] * 5
+    assert sizes == [5]
+
+
+def test_batches_keep_filling_while_every_slot_is_busy():
+    readings, max_batch = 400, 20
+
+    async def scenario():
+        client, sizes = slow_client(0.05, batch_window=0.001, max_batch=max_batch, max_in_flight=2)
+        tasks = []
+        for i in range(readings):
+            tasks.append(asyncio.create_task(client.analyze(reading(f"f{i % 4}", i))))
+            await asyncio.sleep(0.0005)
+        results = await asyncio.gather(*tasks)
+        await client.close()
+        return client, sizes, results
+
+    client, sizes, results = asyncio.run(scenario())
+    assert all(r == {'ok': True} for r in results)
+    assert sum(sizes) == readings
+    assert max(sizes) <= max_batch
+    # A saturated HeadyBrain sees about readings / max_batch requests, not one per window
+    assert client.requests_sent <= readings / max_batch * 1.5 + 8
+
+
+def test_failures_resolve_to_none():
+    async def scenario():
+        client = HeadyBrainClient('http://brain.invalid/analyze', 0.9, batch_window=0.001)
+
+        async def post(body):
+            raise RuntimeError("brain down")
+
+        client._post = post
+        result = await client.analyze(reading('f1', 1))
+        await client.close()
+        return client, result
+
+    client, result = asyncio.run(scenario())
+    assert result is None
+    assert client.requests_failed == 1
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from src.codec import PayloadDecoder, PayloadError, SensorReading
+
+BACKENDS = PayloadDecoder.available()
+
+
+def payload(**overrides):
+    body = {'timestamp': 1760000000.5, 'sensor_id': 's-1', 'signature': 'sig', 'data': {'v': 1.5}}
+    body.update(overrides)
+    return json.dumps(body).encode()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decodes_a_valid_payload(backend):
+    reading = PayloadDecoder(backend).decode('f-1', payload(data={'v': 1.5, 'ok': True, 'note': 'x'}))
+    assert (reading.field_id, reading.sensor_id, reading.timestamp) == ('f-1', 's-1', 1760000000.5)
+    assert reading.fields == {'v': 1.5, 'ok': True}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('raw', [
+    b'not json',
+    b'[]',
+    json.dumps({'sensor_id': 's', 'signature': 'x', 'data': {}}).encode(),
+    payload(timestamp='1760000000'),
+    payload(data=[1, 2]),
+])
+def test_rejects_malformed_payloads(backend, raw):
+    with pytest.raises(PayloadError):
+        PayloadDecoder(backend).decode('f-1', raw)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('timestamp', [1e300, -1.0, 1760000000000, 1760000000000.0])
+def test_rejects_timestamps_outside_the_epoch_window(backend, timestamp):
+    with pytest.raises(PayloadError):
+        PayloadDecoder(backend).decode('f-1', payload(timestamp=timestamp))
+
+
+def test_rejects_nan_timestamps():
+    raw = b'{"timestamp": NaN, "sensor_id": "s", "signature": "x", "data": {}}'
+    with pytest.raises(PayloadError):
+        PayloadDecoder('json').decode('f-1', raw)
+
+
+def test_drops_unstorable_fields():
+    reading = PayloadDecoder('json').decode('f-1', payload(data={'a': 1, 'big': 2 ** 70, 'n': None}))
+    assert reading.fields == {'a': 1}
+
+
+def test_one_unencodable_reading_does_not_drop_the_batch():
+    from src import oracle_server
+
+    oracle = oracle_server.HeadyOracle()
+    oracle.streaming = None
+    written = []
+
+    async def write_many(records, bucket=None):
+        written.extend(records)
+
+    oracle.writer.write_many = write_many
+    good = SensorReading('f-1', 's-1', 1760000000.0, 'sig', {'v': 1.0}, {'v': 1.0})
+    # Constructed directly: the decoder no longer lets such a timestamp through
+    bad = SensorReading('f-1', 's-2', 1e300, 'sig', {'v': 1.0}, {'v': 1.0})
+    asyncio.run(oracle._store_readings([bad, good]))
+    assert len(written) == 1 and 's-1' in written[0]
+    assert oracle.readings_unencodable == 1
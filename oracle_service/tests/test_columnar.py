@@ -0,0 +1,37 @@
+import asyncio
+import os
+
+import pytest
+
+from src.codec import SensorReading
+from src.columnar import partition_directory
+
+
+def test_partition_directory_escapes_field_id():
+    path = partition_directory('/archive', '2026-10-18', 'north/40 east')
+    assert path == os.path.join('/archive', 'date=2026-10-18', 'field_id=north%2F40%20east')
+
+
+def test_frame_split_across_files_keeps_its_payload_in_each(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.dataset as ds
+    from src.columnar import ColumnarTee
+
+    frame = b'HF' + b'\x00' * 30
+    readings = [SensorReading(field_id='north/40', sensor_id=f's{i}', timestamp=1792300000.0 + i,
+                              signature=b'', data={}, fields={'moisture': 0.3}, frame=frame)
+                for i in range(4)]
+    tee = ColumnarTee(str(tmp_path), rotate_seconds=0.0)
+    now = 1792300000.0
+    tee._ingest(readings[:2], now, True)  # closes the first file
+    tee._ingest(readings[2:], now + 1, True)
+    asyncio.run(tee.close())
+
+    partitioning = ds.HivePartitioning(pa.schema([('date', pa.string()), ('field_id', pa.string())]))
+    dataset = ds.dataset(str(tmp_path), format='parquet', partitioning=partitioning)
+    assert tee.files_written == 2
+    for fragment in dataset.get_fragments():
+        payloads = fragment.to_table(columns=['payload']).column('payload').to_pylist()
+        assert payloads[0] == frame
+        assert payloads[1:] == [None] * (len(payloads) - 1)
+    assert set(dataset.to_table(columns=['field_id']).column('field_id').to_pylist()) == {'north/40'}
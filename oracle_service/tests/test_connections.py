@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+from src.connections import DOWN, UP, ManagedLink
+
+
+class NoBackoff:
+    def delay(self, attempt, previous):
+        return 0.001
+
+
+def test_retries_until_connected():
+    attempts = []
+    ups = []
+
+    async def connect():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("refused")
+
+    async def scenario():
+        link = ManagedLink('broker', connect, NoBackoff(), on_up=lambda: ups.append(1))
+        assert link.state == DOWN
+        link.start()
+        assert await link.wait_up(1.0)
+        await link.stop()
+        return link
+
+    link = asyncio.run(scenario())
+    assert len(attempts) == 3
+    assert ups == [1]
+    assert link.is_up
+    assert link.failed_attempts == 2
+    assert link.attempt == 0
+    assert link.last_error == "refused"
+
+
+def test_wait_up_times_out_while_down():
+    async def connect():
+        raise ConnectionError("refused")
+
+    async def scenario():
+        link = ManagedLink('vault', connect, NoBackoff())
+        link.start()
+        up = await link.wait_up(0.05)
+        await link.stop()
+        return up, link
+
+    up, link = asyncio.run(scenario())
+    assert up is False
+    assert link.state != UP
+    assert link.failed_attempts >= 1
+
+
+def test_failed_probe_reconnects():
+    connects = []
+    downs = []
+    probes = iter([False])
+
+    async def connect():
+        connects.append(1)
+
+    async def probe():
+        return next(probes, True)
+
+    async def scenario():
+        link = ManagedLink('vault', connect, NoBackoff(), probe=probe, probe_interval=0.01,
+                           on_down=lambda: downs.append(1))
+        link.start()
+        while link.connects < 2:
+            await asyncio.sleep(0.005)
+        await link.stop()
+        return link
+
+    link = asyncio.run(asyncio.wait_for(scenario(), 2.0))
+    assert len(connects) == 2
+    assert downs == [1]
+    assert link.disconnects == 1
+    assert [t['to'] for t in link.stats()['transitions']] == ['connecting', 'up', 'down', 'connecting', 'up']
+
+
+def test_mark_down_from_another_thread():
+    async def connect():
+        pass
+
+    async def scenario():
+        link = ManagedLink('broker', connect, NoBackoff(), probe_interval=60.0)
+        link.start()
+        await link.wait_up(1.0)
+        thread = threading.Thread(target=link.mark_down_threadsafe, args=("connection lost",))
+        thread.start()
+        thread.join()
+        while link.connects < 2:
+            await asyncio.sleep(0.005)
+        await link.stop()
+        return link
+
+    link = asyncio.run(asyncio.wait_for(scenario(), 2.0))
+    assert link.disconnects == 1
+    assert link.last_error == "connection lost"
+    assert link.is_up
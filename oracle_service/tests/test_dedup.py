@@ -0,0 +1,74 @@
+from src.codec import SensorReading
+from src.dedup import DedupIndex, ReorderBuffer
+
+
+def reading(timestamp, sensor_id='s1', field_id='f1'):
+    return SensorReading(field_id, sensor_id, timestamp, '', {}, {'v': 1.0})
+
+
+def test_redelivery_within_the_window_is_a_duplicate():
+    index = DedupIndex(window=60, bucket_seconds=5)
+    first, second = reading(1000.0), reading(1000.0)
+    unique, duplicates = index.filter([first], now=1001.0)
+    assert unique == [first] and duplicates == []
+    unique, duplicates = index.filter([second, reading(1000.5)], now=1002.0)
+    assert duplicates == [second]
+    assert [r.timestamp for r in unique] == [1000.5]
+    assert index.duplicates == 1
+
+
+def test_duplicates_within_one_batch():
+    unique, duplicates = DedupIndex().filter([reading(10.0), reading(10.0)], now=11.0)
+    assert len(unique) == 1 and len(duplicates) == 1
+
+
+def test_key_includes_field_and_sensor():
+    readings = [reading(10.0), reading(10.0, sensor_id='s2'), reading(10.0, field_id='f2')]
+    unique, duplicates = DedupIndex().filter(readings, now=11.0)
+    assert unique == readings and duplicates == []
+
+
+def test_keys_expire_with_the_window():
+    index = DedupIndex(window=60, bucket_seconds=5)
+    index.filter([reading(1000.0)], now=1000.0)
+    # Past the window the reading is too old to check and is let through
+    unique, duplicates = index.filter([reading(1000.0)], now=1100.0)
+    assert len(unique) == 1 and duplicates == []
+    assert index.too_old == 1
+    assert index.stats()['keys'] == 0
+
+
+def test_far_future_readings_are_not_indexed():
+    index = DedupIndex(window=60, bucket_seconds=5)
+    ahead = [reading(1000.0 + 3600 + i) for i in range(100)]
+    unique, duplicates = index.filter(ahead + [reading(1010.0)], now=1001.0)
+    assert len(unique) == 101 and duplicates == []
+    assert index.too_new == 100
+    assert index.stats()['buckets'] == 1
+
+
+def test_max_keys_evicts_oldest_buckets():
+    index = DedupIndex(window=1000, bucket_seconds=1, max_keys=10)
+    index.filter([reading(float(t)) for t in range(20)], now=20.0)
+    index.filter([], now=20.0)
+    assert index.stats()['keys'] <= 10
+    assert index.evicted_keys >= 10
+
+
+def test_reorder_buffer_releases_in_timestamp_order():
+    buffer = ReorderBuffer(delay=1.0)
+    assert buffer.push([reading(10.0), reading(9.5)], now=0.0) == []
+    released = buffer.push([reading(11.2)], now=0.1)
+    assert [r.timestamp for r in released] == [9.5, 10.0]
+    assert buffer.out_of_order == 1
+    assert [r.timestamp for r in buffer.expire(now=1.2)] == [11.2]
+    assert buffer.pending() == 0
+
+
+def test_reorder_buffer_passes_late_readings_through():
+    buffer = ReorderBuffer(delay=1.0)
+    buffer.push([reading(10.0)], now=0.0)
+    buffer.expire(now=2.0)
+    late = reading(9.0)
+    assert buffer.push([late], now=2.0) == [late]
+    assert buffer.late == 1
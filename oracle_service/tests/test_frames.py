@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import math
+import struct
+
+import pytest
+
+from src.codec import PayloadError
+from src.frames import FrameDecoder, encode_frame
+
+
+def test_round_trip():
+    frame = encode_frame('sensor-1', ['temp', 'humidity'], [1700000000.5, 1700000001.5],
+                         [[21.5, 40.0], [21.75, 41.0]])
+    assert len(frame) % 8 == 0
+    readings = FrameDecoder().decode('field-1', frame)
+    assert [(r.field_id, r.sensor_id, r.timestamp) for r in readings] == [
+        ('field-1', 'sensor-1', 1700000000.5), ('field-1', 'sensor-1', 1700000001.5)]
+    assert [r.fields for r in readings] == [{'temp': 21.5, 'humidity': 40.0}, {'temp': 21.75, 'humidity': 41.0}]
+    assert all(r.frame == frame for r in readings)
+
+
+def test_round_trip_float32():
+    frame = encode_frame('s', ['v'], [1.0], [[0.1]], float32=True)
+    reading, = FrameDecoder().decode('f', frame)
+    assert reading.fields['v'] == pytest.approx(0.1, rel=1e-6)
+
+
+def test_signature_covers_the_frame():
+    key = b'k' * 32
+
+    def sign(message):
+        return hmac.new(key, message, hashlib.sha256).digest()
+
+    frame = encode_frame('s', ['v'], [1.0], [[2.0]], sign=sign, signature_length=32)
+    reading, = FrameDecoder().decode('f', frame)
+    assert reading.signature == sign(frame[:-32])
+
+
+def test_non_finite_values_are_left_out_of_fields():
+    frame = encode_frame('s', ['a', 'b'], [1.0, 2.0], [[math.nan, 1.0], [2.0, 3.0]])
+    first, second = FrameDecoder().decode('f', frame)
+    assert first.fields == {'b': 1.0}
+    assert second.fields == {'a': 2.0, 'b': 3.0}
+
+
+def test_metric_names_are_cached_per_block():
+    decoder = FrameDecoder()
+    frame = encode_frame('s', ['v'], [1.0], [[2.0]])
+    decoder.decode('f', frame)
+    decoder.decode('f', frame)
+    assert decoder.stats() == {'frames': 2, 'readings': 2}
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda frame: frame[:10],                                 # shorter than the header
+    lambda frame: b'XX' + frame[2:],                          # bad magic
+    lambda frame: frame[:-1],                                 # truncated values
+    lambda frame: frame + b'\0',                              # trailing bytes
+    lambda frame: frame[:4] + struct.pack('<H', 0) + frame[6:],  # no readings
+])
+def test_malformed_frames_are_rejected(mutate):
+    frame = encode_frame('s', ['v'], [1.0], [[2.0]])
+    with pytest.raises(PayloadError):
+        FrameDecoder().decode('f', mutate(frame))
+
+
+def test_non_finite_timestamp_is_rejected():
+    with pytest.raises(PayloadError):
+        FrameDecoder().decode('f', encode_frame('s', ['v'], [math.inf], [[1.0]]))
+
+
+def test_repeated_metric_name_is_rejected():
+    with pytest.raises(PayloadError):
+        FrameDecoder().decode('f', encode_frame('s', ['v', 'v'], [1.0], [[1.0, 2.0]]))
+
+
+@pytest.mark.parametrize('timestamp', [-1.0, 1e300, 1760000000000.0])
+def test_out_of_range_timestamp_is_rejected(timestamp):
+    with pytest.raises(PayloadError):
+        FrameDecoder().decode('f', encode_frame('s', ['v'], [1700000000.0, timestamp], [[1.0], [2.0]]))
@@ -0,0 +1,64 @@
+import pytest
+
+from src.codec import numeric_fields
+from src.line_protocol import INT64_MAX, INT64_MIN, encode_point, format_field, seconds_to_ns
+
+
+def test_encode_point_sorts_tags_and_formats_fields():
+    line = encode_point('field_sensors', {'sensor_id': 's1', 'field_id': 'f1'},
+                        {'temp': 21.5, 'count': 3, 'ok': True}, 1700000000000000000)
+    assert line == 'field_sensors,field_id=f1,sensor_id=s1 temp=21.5,count=3i,ok=true 1700000000000000000'
+
+
+def test_encode_point_escapes_special_characters():
+    line = encode_point('my measurement', {'sensor_id': 'a,b=c d'}, {'x y': 1.0}, 1)
+    assert line == 'my\\ measurement,sensor_id=a\\,b\\=c\\ d x\\ y=1.0 1'
+
+
+def test_control_characters_cannot_inject_points():
+    line = encode_point('field_sensors', {'sensor_id': 's1\nevil,host=x value=1 0'},
+                        {'temp\r\n': 1.0, 'tab\tkey': 2.0}, 5)
+    assert '\n' not in line and '\r' not in line and '\t' not in line
+    assert line == ('field_sensors,sensor_id=s1\\nevil\\,host\\=x\\ value\\=1\\ 0 '
+                    'temp\\r\\n=1.0,tab\\tkey=2.0 5')
+
+
+def test_measurement_keeps_equals_sign():
+    assert encode_point('a=b\nc', {}, {'v': 1.0}, 1) == 'a=b\\nc v=1.0 1'
+
+
+def test_empty_tag_values_are_left_out():
+    assert encode_point('m', {'field_id': 'f', 'sensor_id': ''}, {'v': 1.0}, 1) == 'm,field_id=f v=1.0 1'
+
+
+def test_ints_outside_int64_are_not_written():
+    assert format_field(INT64_MAX) == f"{INT64_MAX}i"
+    assert format_field(INT64_MIN) == f"{INT64_MIN}i"
+    assert format_field(INT64_MAX + 1) is None
+    assert format_field(INT64_MIN - 1) is None
+    assert encode_point('m', {}, {'big': 2 ** 63, 'v': 1}, 1) == 'm v=1i 1'
+    assert encode_point('m', {}, {'big': 2 ** 63}, 1) is None
+
+
+def test_no_fields_is_no_point():
+    assert encode_point('m', {'field_id': 'f'}, {}, 1) is None
+
+
+def test_numeric_fields_drops_unrepresentable_values():
+    fields = numeric_fields({'ok': 1.5, 'nan': float('nan'), 'inf': float('inf'), 'big': 2 ** 63,
+                             'text': 'x', 'flag': False, 'n': 7})
+    assert fields == {'ok': 1.5, 'flag': False, 'n': 7}
+
+
+def test_seconds_to_ns_rounds_to_microseconds():
+    assert seconds_to_ns(1.0000004) == 1000000000
+    assert seconds_to_ns(1700000000.123456) == 1700000000123456000
+
+
+def test_seconds_to_ns_rejects_unstorable_timestamps():
+    assert seconds_to_ns(1760000000.25) == 1760000000250000000
+    for timestamp in (1e300, float('nan')):
+        with pytest.raises(ValueError):
+            seconds_to_ns(timestamp)
+    with pytest.raises(OverflowError):
+        seconds_to_ns(float('inf'))
@@ -0,0 +1,100 @@
+import asyncio
+import random
+
+import pytest
+
+from src.retry import FibonacciBackoff, RetryBudget, RetryPolicy, fibonacci
+
+
+def test_fibonacci_sequence_and_plain_delay():
+    assert fibonacci(7) == (1, 1, 2, 3, 5, 8, 13)
+    backoff = FibonacciBackoff(max_retries=5, base_delay=100, jitter='none')
+    assert [backoff.get_delay(n) for n in range(7)] == [100, 100, 200, 300, 500, 500, 500]
+    assert backoff.delay(3) == 0.3
+    with pytest.raises(ValueError):
+        FibonacciBackoff(jitter='random')
+
+
+@pytest.mark.parametrize('jitter, low, high', [('full', 0.0, 0.5), ('equal', 0.25, 0.5)])
+def test_jitter_stays_within_the_fibonacci_delay(jitter, low, high):
+    backoff = FibonacciBackoff(max_retries=5, base_delay=100, jitter=jitter)
+    delays = [backoff.delay(4) for _ in range(200)]
+    assert all(low <= d <= high for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_decorrelated_jitter_is_capped():
+    random.seed(3)
+    backoff = FibonacciBackoff(max_retries=5, base_delay=100, jitter='decorrelated')
+    previous = None
+    for attempt in range(50):
+        previous = backoff.delay(attempt, previous)
+        assert 0.1 <= previous <= 0.5
+
+
+def test_budget_allows_a_fraction_of_recent_calls():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, window=10.0)
+    for _ in range(4):
+        budget.record_call(now=100.0)
+    assert [budget.try_retry(now=100.5) for _ in range(3)] == [True, True, False]
+    assert budget.try_retry(now=111.0) is False  # the calls have left the window
+    assert (budget.granted, budget.denied) == (2, 2)
+
+
+def quick_policy(**kwargs):
+    return RetryPolicy('influx', FibonacciBackoff(max_retries=3, base_delay=1, jitter='none'), **kwargs)
+
+
+def flaky(failures, error=ConnectionError):
+    calls = []
+
+    async def operation(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise error("unavailable")
+        return value * 2
+
+    return operation, calls
+
+
+def test_policy_retries_until_success():
+    policy = quick_policy(max_attempts=3)
+    operation, calls = flaky(2)
+    assert asyncio.run(policy.call(operation, 21)) == 42
+    assert len(calls) == 3
+    assert (policy.retries, policy.recovered, policy.failed) == (2, 1, 0)
+
+
+def test_policy_gives_up_after_max_attempts():
+    policy = quick_policy(max_attempts=2)
+    operation, calls = flaky(5)
+    with pytest.raises(ConnectionError):
+        asyncio.run(policy.call(operation, 1))
+    assert len(calls) == 2
+    assert policy.attempts_exhausted == 1
+
+
+def test_policy_does_not_retry_excluded_errors():
+    policy = quick_policy(retryable=lambda error: not isinstance(error, ValueError))
+    operation, calls = flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(policy.call(operation, 1))
+    assert len(calls) == 1
+    assert policy.not_retryable == 1
+
+
+def test_policy_respects_deadline_and_budget():
+    slow = RetryPolicy('brain', FibonacciBackoff(max_retries=3, base_delay=1000, jitter='none'),
+                       max_attempts=5, deadline=0.5)
+    operation, calls = flaky(5)
+    with pytest.raises(ConnectionError):
+        asyncio.run(slow.call(operation, 1))
+    assert len(calls) == 1
+    assert slow.deadline_exceeded == 1
+
+    budgeted = quick_policy(max_attempts=5, budget=RetryBudget(ratio=0.0, min_per_second=0.0))
+    operation, calls = flaky(5)
+    with pytest.raises(ConnectionError):
+        asyncio.run(budgeted.wrap(operation)(1))
+    assert len(calls) == 1
+    assert budgeted.budget_denied == 1
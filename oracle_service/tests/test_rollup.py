@@ -0,0 +1,49 @@
+import pytest
+
+from src.codec import SensorReading
+from src.rollup import RollupAggregator, check_rollup_scale_mode, parse_tiers
+
+
+def reading(timestamp, value, sensor_id='s-1'):
+    return SensorReading('f-1', sensor_id, timestamp, 'sig', {'v': value}, {'v': value})
+
+
+def test_parse_tiers():
+    assert parse_tiers('1m, 10s,1m') == [('10s', 10), ('1m', 60)]
+    for spec in ('10', '0s', '5w'):
+        with pytest.raises(ValueError):
+            parse_tiers(spec)
+
+
+def test_shared_scale_mode_is_refused():
+    check_rollup_scale_mode([], 'shared')
+    check_rollup_scale_mode([('10s', 10)], 'hash')
+    with pytest.raises(ValueError):
+        check_rollup_scale_mode([('10s', 10)], 'shared')
+
+
+def test_buckets_are_emitted_after_their_grace_period():
+    rollup = RollupAggregator([('10s', 10)], grace=5.0)
+    assert rollup.add([reading(1000.0, 1.0), reading(1004.0, 3.0), reading(1012.0, 7.0)], now=1013.0) == []
+    assert rollup.collect(now=1014.0) == []
+    records = rollup.collect(now=1016.0)
+    assert records == ['field_sensors_10s,field_id=f-1,metric=v,sensor_id=s-1 '
+                       'min=1.0,max=3.0,mean=2.0,count=2i 1000000000000']
+    assert len(rollup.collect(now=0.0, force=True)) == 1
+
+
+def test_late_readings_are_returned_for_raw_storage():
+    rollup = RollupAggregator([('10s', 10)], grace=5.0)
+    late = reading(900.0, 1.0)
+    assert rollup.add([late, reading(1000.0, 2.0)], now=1001.0) == [late]
+    assert rollup.late_readings == 1
+
+
+def test_future_readings_open_no_bucket():
+    rollup = RollupAggregator([('10s', 10), ('1m', 60)], grace=5.0)
+    ahead = reading(1000.0 + 3600, 1.0)
+    assert rollup.add([reading(1000.0, 2.0), ahead], now=1001.0) == [ahead]
+    assert rollup.future_readings == 1
+    assert [tier['open_buckets'] for tier in rollup.stats()['tiers'].values()] == [1, 1]
+    # Slight clock skew still lands in a (soon to open) bucket
+    assert rollup.add([reading(1012.0, 3.0)], now=1001.0) == []
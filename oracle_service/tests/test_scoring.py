@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+
+from src.codec import SensorReading
+from src.scoring import AnomalyScorer
+
+
+def reading(value, sensor_id='s1', field_id='f', metric='moisture', **more):
+    return SensorReading(field_id=field_id, sensor_id=sensor_id, timestamp=0, signature='', data={},
+                         fields={metric: value, **more})
+
+
+def warm_up(scorer, batches=10, **kwargs):
+    rng = random.Random(7)
+    for _ in range(batches):
+        scorer.score_batch([reading(30.0 + rng.gauss(0, 1), **kwargs) for _ in range(8)])
+
+
+def test_new_series_score_one_until_warm():
+    scorer = AnomalyScorer(0.95, min_samples=16)
+    confidences = scorer.score_batch([reading(30.0), reading(1000.0)])
+    assert list(confidences) == [1.0, 1.0]
+    assert scorer.readings_flagged == 0
+
+
+def test_outlier_is_flagged_and_normal_value_is_not():
+    scorer = AnomalyScorer(0.95)
+    warm_up(scorer)
+    confidences = scorer.score_batch([reading(30.5), reading(80.0)])
+    assert confidences[0] > 0.95
+    assert confidences[1] < 0.95
+    assert scorer.readings_flagged == 1
+    assert scorer.flagged_by_field == {'f': 1}
+
+
+def test_reading_confidence_is_its_least_plausible_metric():
+    scorer = AnomalyScorer(0.95)
+    warm_up(scorer, ph=6.5)
+    confidence, = scorer.score_batch([reading(30.0, ph=6.5)])
+    outlier, = scorer.score_batch([reading(30.0, ph=60.0)])
+    assert confidence > 0.95
+    assert outlier < 0.95
+
+
+def test_series_are_kept_apart():
+    scorer = AnomalyScorer(0.95)
+    warm_up(scorer, sensor_id='a')
+    warm_up(scorer, sensor_id='b')
+    a, b = scorer.score_batch([reading(80.0, sensor_id='a'), reading(30.0, sensor_id='b')])
+    assert a < 0.95 < b
+
+
+def test_series_limit_is_counted_and_the_rest_still_scored():
+    scorer = AnomalyScorer(0.95, max_series=1)
+    confidences = scorer.score_batch([reading(1.0, ph=2.0), reading(1.0, sensor_id='s2')])
+    assert np.all(confidences == 1.0)
+    assert scorer.stats()['series'] == 1
+    assert scorer.series_rejected == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from src.sharding import FieldRouter, rendezvous_owner
+
+
+def test_rendezvous_owner_is_stable_and_spreads_fields():
+    owners = [rendezvous_owner(f"field-{i}", 4) for i in range(400)]
+    assert owners == [rendezvous_owner(f"field-{i}", 4) for i in range(400)]
+    assert all(60 < owners.count(replica) < 140 for replica in range(4))
+
+
+def test_adding_a_replica_only_moves_fields_to_it():
+    for i in range(200):
+        before, after = rendezvous_owner(f"f{i}", 3), rendezvous_owner(f"f{i}", 4)
+        assert after in (before, 3)
+
+
+def test_hash_replicas_split_the_fields():
+    routers = [FieldRouter('hash', index, 3) for index in range(3)]
+    for i in range(50):
+        topic = f"field/f{i}/sensors"
+        assert sum(router.accept(topic) for router in routers) == 1
+
+
+def test_subscriptions():
+    assert FieldRouter('shared', 0, 2, share_group='g').subscriptions() == [
+        '$share/g/field/+/sensors', '$share/g/field/+/sensors/bin']
+    assert FieldRouter('single').subscriptions() == ['field/+/sensors', 'field/+/sensors/bin']
+    with pytest.raises(ValueError):
+        FieldRouter('hash', 2, 2)
+
+
+def test_untrusted_field_ids_cannot_grow_the_router():
+    router = FieldRouter('hash', 0, 2, max_fields=10)
+    for i in range(1000):
+        router.accept(f"field/made-up-{i}/sensors")
+    assert len(router._owned) == 10
+    stats = router.stats()
+    assert stats['owned_fields'] <= 10
+    assert stats['owned_fields'] + stats['messages_other_fields'] + stats['messages_skipped'] == 1000
+
+
+def test_ownership_cache_keeps_recently_seen_fields():
+    router = FieldRouter('hash', 0, 2, max_fields=2)
+    router.owns('a')
+    router.owns('b')
+    router.owns('a')
+    router.owns('c')
+    assert list(router._owned) == ['a', 'c']
@@ -0,0 +1,132 @@
+import asyncio
+import os
+
+import pytest
+
+from src.batch_writer import is_rejected_write
+from src.spool import SpoolReplayer, WriteAheadSpool
+
+
+class WriteError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def open_spool(directory, **kwargs) -> WriteAheadSpool:
+    spool = WriteAheadSpool(str(directory), fsync='never', **kwargs)
+    spool.open()
+    return spool
+
+
+def replay(spool, write_fn, **kwargs) -> SpoolReplayer:
+    replayer = SpoolReplayer(spool, write_fn, lambda: True, rate=1e9, **kwargs)
+    asyncio.run(replayer.replay())
+    return replayer
+
+
+def test_append_and_read_back(tmp_path):
+    spool = open_spool(tmp_path)
+    assert spool.append('raw', ['m v=1 1', 'm v=2 2'])
+    assert spool.append('rollup', ['r v=3 3'])
+    segments = spool.take_segments()
+    assert len(segments) == 1
+    assert list(WriteAheadSpool.read_segment(segments[0])) == [
+        ('raw', ['m v=1 1', 'm v=2 2']),
+        ('rollup', ['r v=3 3']),
+    ]
+
+
+def test_segments_survive_a_restart(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append('raw', ['m v=1 1'])
+    spool.close()
+
+    reopened = open_spool(tmp_path)
+    assert not reopened.is_empty()
+    reopened.append('raw', ['m v=2 2'])
+    segments = reopened.take_segments()
+    assert len(segments) == 2
+    assert [batch for path in segments for batch in WriteAheadSpool.read_segment(path)] == [
+        ('raw', ['m v=1 1']), ('raw', ['m v=2 2'])]
+
+
+def test_replay_writes_everything_and_empties_the_spool(tmp_path):
+    spool = open_spool(tmp_path, segment_bytes=64)
+    for i in range(5):
+        spool.append('raw', [f"m v={i} {i}"])
+    written = []
+    replayer = replay(spool, lambda bucket, records: written.append((bucket, records)))
+    assert written == [('raw', [f"m v={i} {i}"]) for i in range(5)]
+    assert replayer.records_replayed == 5
+    assert spool.is_empty()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.seg')]
+
+
+def test_corrupt_tail_ends_the_segment(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append('raw', ['m v=1 1'])
+    spool.append('raw', ['m v=2 2'])
+    path = spool.take_segments()[0]
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'X')
+    assert list(WriteAheadSpool.read_segment(path)) == [('raw', ['m v=1 1'])]
+
+
+def test_torn_tail_ends_the_segment(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append('raw', ['m v=1 1'])
+    spool.append('raw', ['m v=2 2'])
+    path = spool.take_segments()[0]
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert list(WriteAheadSpool.read_segment(path)) == [('raw', ['m v=1 1'])]
+
+
+def test_rejected_chunks_are_skipped_on_replay(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append('raw', ['good v=1 1'])
+    spool.append('raw', ['bad v="x" 2'])
+    spool.append('raw', ['good v=3 3'])
+    written = []
+
+    def write(bucket, records):
+        if records[0].startswith('bad'):
+            raise WriteError(400)
+        written.append(records[0])
+
+    replayer = replay(spool, write, is_rejected=is_rejected_write)
+    assert written == ['good v=1 1', 'good v=3 3']
+    assert replayer.records_rejected == 1
+    assert spool.is_empty()
+
+
+def test_other_errors_interrupt_replay_and_keep_the_segment(tmp_path):
+    spool = open_spool(tmp_path)
+    spool.append('raw', ['m v=1 1'])
+
+    def write(bucket, records):
+        raise WriteError(503)
+
+    replayer = SpoolReplayer(spool, write, lambda: True, is_rejected=is_rejected_write)
+    with pytest.raises(WriteError):
+        asyncio.run(replayer.replay())
+    assert not spool.is_empty()
+    assert replay(spool, lambda bucket, records: None).records_replayed == 1
+
+
+def test_budget_evicts_oldest_segments(tmp_path):
+    spool = open_spool(tmp_path, segment_bytes=1, max_bytes=100)
+    for i in range(10):
+        assert spool.append('raw', [f"m v={i} {i}"])
+    assert spool.segments_evicted > 0
+    assert spool.pending_bytes() <= 100
+    remaining = [records[0] for path in spool.take_segments() for _, records in spool.read_segment(path)]
+    assert remaining[-1] == 'm v=9 9'
+
+
+def test_batch_larger_than_budget_is_rejected(tmp_path):
+    spool = open_spool(tmp_path, max_bytes=16)
+    assert not spool.append('raw', ['m v=1 1' * 10])
+    assert spool.records_rejected == 1
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from src.codec import SensorReading
+from src.streaming import FanoutHub, StreamLimitReached, parse_filter, sse_event
+
+
+def reading(field_id, sensor_id, value):
+    return SensorReading(field_id=field_id, sensor_id=sensor_id, timestamp=1700000000, signature='',
+                         data={}, fields={'moisture': value})
+
+
+def values(messages):
+    return [json.loads(message)['fields']['moisture'] for message in messages]
+
+
+def test_parse_filter_and_sse_framing():
+    assert parse_filter(' a, b,,') == {'a', 'b'}
+    assert parse_filter('') is None
+    assert sse_event([b'{"a":1}', b'{"b":2}']) == b'data: {"a":1}\n\ndata: {"b":2}\n\n'
+
+
+def test_subscribers_get_only_their_fields_and_sensors():
+    async def scenario():
+        hub = FanoutHub()
+        north = hub.subscribe(fields={'north'})
+        one_sensor = hub.subscribe(fields={'north'}, sensors={'s2'})
+        everything = hub.subscribe()
+        hub.publish([reading('north', 's1', 1.0), reading('south', 's1', 2.0), reading('north', 's2', 3.0)])
+        return [values(await s.next_batch(0.1)) for s in (north, one_sensor, everything)]
+
+    assert asyncio.run(scenario()) == [[1.0, 3.0], [3.0], [1.0, 2.0, 3.0]]
+
+
+def test_waiting_subscriber_wakes_on_publish():
+    async def scenario():
+        hub = FanoutHub()
+        subscriber = hub.subscribe(fields={'north'})
+        waiting = asyncio.ensure_future(subscriber.next_batch(5.0))
+        await asyncio.sleep(0)
+        hub.publish([reading('north', 's1', 1.0)])
+        return values(await asyncio.wait_for(waiting, 1.0))
+
+    assert asyncio.run(scenario()) == [1.0]
+
+
+def test_next_batch_times_out_empty():
+    async def scenario():
+        hub = FanoutHub()
+        subscriber = hub.subscribe(fields={'north'})
+        hub.publish([reading('south', 's1', 1.0)])
+        return await subscriber.next_batch(0.01)
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_slow_subscriber_gets_the_latest_per_series():
+    async def scenario():
+        hub = FanoutHub(buffer=4)
+        subscriber = hub.subscribe(fields={'north'})
+        hub.publish([reading('north', f"s{i % 2}", float(i)) for i in range(10)])
+        return values(await subscriber.next_batch(0.1)), subscriber
+
+    messages, subscriber = asyncio.run(scenario())
+    assert messages == [8.0, 9.0]
+    assert subscriber.coalesced == 2  # readings 0-5 were already trimmed from the log
+
+
+def test_latest_only_coalesces_even_when_keeping_up():
+    async def scenario():
+        hub = FanoutHub()
+        subscriber = hub.subscribe(fields={'north'}, latest_only=True)
+        hub.publish([reading('north', 's1', 1.0), reading('north', 's1', 2.0)])
+        return values(await subscriber.next_batch(0.1))
+
+    assert asyncio.run(scenario()) == [2.0]
+
+
+def test_subscriber_limit_and_unsubscribe_releases_logs():
+    async def scenario():
+        hub = FanoutHub(max_subscribers=1)
+        subscriber = hub.subscribe(fields={'north'})
+        with pytest.raises(StreamLimitReached):
+            hub.subscribe()
+        hub.publish([reading('north', 's1', 1.0)])
+        await subscriber.next_batch(0.1)
+        hub.unsubscribe(subscriber)
+        return hub.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['rejected'] == 1
+    assert stats['subscribers'] == 0
+    assert stats['watched_fields'] == 0
+    assert stats['delivered'] == 1
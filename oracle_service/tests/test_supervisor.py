@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.retry import FibonacciBackoff
+from src.supervisor import OracleSupervisor, worker_processes, worker_scale_mode
+
+
+class RunningProcess:
+    pid = 1
+
+    def poll(self):
+        return None
+
+
+def supervisor_with(handler, processes=2, alive=None):
+    supervisor = OracleSupervisor(processes, FibonacciBackoff())
+    supervisor._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for worker in supervisor.workers:
+        worker.port = 9000 + worker.index
+        if alive is None or worker.index in alive:
+            worker.process = RunningProcess()
+    return supervisor
+
+
+def worker_index(request):
+    return request.url.port - 9000
+
+
+def test_worker_processes():
+    assert worker_processes('3') == 3
+    assert worker_processes('0') == 1
+    assert worker_processes('auto') >= 1
+
+
+def test_worker_scale_mode():
+    assert worker_scale_mode('auto', 'single', rollups=False) == 'shared'
+    assert worker_scale_mode('auto', 'single', rollups=True) == 'hash'
+    assert worker_scale_mode('hash', 'single', rollups=False) == 'hash'
+    assert worker_scale_mode('auto', 'hash', rollups=False) == 'hash'
+    assert worker_scale_mode('auto', 'shared', rollups=False) == 'shared'
+    with pytest.raises(ValueError):
+        worker_scale_mode('shared', 'hash', rollups=False)
+    with pytest.raises(ValueError):
+        worker_scale_mode('sticky', 'single', rollups=False)
+
+
+def test_workers_share_the_subscription_by_default(monkeypatch):
+    monkeypatch.delenv('ORACLE_ROLLUP_TIERS', raising=False)
+    monkeypatch.delenv('ORACLE_SCALE_MODE', raising=False)
+    supervisor = OracleSupervisor(3, FibonacciBackoff())
+    env = supervisor._worker_env(supervisor.workers[2])
+    assert env['ORACLE_SCALE_MODE'] == 'shared'
+    assert (env['ORACLE_REPLICA_INDEX'], env['ORACLE_REPLICA_COUNT']) == ('2', '3')
+
+    monkeypatch.setenv('ORACLE_ROLLUP_TIERS', '1m')
+    assert OracleSupervisor(3, FibonacciBackoff()).worker_mode == 'hash'
+
+
+def test_settings_are_kept_and_replayed_to_a_restarted_worker():
+    puts = []
+
+    def handler(request):
+        if request.method == 'PUT':
+            puts.append((worker_index(request), request.url.path, dict(request.url.params)))
+            return httpx.Response(200, json={"threshold": float(request.url.params['threshold'])})
+        return httpx.Response(200, json={"status": "healthy"})
+
+    async def scenario():
+        supervisor = supervisor_with(handler, alive={0})
+        result = await supervisor.put_all('/verification', {'threshold': '0.9'})
+        assert result == {'0': {'threshold': 0.9}, '1': None}
+        assert supervisor.settings == {'/verification': {'threshold': '0.9'}}
+        # Worker 1 comes back
+        worker = supervisor.workers[1]
+        worker.process = RunningProcess()
+        await supervisor._replay_settings(worker, worker.process)
+
+    asyncio.run(scenario())
+    assert puts == [(0, '/verification', {'threshold': '0.9'}), (1, '/verification', {'threshold': '0.9'})]
+
+
+def test_rejected_setting_is_not_kept():
+    def handler(request):
+        return httpx.Response(422, json={"detail": "threshold must be in (0, 1]"})
+
+    async def scenario():
+        supervisor = supervisor_with(handler)
+        with pytest.raises(HTTPException) as raised:
+            await supervisor.put_all('/verification', {'threshold': '7'})
+        return supervisor, raised.value
+
+    supervisor, error = asyncio.run(scenario())
+    assert error.status_code == 422 and 'threshold' in error.detail
+    assert supervisor.settings == {}
+
+
+def test_non_json_worker_errors_become_502s():
+    def handler(request):
+        if worker_index(request) == 1:
+            return httpx.Response(500, text='Internal Server Error')
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        supervisor = supervisor_with(handler)
+        supervisor.worker_mode = 'hash'
+        supervisor.owner = lambda field_id: supervisor.workers[1]
+        errors = []
+        for call in (supervisor.put_all('/backoff', {'base_delay_ms': '100'}),
+                     supervisor.field_query('north-40', '/fields/north-40/latest', {})):
+            with pytest.raises(HTTPException) as raised:
+                await call
+            errors.append(raised.value)
+        return errors
+
+    for error in asyncio.run(scenario()):
+        assert error.status_code == 502
+        assert 'Worker 1' in error.detail
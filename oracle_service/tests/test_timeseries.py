@@ -0,0 +1,64 @@
+import time
+
+from src.codec import SensorReading
+from src.timeseries import RingBuffer, TimeSeriesStore
+
+
+def reading(sensor_id, fields, timestamp=None, field_id='f-1'):
+    return SensorReading(field_id, sensor_id, time.time() if timestamp is None else timestamp,
+                         'sig', fields, fields)
+
+
+def test_ring_buffer_keeps_the_latest_samples_in_order():
+    buffer = RingBuffer(3)
+    for i in range(5):
+        buffer.append(float(i), i * 10.0)
+    timestamps, values = buffer.window(0.0)
+    assert list(timestamps) == [2.0, 3.0, 4.0]
+    assert list(values) == [20.0, 30.0, 40.0]
+    assert buffer.latest() == (4.0, 40.0)
+
+
+def test_window_stats():
+    store = TimeSeriesStore()
+    now = time.time()
+    for i in range(1, 11):
+        store.add(reading('s-1', {'v': float(i)}, now - i))
+    stats = store.window_stats(store.get('f-1', 's-1', 'v'), 60.0, [50])
+    assert stats['count'] == 10 and stats['min'] == 1.0 and stats['max'] == 10.0
+    assert stats['mean'] == 5.5 and stats['p50'] == 5.5
+
+
+def test_downsample_never_returns_more_than_max_points():
+    store = TimeSeriesStore(capacity=5000, max_points=10)
+    now = time.time()
+    for i in range(3000):
+        store.add(reading('s-1', {'v': 1.0}, now - i * 0.1))
+    # A future-stamped sample must not stretch the buckets either
+    store.add(reading('s-1', {'v': 1.0}, now + 10 ** 6))
+    points = store.downsample(store.get('f-1', 's-1', 'v'), 600.0, 0.001)
+    assert 0 < len(points) <= 11
+    assert store.min_step(600.0) == 60.0
+
+
+def test_full_store_allocates_nothing_for_new_sensors():
+    store = TimeSeriesStore(max_series=2)
+    store.add(reading('s-1', {'a': 1.0, 'b': 2.0}))
+    for i in range(100):
+        store.add(reading(f"intruder-{i}", {'a': 1.0}, field_id=f"f-{i}"))
+    assert store.field_ids() == ['f-1']
+    assert list(store.sensors('f-1')) == ['s-1']
+    assert store.series_rejected == 100
+
+
+def test_idle_series_expire_and_free_their_slots():
+    store = TimeSeriesStore(max_series=2, retention=10.0, sweep_interval=5.0)
+    start = time.monotonic()
+    store.add(reading('old', {'v': 1.0}), now=start)
+    store.add(reading('busy', {'v': 1.0}), now=start)
+    store.add(reading('busy', {'v': 2.0}), now=start + 8.0)
+    store.add(reading('new', {'v': 1.0}), now=start + 8.5)  # full, and 'old' is not idle long enough yet
+    assert store.series_rejected == 1
+    store.add(reading('new', {'v': 1.0}), now=start + 11.0)
+    assert sorted(store.sensors('f-1')) == ['busy', 'new']
+    assert store.series_expired == 1 and store.series_count == 2
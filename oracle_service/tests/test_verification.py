@@ -0,0 +1,84 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from src.codec import SensorReading
+from src.frames import FrameDecoder, encode_frame
+from src.verification import SignatureVerifier, canonical_message
+
+SECRET = b's' * 32
+
+
+def hmac_reading(sensor_id, timestamp, data, key=SECRET):
+    signature = hmac.new(key, canonical_message(timestamp, sensor_id, data), hashlib.sha256).digest()
+    return SensorReading(field_id='f', sensor_id=sensor_id, timestamp=timestamp,
+                         signature=base64.b64encode(signature).decode(), data=data, fields={})
+
+
+def verify(keyring, readings, chunk_size=64):
+    async def scenario():
+        verifier = SignatureVerifier(keyring, pool='thread', workers=2, chunk_size=chunk_size)
+        verifier.start()
+        try:
+            return await verifier.verify_batch(readings), verifier
+        finally:
+            await verifier.close()
+
+    return asyncio.run(scenario())
+
+
+def test_hmac_and_ed25519_signatures():
+    private = Ed25519PrivateKey.generate()
+    public = private.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    keyring = {
+        'gw-12': {'alg': 'hmac-sha256', 'key': base64.b64encode(SECRET).decode()},
+        'soil-007': {'alg': 'ed25519', 'key': base64.b64encode(public).decode()},
+    }
+    data = {'moisture': 0.31}
+    signed = private.sign(canonical_message(1700000000, 'soil-007', data))
+    readings = [
+        hmac_reading('gw-12', 1700000000, data),
+        SensorReading(field_id='f', sensor_id='soil-007', timestamp=1700000000,
+                      signature=base64.b64encode(signed).decode(), data=data, fields={}),
+        hmac_reading('gw-12', 1700000000, data, key=b'x' * 32),
+        hmac_reading('nobody', 1700000000, data),
+    ]
+    verdicts, verifier = verify(keyring, readings, chunk_size=1)
+    assert verdicts == [True, True, False, False]
+    assert verifier.verified == 2
+    assert verifier.rejected == {'unknown_sensor': 1, 'bad_signature': 1}
+
+
+def test_tampered_data_is_rejected():
+    keyring = {'gw-12': {'alg': 'hmac-sha256', 'key': base64.b64encode(SECRET).decode()}}
+    reading = hmac_reading('gw-12', 1700000000, {'moisture': 0.31})
+    reading.data['moisture'] = 0.99
+    verdicts, _ = verify(keyring, [reading])
+    assert verdicts == [False]
+
+
+def test_readings_of_one_frame_share_a_single_check():
+    def sign(message):
+        return hmac.new(SECRET, message, hashlib.sha256).digest()
+
+    frame = encode_frame('gw-12', ['v'], [1.0, 2.0, 3.0], [[1.0], [2.0], [3.0]], sign=sign, signature_length=32)
+    readings = FrameDecoder().decode('f', frame)
+    keyring = {'gw-12': {'alg': 'hmac-sha256', 'key': base64.b64encode(SECRET).decode()}}
+    verdicts, verifier = verify(keyring, readings)
+    assert verdicts == [True, True, True]
+    assert verifier.stats()['key_cache']['currsize'] >= 1
+
+    forged = frame[:-1] + bytes([frame[-1] ^ 1])
+    verdicts, verifier = verify(keyring, FrameDecoder().decode('f', forged))
+    assert verdicts == [False, False, False]
+    assert verifier.rejected['bad_signature'] == 3
+
+
+def test_without_keyring_structure_only():
+    verdicts, verifier = verify(None, [hmac_reading('anyone', 1, {})])
+    assert verdicts == [True]
+    assert verifier.stats()['mode'] == 'structure_only'